@@ -1,19 +1,31 @@
 from fastapi import FastAPI
 from routes import user_routes, recipe_routes
-from models.models import Base
+from models.models import Base, upgrade_recipe_schema
 from database import engine
+from services.tracing import TracingMiddleware, tracer
+from services.profiling import ProfilingMiddleware, profile_store
+from services.token_denylist import token_denylist
+from services.recipe_similarity import similarity_index, recipe_ingredients
+from services.recipe_autocomplete import title_index, recipe_titles
+from starlette.concurrency import run_in_threadpool
+from settings.config import get_settings
 from fastapi_jwt_auth.exceptions import AuthJWTException
 from fastapi.responses import JSONResponse
+import asyncio
+import logging
+import time
 
 api_config = {
     "title": "Recipe API",
     "description": """
             A secure and user-friendly REST API for managing users and cooking recipes.  
             Key features include:
-            - JWT-based authentication
+            - JWT-based authentication, with logout and token revocation
             - User registration and login
             - Create, update, list, and delete recipes
-            - Filter recipes by ingredients and preparation time
+            - Filter recipes by ingredients and preparation time range, with sorting
+            - Related recipes by ingredient similarity (`/recipes/{id}/similar`)
+            - Title autocomplete (`/recipes/autocomplete`)
 
             Built with FastAPI, SQLAlchemy, and SQLite for fast development and easy integration.
     """,
@@ -32,10 +44,50 @@ api_config = {
 
 app = FastAPI(**api_config)
 
+# Tracing por requisição, com um span por instrução SQL
+tracer.instrument_engine(engine)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Profiling sob demanda (cabeçalho X-Profile de um admin) ou por amostragem
+settings = get_settings()
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    sample_rate=settings.profile_sample_rate,
+    admin_usernames=settings.admin_usernames,
+)
+
 # Criação das tabelas ao iniciar
 @app.on_event("startup")
 def startup():
     Base.metadata.create_all(bind=engine)
+    upgrade_recipe_schema(engine)
+    # Revoked tokens and the ingredient and title indexes are loaded before the first request is served.
+    token_denylist.load(engine)
+    similarity_index.build(recipe_ingredients())
+    title_index.build(recipe_titles())
+
+async def sync_token_denylist():
+    # Pick up revocations from other workers; rebuild (dropping expired rows) hourly.
+    reloaded = time.monotonic()
+    while True:
+        await asyncio.sleep(settings.revocation_sync_seconds)
+        try:
+            if time.monotonic() - reloaded >= settings.revocation_reload_seconds:
+                await run_in_threadpool(token_denylist.load, engine)
+                reloaded = time.monotonic()
+            else:
+                await run_in_threadpool(token_denylist.sync, engine)
+        except Exception:
+            logging.getLogger(__name__).exception("Token denylist sync failed")
+
+@app.on_event("startup")
+async def start_token_denylist_sync():
+    app.state.denylist_task = asyncio.create_task(sync_token_denylist())
+
+@app.on_event("shutdown")
+async def stop_token_denylist_sync():
+    app.state.denylist_task.cancel()
 
 # Tratamento de erro JWT
 @app.exception_handler(AuthJWTException)
@@ -0,0 +1,75 @@
+"""
+Benchmark of the GET /recipes serialization paths.
+
+Compares the response_model path (ORM objects validated through RecipeOut,
+then jsonable_encoder and stdlib json) with the trusted-row path (column
+tuples encoded straight with orjson) on a temporary SQLite database.
+
+Run from the fast_api directory:
+    python -m benchmarks.bench_list_recipes --rows 10000
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from fastapi.encoders import jsonable_encoder
+from models.models import Base, Recipe
+from schemas.schemas import RecipeOut
+from routes.recipe_routes import RECIPE_COLUMNS, RECIPE_FIELDS
+from services.recipe_stream import encode_rows
+import argparse
+import tempfile
+import json
+import time
+import os
+
+
+def seed(session, rows: int) -> None:
+    session.execute(Recipe.__table__.insert(), [
+        {"title": f"Recipe {i}", "ingredients": "Flour, Eggs, Milk", "time_minutes": i % 240}
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def response_model_path(session) -> bytes:
+    recipes = [RecipeOut.from_orm(recipe) for recipe in session.query(Recipe).all()]
+    return json.dumps(jsonable_encoder(recipes)).encode()
+
+
+def trusted_path(session) -> bytes:
+    return encode_rows(session.query(*RECIPE_COLUMNS), RECIPE_FIELDS)
+
+
+def best_of(func, session, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(session)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        seed(session, args.rows)
+
+        assert json.loads(response_model_path(session)) == json.loads(trusted_path(session))
+        baseline = best_of(response_model_path, session, args.repeat)
+        trusted = best_of(trusted_path, session, args.repeat)
+        session.close()
+        engine.dispose()
+
+    print(f"rows={args.rows}")
+    print(f"response_model path: {baseline * 1000:8.1f} ms")
+    print(f"trusted orjson path: {trusted * 1000:8.1f} ms  ({baseline / trusted:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
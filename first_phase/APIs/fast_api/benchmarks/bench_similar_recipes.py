@@ -0,0 +1,90 @@
+"""
+Benchmark of the ingredient-similarity index behind GET /recipes/{id}/similar.
+
+Builds the index over synthetic recipes (ingredients drawn from a Zipf-like
+vocabulary, so a few staples appear in most recipes), then measures the
+single-recipe neighbor latency, the batched neighbor throughput and the
+cost of incremental writes, without a database.
+
+Run from the fast_api directory:
+    python -m benchmarks.bench_similar_recipes --recipes 1000000
+"""
+from services.recipe_similarity import RecipeSimilarityIndex
+import numpy as np
+import argparse
+import time
+
+
+def synthetic_recipes(count: int, vocabulary: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+    sizes = rng.integers(4, 13, size=count)
+    terms = rng.choice(vocabulary, size=int(sizes.sum()), p=weights)
+    start = 0
+    for recipe_id, size in enumerate(sizes, start=1):
+        yield recipe_id, ", ".join(f"ingredient {term}" for term in terms[start:start + size])
+        start += size
+
+
+def single_timings(index: RecipeSimilarityIndex, ids, k: int):
+    timings = []
+    for recipe_id in ids:
+        start = time.perf_counter()
+        index.neighbors([recipe_id], k)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile_ms(timings, q: float) -> float:
+    return float(np.percentile(timings, q)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    index = RecipeSimilarityIndex()
+    start = time.perf_counter()
+    index.build(synthetic_recipes(args.recipes, args.vocabulary))
+    print(f"build: {time.perf_counter() - start:.1f} s  {index.stats()}")
+
+    rng = np.random.default_rng(1)
+    ids = rng.integers(1, args.recipes + 1, size=args.queries).tolist()
+    timings = single_timings(index, ids, args.k)
+    print(f"single: p50 {percentile_ms(timings, 50):.1f} ms  p99 {percentile_ms(timings, 99):.1f} ms")
+
+    # Same queries with the MaxScore pruning off: one full sparse product per recipe.
+    candidate_postings, index.candidate_postings = index.candidate_postings, 0
+    exhaustive = index.neighbors(ids[:20], args.k)
+    full = single_timings(index, ids, args.k)
+    index.candidate_postings = candidate_postings
+    pruned = index.neighbors(ids[:20], args.k)
+    assert all([round(score, 4) for _, score in pruned[i]] == [round(score, 4) for _, score in exhaustive[i]] for i in pruned)
+    print(f"full product: p50 {percentile_ms(full, 50):.1f} ms  p99 {percentile_ms(full, 99):.1f} ms"
+          f"  (pruning {np.median(full) / np.median(timings):.1f}x faster at p50, same scores)")
+
+    start = time.perf_counter()
+    for offset in range(0, len(ids), args.batch):
+        index.neighbors(ids[offset:offset + args.batch], args.k)
+    elapsed = time.perf_counter() - start
+    print(f"batch of {args.batch}: {elapsed / len(ids) * 1000:.2f} ms per recipe"
+          f"  ({sum(timings) / elapsed:.1f}x the single-recipe throughput)")
+
+    writes = list(synthetic_recipes(1000, args.vocabulary, seed=2))
+    start = time.perf_counter()
+    for offset, (_, ingredients) in enumerate(writes):
+        index.upsert(args.recipes + offset + 1, ingredients)
+    print(f"upsert: {(time.perf_counter() - start) / len(writes) * 1e6:.0f} us per recipe (pending segment)")
+    start = time.perf_counter()
+    index.neighbors([ids[0]], args.k)
+    print(f"single with {len(writes)} pending: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
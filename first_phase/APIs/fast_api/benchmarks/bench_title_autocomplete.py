@@ -0,0 +1,77 @@
+"""
+Benchmark of the title prefix index behind GET /recipes/autocomplete.
+
+Builds the index over synthetic titles (two to five words from a Zipf-like
+vocabulary), then measures search-as-you-type latency for prefixes of one to
+six characters, the cost of incremental writes and the searches with a full
+pending segment, without a database.
+
+Run from the fast_api directory:
+    python -m benchmarks.bench_title_autocomplete --recipes 1000000
+"""
+from services.recipe_autocomplete import TitlePrefixIndex
+import numpy as np
+import argparse
+import time
+
+
+def synthetic_titles(count: int, vocabulary: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    words = ["".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), size=rng.integers(3, 10))) for _ in range(vocabulary)]
+    weights = 1 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+    sizes = rng.integers(2, 6, size=count)
+    terms = rng.choice(vocabulary, size=int(sizes.sum()), p=weights)
+    start = 0
+    for recipe_id, size in enumerate(sizes, start=1):
+        yield recipe_id, " ".join(words[term] for term in terms[start:start + size]).title()
+        start += size
+
+
+def search_timings(index: TitlePrefixIndex, prefixes, limit: int):
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.search(prefix, limit)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile_us(timings, q: float) -> float:
+    return float(np.percentile(timings, q)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--max-bytes", type=int, default=1024 ** 3)
+    args = parser.parse_args()
+
+    titles = list(synthetic_titles(args.recipes, args.vocabulary))
+    index = TitlePrefixIndex(args.max_bytes)
+    start = time.perf_counter()
+    index.build(titles)
+    print(f"build: {time.perf_counter() - start:.1f} s  {index.stats()}")
+
+    rng = np.random.default_rng(1)
+    sample = rng.integers(0, len(titles), size=args.queries)
+    for length in (1, 2, 3, 6):
+        prefixes = [titles[i][1][:length] for i in sample]
+        timings = search_timings(index, prefixes, args.limit)
+        print(f"prefix of {length}: p50 {percentile_us(timings, 50):.0f} us  p99 {percentile_us(timings, 99):.0f} us")
+
+    writes = list(synthetic_titles(5000, args.vocabulary, seed=2))
+    start = time.perf_counter()
+    for offset, (_, title) in enumerate(writes):
+        index.upsert(args.recipes + offset + 1, title)
+    print(f"upsert: {(time.perf_counter() - start) / len(writes) * 1e6:.0f} us per recipe (pending segment)")
+    timings = search_timings(index, [titles[i][1][:3] for i in sample], args.limit)
+    print(f"prefix of 3 with {index.stats()['pending']} pending keys: p50 {percentile_us(timings, 50):.0f} us"
+          f"  p99 {percentile_us(timings, 99):.0f} us")
+
+
+if __name__ == "__main__":
+    main()
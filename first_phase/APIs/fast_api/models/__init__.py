@@ -1,3 +1,3 @@
-from .models import User, Recipe
+from .models import User, Recipe, upgrade_recipe_schema
 
-__all__ = ['User', 'Recipe']
+__all__ = ['User', 'Recipe', 'upgrade_recipe_schema']
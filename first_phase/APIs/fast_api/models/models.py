@@ -1,5 +1,13 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import declarative_base
+from datetime import datetime
+from typing import Dict, Union
+import logging
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -17,6 +25,23 @@ class User(Base):
     username = Column(String(80), unique=True, index=True, nullable=False)
     password = Column(String(200), nullable=False)
 
+class RevokedToken(Base):
+    """
+    Revoked JWT, checked through the in-memory filter of services/token_denylist.py.
+    Attributes:
+        id (int): Row id; AUTOINCREMENT keeps ids from being reused, so workers
+            can sync by reading only ids above the last one they saw.
+        jti (str): The `jti` claim of the revoked token.
+        expires_at (datetime): Expiry of the token (UTC); the row is pruned after it.
+        revoked_at (datetime): When the token was revoked (UTC).
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = {"sqlite_autoincrement": True}
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
 class Recipe(Base):
     """
     Recipe model for the application.
@@ -26,9 +51,113 @@ class Recipe(Base):
         title (str): Title of the recipe.
         ingredients (str): Ingredients required for the recipe.
         time_minutes (int): Preparation time in minutes.
+        version (int): Row version, bumped on every change; used for optimistic
+            concurrency control (`If-Match`).
+    Indexes:
+        ix_recipes_time_minutes: time range filters and sorting by time.
+        ix_recipes_title_time_minutes: sorting by title with the time filter
+            evaluated inside the index.
+        ix_recipes_title_lower: case-insensitive title prefix ranges of the
+            autocomplete fallback.
+        recipes_fts: FTS5 trigram index of `ingredients` (see `upgrade_recipe_schema`),
+            which serves the substring filter without scanning the table.
     """
     __tablename__ = "recipes"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(120), nullable=False)
     ingredients = Column(String(500), nullable=False)
-    time_minutes = Column(Integer, nullable=False)
+    time_minutes = Column(Integer, nullable=False, index=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        Index("ix_recipes_title_time_minutes", "title", "time_minutes"),
+    )
+
+Index("ix_recipes_title_lower", func.lower(Recipe.title))
+
+RECIPE_SEARCH_TABLE = "recipes_fts"
+# External-content FTS5 table over recipes.ingredients, kept in sync by triggers. The
+# trigram tokenizer lets `LIKE '%text%'` on it use the index (SQLite 3.34+).
+_RECIPE_SEARCH_DDL = {
+    RECIPE_SEARCH_TABLE: f"""
+        CREATE VIRTUAL TABLE {RECIPE_SEARCH_TABLE}
+        USING fts5(ingredients, content='recipes', content_rowid='id', tokenize='trigram')""",
+    f"{RECIPE_SEARCH_TABLE}_ai": f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_ai AFTER INSERT ON recipes BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END""",
+    f"{RECIPE_SEARCH_TABLE}_ad": f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_ad AFTER DELETE ON recipes BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+        END""",
+    f"{RECIPE_SEARCH_TABLE}_au": f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_au AFTER UPDATE OF ingredients ON recipes BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+            INSERT INTO {RECIPE_SEARCH_TABLE}(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END""",
+}
+_search_ready: Dict[str, bool] = {}
+
+def has_ingredient_search(bind: Union[Engine, Connection]) -> bool:
+    """
+    Whether the database has the ingredients search table; checked once per database.
+    Args:
+        bind (Union[Engine, Connection]): Engine or connection of the database.
+    Returns:
+        bool: True if `RECIPE_SEARCH_TABLE` exists.
+    """
+    engine = bind.engine
+    key = str(engine.url)
+    if key not in _search_ready:
+        if engine.dialect.name != "sqlite":
+            _search_ready[key] = False
+        else:
+            with engine.connect() as connection:
+                _search_ready[key] = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": RECIPE_SEARCH_TABLE}
+                ).first() is not None
+    return _search_ready[key]
+
+def upgrade_recipe_search(engine: Engine) -> None:
+    """
+    Create the ingredients search table and its triggers where missing, and
+    reindex it when anything had to be created. Skipped (the filter falls
+    back to a plain LIKE) when SQLite lacks FTS5 or the trigram tokenizer.
+    Args:
+        engine (Engine): Engine of the database to upgrade.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    try:
+        with engine.begin() as connection:
+            existing = {row[0] for row in connection.execute(
+                text("SELECT name FROM sqlite_master WHERE name LIKE :prefix"), {"prefix": f"{RECIPE_SEARCH_TABLE}%"}
+            )}
+            missing = [name for name in _RECIPE_SEARCH_DDL if name not in existing]
+            for name in missing:
+                connection.exec_driver_sql(_RECIPE_SEARCH_DDL[name])
+            if missing:
+                connection.exec_driver_sql(f"INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}) VALUES ('rebuild')")
+    except OperationalError as e:
+        logger.warning("Ingredients search index unavailable, filtering with LIKE: %s", e)
+        return
+    _search_ready[str(engine.url)] = True
+
+def upgrade_recipe_schema(engine: Engine) -> None:
+    """
+    Apply to existing databases what `create_all` does not change on tables
+    that already exist: the `version` column, the Recipe indexes and the
+    ingredients search table.
+    Args:
+        engine (Engine): Engine of the database to upgrade.
+    """
+    table = Recipe.__table__
+    columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    if "version" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    # IF NOT EXISTS rather than checkfirst: reflection skips expression indexes.
+    with engine.begin() as connection:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    upgrade_recipe_search(engine)
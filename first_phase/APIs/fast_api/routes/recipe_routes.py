@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from fastapi_jwt_auth import AuthJWT
 from models.models import Recipe
-from schemas.schemas import RecipeCreate, RecipeUpdate, RecipeOut
+from schemas.schemas import RecipeCreate, RecipeUpdate, RecipeOut, RecipeSuggestion, SimilarRecipeOut, RecipeBatchUpdate, RecipeBatchDelete, BatchResponse
 from typing import List, Optional
-from database import get_db
+from database import get_db, SessionLocal
+from services.recipe_cache import recipe_cache, etag_matches
+from services.recipe_import import import_recipes, import_from_stream, resolve_format
+from services.recipe_batch import batch_update, batch_delete
+from services.recipe_stream import encode_rows, iter_json_array
+from services.recipe_update import conditional_update, if_match_versions
+from services.recipe_query import recipe_list_query, title_prefix_query
+from services.recipe_similarity import similarity_index, index_new_recipes, recipe_ingredients
+from services.recipe_autocomplete import title_index, index_new_titles, recipe_titles
+from services.profiling import ProfiledRoute
+from settings.config import get_settings
 
-router = APIRouter(prefix="/recipes", tags=["Recipe"])
+router = APIRouter(prefix="/recipes", tags=["Recipe"], route_class=ProfiledRoute)
+
+# Fields accepted by `?sort=` (services/recipe_query.SORT_FIELDS).
+SORT_PATTERN = r"^-?(id|title|time_minutes)$"
+RECIPE_FIELDS = ("id", "title", "ingredients", "time_minutes", "version")
+RECIPE_COLUMNS = (Recipe.id, Recipe.title, Recipe.ingredients, Recipe.time_minutes, Recipe.version)
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
@@ -15,37 +31,191 @@ def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db), Authorize
     db.add(new_recipe)
     db.commit()
     db.refresh(new_recipe)
+    recipe_cache.bump_version()
+    similarity_index.upsert(new_recipe.id, new_recipe.ingredients)
+    title_index.upsert(new_recipe.id, new_recipe.title)
     return {"message": "Recipe created successfully", "recipe_id": new_recipe.id}
 
-@router.get("", response_model=List[RecipeOut])
+@router.post("/import")
+async def import_recipes_bulk(
+        request: Request,
+        format: Optional[str] = Query(None, regex="^(ndjson|csv)$"),
+        db: Session = Depends(get_db),
+        Authorize: AuthJWT = Depends()
+    ):
+    Authorize.jwt_required()
+    fmt = resolve_format(request.headers.get("content-type"), format)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Unsupported format, use NDJSON or CSV")
+    settings = get_settings()
+
+    def committed():
+        recipe_cache.bump_version()
+        index_new_recipes(db)
+        index_new_titles(db)
+
+    def importer(lines):
+        return import_recipes(
+            db,
+            lines,
+            fmt,
+            batch_size=settings.recipe_import_batch_size,
+            batches_per_commit=settings.recipe_import_batches_per_commit,
+            max_errors=settings.recipe_import_max_errors,
+            on_commit=committed,
+        )
+
+    try:
+        return await import_from_stream(request.stream(), importer)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Error importing recipes: {e}")
+
+@router.get("", response_model=List[RecipeOut], responses={304: {"description": "Not Modified"}})
 def list_recipes(
         ingredients: Optional[str] = Query(None),
-        max_time: Optional[int] = Query(None),
+        min_time: Optional[int] = Query(None, ge=0),
+        max_time: Optional[int] = Query(None, ge=0),
+        sort: str = Query("id", regex=SORT_PATTERN),
+        stream: bool = Query(False, description="Stream the JSON array incrementally (bypasses the cache)"),
+        if_none_match: Optional[str] = Header(None),
         db: Session = Depends(get_db)
     ):
-    query = db.query(Recipe)
-    if ingredients:
-        query = query.filter(Recipe.ingredients.contains(ingredients))
-    if max_time:
-        query = query.filter(Recipe.time_minutes <= max_time)
-    return query.all()
-
-@router.put("/{recipe_id}")
+    if min_time is not None and max_time is not None and min_time > max_time:
+        raise HTTPException(status_code=400, detail="min_time must be less than or equal to max_time")
+    params = {"ingredients": ingredients, "min_time": min_time, "max_time": max_time, "sort": sort}
+    etag = recipe_cache.etag(params)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    def build_query(session: Session):
+        return recipe_list_query(session, ingredients, min_time, max_time, sort)
+
+    if stream:
+        chunk_rows = get_settings().recipe_stream_chunk_rows
+
+        def stream_recipes():
+            # Own session: the request-scoped one may be closed before the body is sent.
+            session = SessionLocal()
+            try:
+                rows = build_query(session).with_entities(*RECIPE_COLUMNS).yield_per(chunk_rows)
+                yield from iter_json_array(rows, RECIPE_FIELDS, chunk_rows)
+            finally:
+                session.close()
+
+        return StreamingResponse(stream_recipes(), media_type="application/json", headers={"ETag": etag})
+
+    # Trusted rows from our own table: the response_model only documents the
+    # schema, the body is encoded once and cached as bytes.
+    def load_recipes():
+        return encode_rows(build_query(db).with_entities(*RECIPE_COLUMNS), RECIPE_FIELDS)
+
+    body = recipe_cache.get_or_compute(params, load_recipes)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@router.get("/autocomplete", response_model=List[RecipeSuggestion])
+def autocomplete_recipes(
+        q: str = Query(..., min_length=1, description="Title prefix typed so far"),
+        limit: int = Query(10, ge=1, description="Maximum number of matches"),
+        db: Session = Depends(get_db)
+    ):
+    settings = get_settings()
+    if limit > settings.autocomplete_max_limit:
+        raise HTTPException(status_code=400, detail=f"limit must be at most {settings.autocomplete_max_limit}")
+    title_index.refresh(recipe_titles, settings.autocomplete_refresh_seconds)
+    matches = title_index.search(q, limit)
+    if matches is None:
+        # Index over its memory ceiling: plain title prefix query instead.
+        matches = title_prefix_query(db, q.strip(), limit).all()
+    return [{"id": recipe_id, "title": title} for recipe_id, title in matches]
+
+@router.get("/{recipe_id}/similar", response_model=List[SimilarRecipeOut])
+def similar_recipes(
+        recipe_id: int,
+        k: int = Query(10, ge=1, description="Number of related recipes to return"),
+        db: Session = Depends(get_db)
+    ):
+    settings = get_settings()
+    if k > settings.similar_max_k:
+        raise HTTPException(status_code=400, detail=f"k must be at most {settings.similar_max_k}")
+    similarity_index.refresh(recipe_ingredients, settings.similar_refresh_seconds)
+    neighbors = similarity_index.neighbors([recipe_id], k).get(recipe_id)
+    if neighbors is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    # Neighbors come ranked from the in-memory index; one IN query fetches their rows.
+    rows = db.query(*RECIPE_COLUMNS).filter(Recipe.id.in_([neighbor for neighbor, _ in neighbors])).all()
+    recipes = {row.id: dict(zip(RECIPE_FIELDS, row)) for row in rows}
+    return [{**recipes[neighbor], "score": score} for neighbor, score in neighbors if neighbor in recipes]
+
+@router.get("/cache/stats")
+def cache_stats(Authorize: AuthJWT = Depends()):
+    Authorize.jwt_required()
+    return recipe_cache.stats()
+
+@router.put("/batch", response_model=BatchResponse)
+def update_recipes_batch(batch: RecipeBatchUpdate, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
+    Authorize.jwt_required()
+    if len(batch.recipes) > get_settings().recipe_batch_max_items:
+        raise HTTPException(status_code=400, detail="Too many items in batch")
+    patches = [patch.dict(exclude_unset=True) for patch in batch.recipes]
+    if any(len(patch) == 1 for patch in patches):
+        raise HTTPException(status_code=400, detail="Every item needs at least one field to update")
+    statuses = batch_update(db, patches)
+    db.commit()
+    if "updated" in statuses.values():
+        recipe_cache.bump_version()
+        updated = [patch for patch in patches if statuses[patch["id"]] == "updated"]
+        similarity_index.upsert_many((patch["id"], patch["ingredients"]) for patch in updated if "ingredients" in patch)
+        title_index.upsert_many((patch["id"], patch["title"]) for patch in updated if "title" in patch)
+    return {"results": [{"id": patch["id"], "status": statuses[patch["id"]]} for patch in patches]}
+
+@router.post("/batch/delete", response_model=BatchResponse)
+def delete_recipes_batch(batch: RecipeBatchDelete, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
+    Authorize.jwt_required()
+    if len(batch.ids) > get_settings().recipe_batch_max_items:
+        raise HTTPException(status_code=400, detail="Too many items in batch")
+    statuses = batch_delete(db, batch.ids)
+    db.commit()
+    if "deleted" in statuses.values():
+        recipe_cache.bump_version()
+        for recipe_id, outcome in statuses.items():
+            if outcome == "deleted":
+                similarity_index.remove(recipe_id)
+                title_index.remove(recipe_id)
+    return {"results": [{"id": recipe_id, "status": statuses[recipe_id]} for recipe_id in batch.ids]}
+
+@router.put("/{recipe_id}", responses={409: {"description": "If-Match does not match the current version"}})
 def update_recipe(
         recipe_id: int,
         recipe: RecipeUpdate,
+        response: Response,
+        if_match: Optional[str] = Header(None, description='Version the update is based on, e.g. "3"; a different current version returns 409'),
         db: Session = Depends(get_db),
         Authorize: AuthJWT = Depends()
     ):
     Authorize.jwt_required()
-    db_recipe = db.query(Recipe).get(recipe_id)
-    if not db_recipe:
+    values = recipe.dict(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    outcome, version = conditional_update(db, recipe_id, values, if_match_versions(if_match))
+    if outcome == "not_found":
+        db.rollback()
         raise HTTPException(status_code=404, detail="Recipe not found")
-
-    for field, value in recipe.dict(exclude_unset=True).items():
-        setattr(db_recipe, field, value)
+    if outcome == "conflict":
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Recipe was modified by another request",
+            headers={"ETag": f'"{version}"'},
+        )
     db.commit()
-    return {"message": "Recipe updated successfully"}
+    recipe_cache.bump_version()
+    if "ingredients" in values:
+        similarity_index.upsert(recipe_id, values["ingredients"])
+    if "title" in values:
+        title_index.upsert(recipe_id, values["title"])
+    response.headers["ETag"] = f'"{version}"'
+    return {"message": "Recipe updated successfully", "version": version}
 
 @router.delete("/{recipe_id}")
 def delete_recipe(recipe_id: int, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
@@ -55,4 +225,7 @@ def delete_recipe(recipe_id: int, db: Session = Depends(get_db), Authorize: Auth
         raise HTTPException(status_code=404, detail="Recipe not found")
     db.delete(recipe)
     db.commit()
+    recipe_cache.bump_version()
+    similarity_index.remove(recipe_id)
+    title_index.remove(recipe_id)
     return {"message": "Recipe deleted successfully"}
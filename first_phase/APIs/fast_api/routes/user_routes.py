@@ -1,31 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
 from models.models import User
-from schemas.schemas import UserRegister, UserLogin
+from schemas.schemas import UserRegister, UserLogin, UserBulkCreate, UserBulkResponse, TokenRevoke
+from services.user_bulk import provision_users
+from services.token_denylist import token_denylist
+from services.tracing import span
+from services.profiling import ProfiledRoute
 from settings.config import get_settings
 from passlib.hash import bcrypt
+from datetime import datetime
 from database import get_db
 
-router = APIRouter(tags=["User"])
+router = APIRouter(tags=["User"], route_class=ProfiledRoute)
 
 @AuthJWT.load_config
 def load_config():
     return get_settings()
 
+@AuthJWT.token_in_denylist_loader
+def check_if_token_in_denylist(decrypted_token):
+    return token_denylist.is_revoked(decrypted_token["jti"])
+
+def _revoke(db: Session, claims: dict) -> None:
+    expires_at = datetime.utcfromtimestamp(claims["exp"]) if "exp" in claims else None
+    token_denylist.revoke(db, claims["jti"], expires_at)
+
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 def register(user: UserRegister, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == user.username).first():
-        raise HTTPException(status_code=400, detail="User already exists")
-    hashed = bcrypt.hash(user.password)
+    with span("password.hash"):
+        hashed = bcrypt.hash(user.password)
     db.add(User(username=user.username, password=hashed))
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Single INSERT: the UNIQUE index on username rejects duplicates.
+        db.rollback()
+        raise HTTPException(status_code=400, detail="User already exists")
     return {"message": "User created successfully"}
 
 @router.post("/login")
 def login(user: UserLogin, Authorize: AuthJWT = Depends(), db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.username == user.username).first()
-    if not db_user or not bcrypt.verify(user.password, db_user.password):
+    with span("password.verify"):
+        valid = db_user is not None and bcrypt.verify(user.password, db_user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     access_token = Authorize.create_access_token(subject=user.username)
     return {"access_token": access_token}
@@ -34,3 +55,42 @@ def login(user: UserLogin, Authorize: AuthJWT = Depends(), db: Session = Depends
 def protected(Authorize: AuthJWT = Depends()):
     Authorize.jwt_required()
     return {"logged_in_as": Authorize.get_jwt_subject()}
+
+@router.post("/logout")
+def logout(Authorize: AuthJWT = Depends(), db: Session = Depends(get_db)):
+    Authorize.jwt_required()
+    _revoke(db, Authorize.get_raw_jwt())
+    return {"message": "Token revoked"}
+
+@router.post("/admin/tokens/revoke")
+def revoke_token(payload: TokenRevoke, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
+    Authorize.jwt_required()
+    if Authorize.get_jwt_subject() not in get_settings().admin_usernames:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    try:
+        claims = Authorize.get_raw_jwt(payload.token)
+    except AuthJWTException:
+        raise HTTPException(status_code=400, detail="Token expired or invalid")
+    _revoke(db, claims)
+    return {"message": "Token revoked"}
+
+@router.post("/admin/users/bulk", response_model=UserBulkResponse)
+def provision_users_bulk(payload: UserBulkCreate, db: Session = Depends(get_db), Authorize: AuthJWT = Depends()):
+    Authorize.jwt_required()
+    settings = get_settings()
+    if Authorize.get_jwt_subject() not in settings.admin_usernames:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    if not payload.users:
+        raise HTTPException(status_code=400, detail="No users provided")
+    if len(payload.users) > settings.user_bulk_max_items:
+        raise HTTPException(status_code=400, detail="Too many users in request")
+    statuses = provision_users(
+        db,
+        [(user.username, user.password) for user in payload.users],
+        workers=settings.user_hash_workers,
+        batch_size=settings.user_bulk_batch_size,
+    )
+    db.commit()
+    results = [{"username": username, "status": status} for username, status in statuses.items()]
+    created = sum(1 for status in statuses.values() if status == "created")
+    return {"created": created, "results": results}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, StrictStr, validator
+from typing import List, Optional
 
 class UserRegister(BaseModel):
     """
@@ -25,6 +25,42 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class TokenRevoke(BaseModel):
+    """
+    Schema for revoking a token on behalf of its owner.
+    Attributes:
+        token (str): The encoded access or refresh token to revoke.
+    """
+    token: str
+
+class UserBulkCreate(BaseModel):
+    """
+    Schema for creating many users in one request.
+    Attributes:
+        users (List[UserRegister]): The users to create.
+    """
+    users: List[UserRegister]
+
+class UserBulkResult(BaseModel):
+    """
+    Schema for the outcome of one user of a bulk creation.
+    Attributes:
+        username (str): The username.
+        status (str): "created" or "exists".
+    """
+    username: str
+    status: str
+
+class UserBulkResponse(BaseModel):
+    """
+    Schema for the results of a bulk user creation.
+    Attributes:
+        created (int): How many users were created.
+        results (List[UserBulkResult]): One result per distinct username, in request order.
+    """
+    created: int
+    results: List[UserBulkResult]
+
 class RecipeCreate(BaseModel):
     """
     Schema for creating a new recipe.
@@ -33,11 +69,20 @@ class RecipeCreate(BaseModel):
         title (str): The title of the recipe.
         ingredients (str): The ingredients required for the recipe.
         time_minutes (int): The preparation time in minutes.
+    Same rules as the Flask schema: title and ingredients must be strings,
+    and time_minutes rejects booleans and fractional numbers instead of
+    truncating them.
     """
-    title: str
-    ingredients: str
+    title: StrictStr
+    ingredients: StrictStr
     time_minutes: int
 
+    @validator("time_minutes", pre=True)
+    def whole_minutes(cls, value):
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError("value is not a valid integer")
+        return value
+
 class RecipeUpdate(BaseModel):
     """
     Schema for updating an existing recipe.
@@ -60,11 +105,13 @@ class RecipeOut(BaseModel):
         title (str): The title of the recipe.
         ingredients (str): The ingredients required for the recipe.
         time_minutes (int): The preparation time in minutes.
+        version (int): The row version, to send back in `If-Match` when updating.
     """
     id: int
     title: str
     ingredients: str
     time_minutes: int
+    version: int
 
     class Config:
         """
@@ -72,3 +119,63 @@ class RecipeOut(BaseModel):
         Enables ORM mode to allow compatibility with SQLAlchemy models.
         """
         orm_mode = True
+
+class RecipeSuggestion(BaseModel):
+    """
+    Schema for one autocomplete match.
+    Attributes:
+        id (int): The ID of the recipe.
+        title (str): The title of the recipe.
+    """
+    id: int
+    title: str
+
+class SimilarRecipeOut(RecipeOut):
+    """
+    Schema for a recipe returned by the related-recipes lookup.
+    Attributes:
+        score (float): Cosine similarity of the TF-IDF ingredient vectors, in (0, 1].
+    """
+    score: float
+
+class RecipePatch(RecipeUpdate):
+    """
+    Schema for one item of a batch recipe update.
+    Attributes:
+        id (int): The identifier of the recipe to update.
+    """
+    id: int
+
+class RecipeBatchUpdate(BaseModel):
+    """
+    Schema for updating several recipes in one request.
+    Attributes:
+        recipes (List[RecipePatch]): The patches to apply.
+    """
+    recipes: List[RecipePatch]
+
+class RecipeBatchDelete(BaseModel):
+    """
+    Schema for deleting several recipes in one request.
+    Attributes:
+        ids (List[int]): The identifiers of the recipes to delete.
+    """
+    ids: List[int]
+
+class BatchResult(BaseModel):
+    """
+    Schema for the outcome of one item of a batch operation.
+    Attributes:
+        id (int): The identifier of the recipe.
+        status (str): "updated", "deleted" or "not_found".
+    """
+    id: int
+    status: str
+
+class BatchResponse(BaseModel):
+    """
+    Schema for the per-item results of a batch operation.
+    Attributes:
+        results (List[BatchResult]): One result per requested item, in request order.
+    """
+    results: List[BatchResult]
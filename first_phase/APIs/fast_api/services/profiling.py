@@ -0,0 +1,168 @@
+from typing import Any, Callable, List, Optional
+from contextvars import ContextVar
+from functools import wraps
+from fastapi.routing import APIRoute
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from settings.config import get_settings
+from services.token_denylist import token_denylist
+import threading
+import cProfile
+import logging
+import asyncio
+import pstats
+import random
+import time
+import uuid
+import os
+
+
+logger = logging.getLogger(__name__)
+
+# Profiles collected for the current request; None when it is not profiled.
+_profiles: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("profiles", default=None)
+
+
+def profiled(endpoint: Callable) -> Callable:
+    """
+    Wrap an endpoint so that it runs under cProfile when the current request is profiled.
+    Sync endpoints run in the threadpool, where a profiler enabled by the middleware
+    would not see them, so the profile is taken around the endpoint itself.
+    Args:
+        endpoint (Callable): The route endpoint.
+    Returns:
+        Callable: The wrapped endpoint, with the same signature.
+    """
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profiles = _profiles.get()
+            if profiles is None:
+                return await endpoint(*args, **kwargs)
+            profile = cProfile.Profile()
+            profiles.append(profile)
+            profile.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiles = _profiles.get()
+        if profiles is None:
+            return endpoint(*args, **kwargs)
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        return profile.runcall(endpoint, *args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class whose endpoint can be profiled by `ProfilingMiddleware`.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+class ProfileStore:
+    """
+    Directory of pstats files with count-based retention.
+    Attributes:
+        directory (str): Where profiles are written.
+        max_files (int): Number of most recent profiles kept.
+    """
+
+    def __init__(self, directory: str, max_files: int) -> None:
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, profiles: List[cProfile.Profile]) -> None:
+        """
+        Merge the profiles of one request into `<profile_id>.prof` and drop the oldest files.
+        Args:
+            profile_id (str): The file name.
+            profiles (List[cProfile.Profile]): The profiles taken during the request.
+        """
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        stats.dump_stats(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            entries = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+                key=lambda entry: entry.stat().st_mtime_ns,
+            )
+            for entry in entries[:max(len(entries) - self.max_files, 0)]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when an admin sends `X-Profile: 1`
+    with their access token, or for a random `sample_rate` fraction of requests.
+    The profile id is returned in the `X-Profile-Id` header; the file is
+    `<directory>/<profile id>.prof`, readable with `pstats` or snakeviz.
+    """
+
+    def __init__(self, app, store: ProfileStore, sample_rate: float, admin_usernames: List[str]) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.admin_usernames = admin_usernames
+
+    def _requested_by_admin(self, scope) -> bool:
+        request = Request(scope)
+        if request.headers.get("x-profile") != "1" or not self.admin_usernames:
+            return False
+        try:
+            claims = AuthJWT(req=request).get_raw_jwt()
+        except AuthJWTException:
+            return False
+        return (
+            claims is not None
+            and claims.get("sub") in self.admin_usernames
+            and not token_denylist.is_revoked(claims["jti"])
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (
+            (self.sample_rate > 0 and random.random() < self.sample_rate) or self._requested_by_admin(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        profiles: List[cProfile.Profile] = []
+        token = _profiles.set(profiles)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _profiles.reset(token)
+            if profiles:
+                try:
+                    await run_in_threadpool(self.store.save, profile_id, profiles)
+                except OSError as e:
+                    logger.error("Error saving profile %s: %s", profile_id, e)
+
+
+settings = get_settings()
+profile_store = ProfileStore(settings.profile_dir, settings.profile_max_files)
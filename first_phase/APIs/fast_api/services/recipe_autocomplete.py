@@ -0,0 +1,353 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.models import Recipe
+from settings.config import get_settings
+import numpy as np
+import unicodedata
+import threading
+import logging
+import sys
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Keys are stored as fixed-width bytes: a one-byte tag plus the start of the normalized text.
+KEY_BYTES = 32
+_TITLE, _WORD = b"\x01", b"\x02"
+_SEPARATORS = re.compile(r"[\W_]+")
+# Rough per-title cost of the id -> title dict beyond the string itself (key int, hash slot).
+_ENTRY_OVERHEAD = 70
+
+# Mutable state swapped in by a background rebuild (see TitlePrefixIndex.refresh).
+_STATE = ("_titles", "_keys", "_ids", "_alive", "_dead", "_pending", "_title_bytes", "enabled", "max_id", "built_at")
+
+
+def normalize_title(text: str) -> str:
+    """
+    Normalize a title for prefix matching: accents stripped, case folded and
+    runs of punctuation or whitespace collapsed to one space.
+    Args:
+        text (str): Title as stored on the recipe.
+    Returns:
+        str: Normalized title.
+    """
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return _SEPARATORS.sub(" ", text.casefold()).strip()
+
+
+def title_keys(title: str) -> List[bytes]:
+    """
+    Index keys of a title: the whole normalized title, plus the text starting
+    at each later word so "Chocolate Cake" is also found by "cak".
+    Args:
+        title (str): Title as stored on the recipe.
+    Returns:
+        List[bytes]: Distinct keys, truncated to `KEY_BYTES`.
+    """
+    normalized = normalize_title(title)
+    if not normalized:
+        return []
+    keys = {(_TITLE + normalized.encode())[:KEY_BYTES]: None}
+    for position, char in enumerate(normalized):
+        if char == " ":
+            keys[(_WORD + normalized[position + 1:].encode())[:KEY_BYTES]] = None
+    return list(keys)
+
+
+class TitlePrefixIndex:
+    """
+    In-memory sorted-array index of normalized recipe titles for autocomplete.
+    Keys live in a sorted fixed-width bytes array with the recipe ids beside
+    them, so a prefix is two binary searches and the matches are the slice in
+    between; titles starting with the prefix come before titles with a later
+    word starting with it, each in alphabetical order. Writes are incremental:
+    new keys go to a small sorted pending list and the old keys of a changed
+    or deleted recipe are tombstoned; both are merged into the arrays once
+    they exceed `compact_rows` (or a tenth of the array). If the index would
+    grow past `max_bytes` it is dropped and `enabled` turns False, and callers
+    fall back to the database until a rebuild fits again.
+    Attributes:
+        max_bytes (int): Memory ceiling of the index, in bytes.
+        compact_rows (int): Pending keys plus tombstones that trigger a merge.
+        enabled (bool): Whether the index is built and within its memory ceiling.
+        max_id (int): Highest recipe id indexed so far.
+        built_at (float): `time.monotonic()` of the last full build.
+    """
+
+    def __init__(self, max_bytes: int, compact_rows: int = 10000) -> None:
+        self.max_bytes = max_bytes
+        self.compact_rows = compact_rows
+        self.enabled = False
+        self.max_id = 0
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._titles: Dict[int, str] = {}
+        self._title_bytes = 0
+        self._keys = np.zeros(0, dtype=f"S{KEY_BYTES}")
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._dead = 0
+        self._pending: List[Tuple[bytes, int]] = []
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Replace the index with the given recipes.
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, title)` of every recipe.
+        """
+        titles, keys, ids, title_bytes = {}, [], [], 0
+        for recipe_id, title in rows:
+            self.max_id = max(self.max_id, recipe_id)
+            titles[recipe_id] = title
+            title_bytes += sys.getsizeof(title) + _ENTRY_OVERHEAD
+            recipe_keys = title_keys(title)
+            keys.extend(recipe_keys)
+            ids.extend([recipe_id] * len(recipe_keys))
+            if title_bytes + len(keys) * (KEY_BYTES + 9) > self.max_bytes:
+                with self._lock:
+                    self._disable()
+                    self.built_at = time.monotonic()
+                logger.warning("Title index exceeds %s bytes; autocomplete falls back to the database", self.max_bytes)
+                return
+        keys = np.array(keys, dtype=f"S{KEY_BYTES}")
+        order = np.argsort(keys, kind="stable")
+        with self._lock:
+            self._titles = titles
+            self._title_bytes = title_bytes
+            self._keys = keys[order]
+            self._ids = np.array(ids, dtype=np.int64)[order]
+            self._alive = np.ones(len(keys), dtype=bool)
+            self._dead = 0
+            self._pending = []
+            self.enabled = True
+            self.built_at = time.monotonic()
+
+    def upsert(self, recipe_id: int, title: str) -> None:
+        """
+        Index a created recipe, or re-index one whose title changed.
+        Args:
+            recipe_id (int): Recipe id.
+            title (str): Current title of the recipe.
+        """
+        self.upsert_many([(recipe_id, title)])
+
+    def upsert_many(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Index several created or changed recipes, merging at most once.
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, title)` of the recipes.
+        """
+        with self._lock:
+            for recipe_id, title in rows:
+                if self._journal is not None:
+                    self._journal.append((recipe_id, title))
+                self.max_id = max(self.max_id, recipe_id)
+                if not self.enabled or self._titles.get(recipe_id) == title:
+                    continue
+                self._discard(recipe_id)
+                self._titles[recipe_id] = title
+                self._title_bytes += sys.getsizeof(title) + _ENTRY_OVERHEAD
+                for key in title_keys(title):
+                    insort(self._pending, (key, recipe_id))
+            self._maybe_compact()
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Drop a deleted recipe from the index.
+        Args:
+            recipe_id (int): Recipe id.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((recipe_id, None))
+            if self.enabled and self._discard(recipe_id):
+                self._maybe_compact()
+
+    def search(self, prefix: str, limit: int) -> Optional[List[Tuple[int, str]]]:
+        """
+        Recipes whose title, or a later word of it, starts with `prefix`.
+        Args:
+            prefix (str): Text typed so far; normalized like the titles.
+            limit (int): Maximum number of matches.
+        Returns:
+            Optional[List[Tuple[int, str]]]: `(id, title)` pairs, title matches first, or
+                None when the index is disabled.
+        """
+        query = normalize_title(prefix)
+        with self._lock:
+            if not self.enabled:
+                return None
+            if not query:
+                return []
+            matches: Dict[int, str] = {}
+            for tag in (_TITLE, _WORD):
+                for recipe_id in self._range(tag, query):
+                    matches.setdefault(recipe_id, self._titles[recipe_id])
+                    if len(matches) == limit:
+                        return list(matches.items())
+            return list(matches.items())
+
+    def stats(self) -> Dict[str, Union[int, bool]]:
+        """
+        Index size counters.
+        Returns:
+            Dict[str, Union[int, bool]]: Indexed recipes, keys, pending keys, tombstones,
+                the estimated memory in bytes against the ceiling and whether the index is on.
+        """
+        with self._lock:
+            return {
+                "recipes": len(self._titles),
+                "keys": len(self._keys) - self._dead + len(self._pending),
+                "pending": len(self._pending),
+                "tombstones": self._dead,
+                "memory_bytes": self._memory(),
+                "max_bytes": self.max_bytes,
+                "enabled": self.enabled,
+            }
+
+    def refresh(self, load: Callable[[], Iterable[Tuple[int, str]]], max_age: float) -> None:
+        """
+        Rebuild the index in a background thread when the last build is older
+        than `max_age` seconds, to pick up writes made by other processes.
+        Writes applied meanwhile are journaled and replayed on the new index.
+        Args:
+            load (Callable[[], Iterable[Tuple[int, str]]]): Returns `(id, title)` of every recipe.
+            max_age (float): Seconds between rebuilds; 0 disables them.
+        """
+        with self._lock:
+            if max_age <= 0 or self._refreshing or time.monotonic() - self.built_at < max_age:
+                return
+            self._refreshing = True
+            self._journal = []
+
+        def rebuild() -> None:
+            try:
+                fresh = TitlePrefixIndex(self.max_bytes, self.compact_rows)
+                fresh.build(load())
+                with self._lock:
+                    for recipe_id, title in self._journal:
+                        if title is None:
+                            fresh.remove(recipe_id)
+                        else:
+                            fresh.upsert(recipe_id, title)
+                    for name in _STATE:
+                        setattr(self, name, getattr(fresh, name))
+            except Exception:
+                logger.exception("Recipe title index refresh failed")
+            finally:
+                with self._lock:
+                    self._journal = None
+                    self._refreshing = False
+                    self.built_at = max(self.built_at, time.monotonic())
+
+        threading.Thread(target=rebuild, name="recipe-title-refresh", daemon=True).start()
+
+    def _range(self, tag: bytes, query: str) -> Iterator[int]:
+        # Ids of the live keys starting with tag + query, in key order, from the array
+        # and the pending list. A query longer than the keys is checked on the titles.
+        prefix = (tag + query.encode())[:KEY_BYTES]
+        truncated = len(tag) + len(query.encode()) >= KEY_BYTES
+        if len(prefix) == KEY_BYTES:
+            # Keys are at most KEY_BYTES long, so only exact equals share this prefix.
+            lo, hi = np.searchsorted(self._keys, prefix, "left"), np.searchsorted(self._keys, prefix, "right")
+            pending = self._pending[bisect_left(self._pending, (prefix,)):bisect_right(self._pending, (prefix, sys.maxsize))]
+        else:
+            upper = prefix + b"\xff"
+            lo, hi = np.searchsorted(self._keys, prefix, "left"), np.searchsorted(self._keys, upper, "left")
+            pending = self._pending[bisect_left(self._pending, (prefix,)):bisect_left(self._pending, (upper,))]
+        base = ((self._keys[row], int(self._ids[row])) for row in range(lo, hi) if self._alive[row])
+        for _, recipe_id in merge(base, pending):
+            if truncated and not self._matches(tag, query, self._titles[recipe_id]):
+                continue
+            yield recipe_id
+
+    @staticmethod
+    def _matches(tag: bytes, query: str, title: str) -> bool:
+        normalized = normalize_title(title)
+        return normalized.startswith(query) if tag == _TITLE else f" {query}" in normalized
+
+    def _discard(self, recipe_id: int) -> bool:
+        title = self._titles.pop(recipe_id, None)
+        if title is None:
+            return False
+        self._title_bytes -= sys.getsizeof(title) + _ENTRY_OVERHEAD
+        for key in title_keys(title):
+            position = bisect_left(self._pending, (key, recipe_id))
+            if position < len(self._pending) and self._pending[position] == (key, recipe_id):
+                del self._pending[position]
+                continue
+            lo, hi = np.searchsorted(self._keys, key, "left"), np.searchsorted(self._keys, key, "right")
+            rows = lo + np.flatnonzero((self._ids[lo:hi] == recipe_id) & self._alive[lo:hi])
+            self._alive[rows] = False
+            self._dead += len(rows)
+        return True
+
+    def _maybe_compact(self) -> None:
+        if self._memory() > self.max_bytes:
+            self._disable()
+            logger.warning("Title index exceeds %s bytes; autocomplete falls back to the database", self.max_bytes)
+            return
+        if len(self._pending) + self._dead <= max(self.compact_rows, len(self._keys) // 10):
+            return
+        keys, ids = self._keys[self._alive], self._ids[self._alive]
+        if self._pending:
+            # Both sides are sorted: insert the pending keys at their positions.
+            pending_keys = np.array([key for key, _ in self._pending], dtype=f"S{KEY_BYTES}")
+            pending_ids = np.array([recipe_id for _, recipe_id in self._pending], dtype=np.int64)
+            positions = np.searchsorted(keys, pending_keys, "right")
+            keys, ids = np.insert(keys, positions, pending_keys), np.insert(ids, positions, pending_ids)
+        self._keys, self._ids = keys, ids
+        self._alive = np.ones(len(keys), dtype=bool)
+        self._dead = 0
+        self._pending = []
+
+    def _memory(self) -> int:
+        arrays = self._keys.nbytes + self._ids.nbytes + self._alive.nbytes
+        return arrays + self._title_bytes + len(self._pending) * (KEY_BYTES + _ENTRY_OVERHEAD)
+
+    def _disable(self) -> None:
+        self.enabled = False
+        self._titles = {}
+        self._title_bytes = 0
+        self._keys = np.zeros(0, dtype=f"S{KEY_BYTES}")
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._dead = 0
+        self._pending = []
+
+
+def recipe_titles(chunk_rows: int = 10000) -> Iterator[Tuple[int, str]]:
+    """
+    Stream `(id, title)` of every recipe from an own session.
+    Args:
+        chunk_rows (int): Rows fetched per round trip.
+    Yields:
+        Tuple[int, str]: Recipe id and title.
+    """
+    session = SessionLocal()
+    try:
+        yield from session.query(Recipe.id, Recipe.title).yield_per(chunk_rows)
+    finally:
+        session.close()
+
+
+def index_new_titles(session: Session) -> None:
+    """
+    Index the titles of recipes inserted without going through the index (bulk
+    import): every id above the highest one indexed so far.
+    Args:
+        session (Session): SQLAlchemy session that sees the committed rows.
+    """
+    rows = session.query(Recipe.id, Recipe.title).filter(Recipe.id > title_index.max_id).order_by(Recipe.id)
+    title_index.upsert_many(rows.yield_per(10000))
+
+
+settings = get_settings()
+title_index = TitlePrefixIndex(settings.autocomplete_max_bytes)
@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterator, List, Sequence, Set
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+from models.models import Recipe
+
+
+# Ids per statement; keeps CASE + IN below SQLite's 999 bound-parameter limit.
+CHUNK_SIZE = 100
+FIELDS = ("title", "ingredients", "time_minutes")
+
+
+def _chunks(items: Sequence[Any], size: int = CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing_ids(session: Session, ids: Sequence[int]) -> Set[int]:
+    table = Recipe.__table__
+    found: Set[int] = set()
+    for chunk in _chunks(ids):
+        found.update(session.execute(select(table.c.id).where(table.c.id.in_(chunk))).scalars())
+    return found
+
+
+def batch_update(session: Session, patches: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Apply several patches with a single `UPDATE ... WHERE id IN (...)` per chunk.
+    Each column gets a `CASE id WHEN ... THEN ...` with the values of the
+    patches that change it; other rows keep their current value. Every
+    changed recipe gets its version bumped. The caller commits, so the whole batch is one transaction.
+    Args:
+        session (Session): SQLAlchemy session.
+        patches (List[Dict[str, Any]]): Validated patches with `id` and the fields to change.
+    Returns:
+        Dict[int, str]: Status per id: "updated" or "not_found".
+    """
+    table = Recipe.__table__
+    found = _existing_ids(session, [patch["id"] for patch in patches])
+    to_apply = [patch for patch in patches if patch["id"] in found]
+
+    for chunk in _chunks(to_apply):
+        values = {}
+        for field in FIELDS:
+            whens = {patch["id"]: patch[field] for patch in chunk if field in patch}
+            if whens:
+                values[field] = case(whens, value=table.c.id, else_=table.c[field])
+        ids = [patch["id"] for patch in chunk]
+        session.execute(update(table).where(table.c.id.in_(ids)).values(version=table.c.version + 1, **values))
+
+    return {patch["id"]: "updated" if patch["id"] in found else "not_found" for patch in patches}
+
+
+def batch_delete(session: Session, ids: List[int]) -> Dict[int, str]:
+    """
+    Delete several recipes with one `DELETE ... WHERE id IN (...)` per chunk.
+    The caller commits.
+    Args:
+        session (Session): SQLAlchemy session.
+        ids (List[int]): Ids of the recipes to delete.
+    Returns:
+        Dict[int, str]: Status per id: "deleted" or "not_found".
+    """
+    table = Recipe.__table__
+    found = _existing_ids(session, ids)
+    for chunk in _chunks(sorted(found)):
+        session.execute(delete(table).where(table.c.id.in_(chunk)))
+    return {recipe_id: "deleted" if recipe_id in found else "not_found" for recipe_id in ids}
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from collections import OrderedDict
+from settings.config import get_settings
+import hashlib
+import threading
+import uuid
+
+
+CacheKey = Tuple[int, Tuple[Tuple[str, Hashable], ...]]
+
+
+class RecipeCache:
+    """
+    In-memory response cache for recipe list and search results.
+    Entries are keyed by the global data version plus the normalized query
+    parameters. Every write (create, update, delete) calls `bump_version`,
+    which invalidates all entries at once. The cache is bounded (LRU) and
+    single-flight: concurrent lookups of a missing key wait for one recompute.
+    Attributes:
+        max_entries (int): Maximum number of cached entries.
+        version (int): Global version of the recipe data.
+        epoch (str): Process identifier that keeps versions distinct across restarts.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._inflight: Dict[CacheKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    @staticmethod
+    def normalize(params: Mapping[str, Any]) -> Tuple[Tuple[str, Hashable], ...]:
+        """
+        Normalize query parameters: drop empty values, strip strings and sort by name.
+        """
+        normalized = []
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "":
+                continue
+            normalized.append((name, value))
+        return tuple(sorted(normalized))
+
+    def bump_version(self) -> int:
+        """
+        Increment the global data version and drop the stale entries.
+        Returns:
+            int: The new version.
+        """
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            return self.version
+
+    def etag(self, params: Mapping[str, Any]) -> str:
+        """
+        Build a strong ETag (quoted) for the query from the current data version
+        and a digest of the normalized parameters. Does not touch the database.
+        Args:
+            params (Mapping[str, Any]): Query parameters of the request.
+        Returns:
+            str: The ETag header value.
+        """
+        digest = hashlib.blake2b(repr(self.normalize(params)).encode(), digest_size=8).hexdigest()
+        return f'"{self.epoch}-{self.version}-{digest}"'
+
+    def get_or_compute(self, params: Mapping[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for `params`, computing it with `compute` on a miss.
+        Only one thread recomputes a missing key; the others wait and reuse its
+        result. Results computed while a write happened are not stored.
+        Args:
+            params (Mapping[str, Any]): Query parameters of the request.
+            compute (Callable[[], Any]): Function producing the result from the database.
+        Returns:
+            Any: The cached or freshly computed result.
+        """
+        normalized = self.normalize(params)
+        while True:
+            with self._lock:
+                key = (self.version, normalized)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return self._entries[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self._misses += 1
+                    break
+                self._coalesced += 1
+            event.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                if key[0] == self.version:
+                    self._entries[key] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """
+        Return the cache metrics, including the hit rate.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else None,
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against `etag` using weak comparison (RFC 7232).
+    Args:
+        if_none_match (Optional[str]): Raw If-None-Match header value.
+        etag (str): Quoted ETag of the current representation.
+    Returns:
+        bool: True if the client copy is still current.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+recipe_cache = RecipeCache(max_entries=get_settings().recipe_cache_max_entries)
@@ -0,0 +1,202 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from models.models import Recipe
+from schemas.schemas import RecipeCreate
+import anyio
+import json
+import csv
+
+
+FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def resolve_format(content_type: Optional[str], fmt: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the import format ("ndjson" or "csv") from the `format` parameter
+    or, when absent, from the request Content-Type.
+    Returns:
+        Optional[str]: The recognized format, or None if unsupported.
+    """
+    if fmt:
+        return fmt if fmt in ("ndjson", "csv") else None
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS.get(mimetype)
+
+
+def validate_record(record: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate an imported row with RecipeCreate, the schema of `POST /recipes`.
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[str]]: The values ready for
+        insertion and None, or None and the validation error.
+    """
+    try:
+        return RecipeCreate.parse_obj(record).dict(), None
+    except ValidationError as e:
+        return None, str(e)
+
+
+def iter_records(lines: Iterable[bytes], fmt: str) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Parse the request body line by line without holding it in memory.
+    Args:
+        lines (Iterable[bytes]): Raw lines of the request body.
+        fmt (str): "ndjson" or "csv" (with a header row).
+    Yields:
+        Tuple[int, Any, Optional[str]]: Line number, decoded record and the
+        decoding error message, if any.
+    """
+    if fmt == "ndjson":
+        for line_no, raw in enumerate(lines, 1):
+            if not raw.strip():
+                continue
+            try:
+                yield line_no, json.loads(raw), None
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+        return
+
+    decode_errors: List[int] = []
+
+    def decoded() -> Iterator[str]:
+        for line_no, raw in enumerate(lines, 1):
+            try:
+                yield raw.decode("utf-8")
+            except UnicodeDecodeError:
+                decode_errors.append(line_no)
+                yield "\n"
+
+    reader = csv.DictReader(decoded())
+    for row in reader:
+        while decode_errors:
+            yield decode_errors.pop(0), None, "Invalid UTF-8"
+        yield reader.line_num, row, None
+    while decode_errors:
+        yield decode_errors.pop(0), None, "Invalid UTF-8"
+
+
+def import_recipes(
+    session: Session,
+    lines: Iterable[bytes],
+    fmt: str,
+    batch_size: int = 1000,
+    batches_per_commit: int = 50,
+    max_errors: int = 1000,
+    on_commit: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Bulk import recipes from a streamed NDJSON or CSV body.
+    Rows are validated as they arrive and inserted with `executemany` in
+    batches of `batch_size`; the transaction is committed every
+    `batches_per_commit` batches, so memory and journal size stay constant.
+    Args:
+        session (Session): SQLAlchemy session used for the inserts.
+        lines (Iterable[bytes]): Raw lines of the request body.
+        fmt (str): "ndjson" or "csv".
+        batch_size (int): Rows per `executemany`.
+        batches_per_commit (int): Batches per transaction.
+        max_errors (int): Maximum number of detailed errors in the report.
+        on_commit (Optional[Callable[[], Any]]): Called after every commit.
+    Returns:
+        Dict[str, Any]: Report with `inserted`, `failed`, per-row `errors`
+        and `errors_truncated`.
+    """
+    statement = Recipe.__table__.insert()
+    report: Dict[str, Any] = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    batch: List[Dict[str, Any]] = []
+    pending_batches = 0
+
+    def commit() -> None:
+        session.commit()
+        if on_commit is not None:
+            on_commit()
+
+    for line_no, record, error in iter_records(lines, fmt):
+        values = None
+        if error is None:
+            values, error = validate_record(record)
+        if error is not None:
+            report["failed"] += 1
+            if len(report["errors"]) < max_errors:
+                report["errors"].append({"line": line_no, "message": error})
+            else:
+                report["errors_truncated"] = True
+            continue
+
+        batch.append(values)
+        if len(batch) >= batch_size:
+            session.execute(statement, batch)
+            report["inserted"] += len(batch)
+            batch = []
+            pending_batches += 1
+            if pending_batches >= batches_per_commit:
+                commit()
+                pending_batches = 0
+
+    if batch:
+        session.execute(statement, batch)
+        report["inserted"] += len(batch)
+        pending_batches += 1
+    if pending_batches:
+        commit()
+    return report
+
+
+async def import_from_stream(
+    chunks: AsyncIterator[bytes],
+    importer: Callable[[Iterable[bytes]], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Run a blocking `importer` in the threadpool while the request body is still
+    being received. Lines are handed over through a bounded memory stream, so
+    a slow database applies backpressure to the upload instead of buffering it.
+    Args:
+        chunks (AsyncIterator[bytes]): The request body stream.
+        importer (Callable[[Iterable[bytes]], Dict[str, Any]]): Consumes the lines.
+    Returns:
+        Dict[str, Any]: The importer report.
+    """
+    send, receive = anyio.create_memory_object_stream(max_buffer_size=16)
+
+    async def pump() -> None:
+        buffer = b""
+        async with send:
+            try:
+                async for chunk in chunks:
+                    *complete, buffer = (buffer + chunk).split(b"\n")
+                    if complete:
+                        await send.send(complete)
+                if buffer:
+                    await send.send([buffer])
+            except anyio.BrokenResourceError:
+                pass
+
+    def lines() -> Iterator[bytes]:
+        while True:
+            try:
+                yield from anyio.from_thread.run(receive.receive)
+            except anyio.EndOfStream:
+                return
+
+    def consume() -> Dict[str, Any]:
+        try:
+            return importer(lines())
+        finally:
+            anyio.from_thread.run_sync(receive.close)
+
+    error: Optional[Exception] = None
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(pump)
+        try:
+            report = await run_in_threadpool(consume)
+        except Exception as e:
+            error = e
+    if error is not None:
+        raise error
+    return report
@@ -0,0 +1,101 @@
+from typing import Optional
+from sqlalchemy import column, func, select, table
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.orm import Query, Session
+from models.models import Recipe, RECIPE_SEARCH_TABLE, has_ingredient_search
+
+# Fields accepted by `?sort=`; all of them are backed by an index on Recipe.
+SORT_FIELDS = {
+    "id": Recipe.id,
+    "title": Recipe.title,
+    "time_minutes": Recipe.time_minutes,
+}
+
+_search = table(RECIPE_SEARCH_TABLE, column("rowid"), column("ingredients"))
+# SQLite's lower() only folds ASCII, so the prefix is folded the same way.
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def ingredients_filter(session: Session, text: str):
+    """
+    Substring filter on the ingredients, answered by the trigram search table
+    when the database has it and by a plain LIKE otherwise.
+    Args:
+        session (Session): Session the query will run on.
+        text (str): Text the ingredients must contain.
+    Returns:
+        The filter expression.
+    """
+    if has_ingredient_search(session.get_bind()):
+        return Recipe.id.in_(select(_search.c.rowid).where(_search.c.ingredients.contains(text)))
+    return Recipe.ingredients.contains(text)
+
+def recipe_list_query(
+        session: Session,
+        ingredients: Optional[str] = None,
+        min_time: Optional[int] = None,
+        max_time: Optional[int] = None,
+        sort: str = "id"
+    ) -> Query:
+    """
+    Query of `GET /recipes`: optional ingredients and time range filters, sorted by `sort`.
+    Args:
+        session (Session): Session the query will run on.
+        ingredients (Optional[str]): Text the ingredients must contain.
+        min_time (Optional[int]): Minimum preparation time.
+        max_time (Optional[int]): Maximum preparation time.
+        sort (str): A key of `SORT_FIELDS`, prefixed with "-" for descending order.
+    Returns:
+        Query: The recipes query.
+    """
+    query = session.query(Recipe)
+    if ingredients:
+        query = query.filter(ingredients_filter(session, ingredients))
+    if min_time is not None:
+        query = query.filter(Recipe.time_minutes >= min_time)
+    if max_time is not None:
+        query = query.filter(Recipe.time_minutes <= max_time)
+    sort_column = SORT_FIELDS[sort.lstrip("-")]
+    if (min_time is not None or max_time is not None) and sort_column is not Recipe.time_minutes:
+        # Ordering by `+column` (a no-op in SQLite) keeps the planner from answering a
+        # time range by walking the whole rowid or title index in sort order: it
+        # searches the time index and sorts only the matching rows.
+        sort_column = UnaryExpression(sort_column, operator=operators.custom_op("+"))
+    return query.order_by(sort_column.desc() if sort.startswith("-") else sort_column.asc())
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest string greater than every string starting with `prefix`, in
+    code point order (SQLite's BINARY collation over UTF-8).
+    Args:
+        prefix (str): Non-empty prefix.
+    Returns:
+        Optional[str]: The bound, or None when there is none.
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+def title_prefix_query(session: Session, prefix: str, limit: int) -> Query:
+    """
+    Database fallback of `GET /recipes/autocomplete`: titles starting with `prefix`,
+    ignoring ASCII case. A range on `lower(title)` rather than LIKE, so SQLite
+    searches ix_recipes_title_lower and stops after `limit` rows.
+    Args:
+        session (Session): Session the query will run on.
+        prefix (str): Title prefix.
+        limit (int): Maximum number of rows.
+    Returns:
+        Query: `(id, title)` rows ordered by lowercased title.
+    """
+    folded = prefix.translate(_ASCII_LOWER)
+    title = func.lower(Recipe.title)
+    query = session.query(Recipe.id, Recipe.title).filter(title >= folded)
+    upper = prefix_upper_bound(folded)
+    if upper is not None:
+        query = query.filter(title < upper)
+    return query.order_by(title).limit(limit)
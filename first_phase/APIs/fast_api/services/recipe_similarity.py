@@ -0,0 +1,424 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from scipy import sparse
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.models import Recipe
+from settings.config import get_settings
+import numpy as np
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Mutable state swapped in by a background rebuild (see RecipeSimilarityIndex.refresh).
+_STATE = ("_vocabulary", "_idf", "_extra_idf", "_ids", "_alive", "_live", "_base", "_postings",
+          "_term_max", "_pending", "_pending_matrix", "_dead", "max_id", "built_at")
+
+
+def normalize_ingredients(text: str) -> List[str]:
+    """
+    Split an ingredients string on commas into distinct, lowercased names with
+    collapsed whitespace, so "Flour,  eggs" and "flour, Eggs" are the same document.
+    Args:
+        text (str): Ingredients as stored on the recipe.
+    Returns:
+        List[str]: Normalized ingredient names, in first-seen order.
+    """
+    names: Dict[str, None] = {}
+    for part in text.split(","):
+        name = " ".join(part.split()).lower()
+        if name:
+            names[name] = None
+    return list(names)
+
+
+class RecipeSimilarityIndex:
+    """
+    In-memory TF-IDF index of recipe ingredients for "related recipes" lookups.
+    Each recipe is a binary bag of normalized ingredients weighted by IDF and
+    L2-normalized, so the dot product of two rows is their cosine similarity.
+    Rows live in a base CSR matrix plus its transpose (term -> recipes
+    postings); neighbors of a batch of recipes come from one sparse product
+    with the postings, touching only recipes that share an ingredient.
+    Writes are incremental: a created or changed recipe goes to a small
+    pending segment and its old base row is tombstoned. Once pending rows and
+    tombstones exceed `compact_rows` (or a tenth of the base), the base is
+    rebuilt and the IDF weights recomputed; until then new ingredients get the
+    IDF of a term seen once and existing ingredients keep their weights.
+    Staple ingredients appear in most recipes, so a query first scores only
+    the recipes found in the postings of its rarest ingredients (up to
+    `candidate_postings` entries) and skips the full product when the k-th
+    score already beats the best any other recipe could reach through the
+    skipped ingredients (MaxScore); the result is exact either way.
+    Attributes:
+        compact_rows (int): Pending rows plus tombstones that trigger a rebuild.
+        candidate_postings (int): Postings read for the candidate set before falling back.
+        max_id (int): Highest recipe id indexed so far.
+        built_at (float): `time.monotonic()` of the last full build.
+    """
+
+    def __init__(self, compact_rows: int = 10000, candidate_postings: int = 20000) -> None:
+        self.compact_rows = compact_rows
+        self.candidate_postings = candidate_postings
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._vocabulary: Dict[str, int] = {}
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._extra_idf: List[float] = []
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._live = 0
+        self._base = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._postings = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._term_max = np.zeros(0, dtype=np.float32)
+        self._pending: Dict[int, np.ndarray] = {}
+        self._pending_matrix: Optional[Tuple[np.ndarray, sparse.csr_matrix]] = None
+        self._dead = 0
+        self.max_id = 0
+        self.built_at = 0.0
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Replace the index with the given recipes.
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, ingredients)` of every recipe.
+        """
+        ids, indptr, indices, vocabulary = [], [0], [], {}
+        for recipe_id, ingredients in rows:
+            ids.append(recipe_id)
+            indices.extend(vocabulary.setdefault(name, len(vocabulary)) for name in normalize_ingredients(ingredients))
+            indptr.append(len(indices))
+        with self._lock:
+            self._vocabulary = vocabulary
+            self._extra_idf = []
+            self._pending = {}
+            self._rebuild(np.array(ids, dtype=np.int64), np.array(indptr, dtype=np.int64),
+                          np.array(indices, dtype=np.int32))
+            self.max_id = max(ids, default=0)
+            self.built_at = time.monotonic()
+
+    def upsert(self, recipe_id: int, ingredients: str) -> None:
+        """
+        Index a created recipe, or re-index one whose ingredients changed.
+        Args:
+            recipe_id (int): Recipe id.
+            ingredients (str): Current ingredients of the recipe.
+        """
+        self.upsert_many([(recipe_id, ingredients)])
+
+    def upsert_many(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Index several created or changed recipes, compacting at most once.
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, ingredients)` of the recipes.
+        """
+        with self._lock:
+            for recipe_id, ingredients in rows:
+                if self._journal is not None:
+                    self._journal.append((recipe_id, ingredients))
+                self._discard(recipe_id)
+                self._pending[recipe_id] = self._term_ids(normalize_ingredients(ingredients))
+                self.max_id = max(self.max_id, recipe_id)
+            self._pending_matrix = None
+            self._maybe_compact()
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Drop a deleted recipe from the index.
+        Args:
+            recipe_id (int): Recipe id.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((recipe_id, None))
+            if self._discard(recipe_id):
+                self._pending_matrix = None
+                self._maybe_compact()
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._pending or self._row(recipe_id) is not None
+
+    def neighbors(self, recipe_ids: Sequence[int], k: int) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Top-k cosine neighbors of several recipes, computed together.
+        Args:
+            recipe_ids (Sequence[int]): Recipes to find neighbors for; unknown ids are skipped.
+            k (int): Neighbors per recipe.
+        Returns:
+            Dict[int, List[Tuple[int, float]]]: `(id, score)` pairs by decreasing score
+                (ties by id) for every known recipe; recipes sharing no ingredient are left out.
+        """
+        with self._lock:
+            known = [recipe_id for recipe_id in recipe_ids if recipe_id in self]
+            if not known:
+                return {}
+            queries = self._matrix([self._terms(recipe_id) for recipe_id in known])
+            base_queries = queries[:, :self._postings.shape[0]].tocsr()
+            pending_ids, pending = self._pending_rows()
+            pending_scores = (queries @ pending.T).tocsr()
+
+            base = {row: self._pruned(base_queries, row, recipe_id, k) for row, recipe_id in enumerate(known)}
+            full = [row for row, found in base.items() if found is None]
+            if full:
+                # Queries the pruning could not settle share one sparse product.
+                scores = (base_queries[full] @ self._postings).tocsr()
+                for position, row in enumerate(full):
+                    start, stop = scores.indptr[position], scores.indptr[position + 1]
+                    base[row] = self._live_rows(scores.indices[start:stop], scores.data[start:stop])
+
+            results = {}
+            for row, recipe_id in enumerate(known):
+                start, stop = pending_scores.indptr[row], pending_scores.indptr[row + 1]
+                candidate_ids = np.concatenate([base[row][0], pending_ids[pending_scores.indices[start:stop]]])
+                scores = np.concatenate([base[row][1], pending_scores.data[start:stop]])
+                mask = candidate_ids != recipe_id
+                results[recipe_id] = _top_k(candidate_ids[mask], scores[mask], k)
+            return results
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Index size counters.
+        Returns:
+            Dict[str, int]: Indexed recipes, pending rows, tombstones, vocabulary size and
+                approximate memory of the sparse matrices in bytes.
+        """
+        with self._lock:
+            matrices = (self._base, self._postings)
+            memory = sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+            return {
+                "recipes": self._live + len(self._pending),
+                "pending": len(self._pending),
+                "tombstones": self._dead,
+                "vocabulary": len(self._vocabulary),
+                "memory_bytes": int(memory + self._ids.nbytes + self._alive.nbytes),
+            }
+
+    def refresh(self, load: Callable[[], Iterable[Tuple[int, str]]], max_age: float) -> None:
+        """
+        Rebuild the index in a background thread when the last build is older
+        than `max_age` seconds, to pick up writes made by other processes.
+        Writes applied meanwhile are journaled and replayed on the new index.
+        Args:
+            load (Callable[[], Iterable[Tuple[int, str]]]): Returns `(id, ingredients)` of every recipe.
+            max_age (float): Seconds between rebuilds; 0 disables them.
+        """
+        with self._lock:
+            if max_age <= 0 or self._refreshing or time.monotonic() - self.built_at < max_age:
+                return
+            self._refreshing = True
+            self._journal = []
+
+        def rebuild() -> None:
+            try:
+                fresh = RecipeSimilarityIndex(self.compact_rows, self.candidate_postings)
+                fresh.build(load())
+                with self._lock:
+                    for recipe_id, ingredients in self._journal:
+                        if ingredients is None:
+                            fresh.remove(recipe_id)
+                        else:
+                            fresh.upsert(recipe_id, ingredients)
+                    for name in _STATE:
+                        setattr(self, name, getattr(fresh, name))
+            except Exception:
+                logger.exception("Recipe similarity index refresh failed")
+            finally:
+                with self._lock:
+                    self._journal = None
+                    self._refreshing = False
+                    self.built_at = max(self.built_at, time.monotonic())
+
+        threading.Thread(target=rebuild, name="recipe-similarity-refresh", daemon=True).start()
+
+    def _pruned(self, queries: sparse.csr_matrix, row: int, recipe_id: int, k: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # Exact base scores of the recipes sharing the query's rarest terms, read one term
+        # at a time until no other recipe can enter the top k; None when that needs
+        # more than four times `candidate_postings` postings.
+        start, stop = queries.indptr[row], queries.indptr[row + 1]
+        if start == stop:
+            return None
+        terms, weights = queries.indices[start:stop], queries.data[start:stop]
+        indptr = self._postings.indptr
+        order = np.argsort(indptr[terms + 1] - indptr[terms], kind="stable")
+        terms, weights = terms[order], weights[order]
+        # Most a recipe sharing none of terms[:i] can score through terms[i:]: bounded by
+        # the terms' largest weights and, rows being unit vectors, by the weights' norm.
+        bounds = np.minimum(
+            np.cumsum((weights * self._term_max[terms])[::-1])[::-1],
+            np.sqrt(np.cumsum((weights ** 2)[::-1])[::-1]),
+        )
+        query = np.zeros(self._postings.shape[0], dtype=np.float32)
+        query[terms] = weights
+        seen = np.zeros(len(self._ids), dtype=bool)
+        ids, scores, best = [], [], np.zeros(0, dtype=np.float32)
+        read = 0
+        for position, term in enumerate(terms):
+            rows = self._postings.indices[indptr[term]:indptr[term + 1]]
+            read += len(rows)
+            if read > 4 * self.candidate_postings and position > 0:
+                return None
+            rows = rows[~seen[rows]]
+            seen[rows] = True
+            rows = rows[self._alive[rows]]
+            ids.append(self._ids[rows])
+            scores.append(_row_dot(self._base, rows, query))
+            best = np.concatenate([best, scores[-1][ids[-1] != recipe_id]])
+            if len(best) > k:
+                best = np.partition(best, len(best) - k)[len(best) - k:]
+            if position + 1 == len(terms) or (len(best) == k and best.min() >= bounds[position + 1]):
+                break
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def _live_rows(self, rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keep = self._alive[rows]
+        return self._ids[rows[keep]], np.asarray(scores)[keep]
+
+    def _term_ids(self, names: List[str]) -> np.ndarray:
+        # New ingredients get the IDF of a term found in a single recipe until the next rebuild.
+        terms = []
+        for name in names:
+            term = self._vocabulary.get(name)
+            if term is None:
+                term = self._vocabulary[name] = len(self._vocabulary)
+                self._extra_idf.append(float(np.log((1 + self._live + len(self._pending)) / 2) + 1))
+            terms.append(term)
+        return np.array(terms, dtype=np.int32)
+
+    def _weights(self) -> np.ndarray:
+        if self._extra_idf:
+            self._idf = np.concatenate([self._idf, np.array(self._extra_idf, dtype=np.float32)])
+            self._extra_idf = []
+        return self._idf
+
+    def _terms(self, recipe_id: int) -> np.ndarray:
+        if recipe_id in self._pending:
+            return self._pending[recipe_id]
+        row = self._row(recipe_id)
+        return self._base.indices[self._base.indptr[row]:self._base.indptr[row + 1]]
+
+    def _matrix(self, rows: List[np.ndarray]) -> sparse.csr_matrix:
+        # L2-normalized IDF rows over the current vocabulary.
+        idf = self._weights()
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(terms) for terms in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        matrix = sparse.csr_matrix((idf[indices], indices, indptr), shape=(len(rows), len(idf)), dtype=np.float32)
+        return _normalize_rows(matrix)
+
+    def _pending_rows(self) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        if self._pending_matrix is None or self._pending_matrix[1].shape[1] != len(self._vocabulary):
+            ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+            self._pending_matrix = (ids, self._matrix(list(self._pending.values())))
+        return self._pending_matrix
+
+    def _discard(self, recipe_id: int) -> bool:
+        if self._pending.pop(recipe_id, None) is not None:
+            return True
+        row = self._row(recipe_id)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._live -= 1
+        self._dead += 1
+        return True
+
+    def _row(self, recipe_id: int) -> Optional[int]:
+        # Base rows are sorted by recipe id; tombstoned rows no longer count.
+        row = int(np.searchsorted(self._ids, recipe_id))
+        if row < len(self._ids) and self._ids[row] == recipe_id and self._alive[row]:
+            return row
+        return None
+
+    def _maybe_compact(self) -> None:
+        if len(self._pending) + self._dead <= max(self.compact_rows, self._live // 10):
+            return
+        live = self._base[self._alive]
+        pending_ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        pending_terms = list(self._pending.values())
+        indptr = np.concatenate([live.indptr, live.indptr[-1] + np.cumsum([len(terms) for terms in pending_terms], dtype=np.int64)])
+        indices = np.concatenate([live.indices] + pending_terms).astype(np.int32)
+        self._pending = {}
+        self._rebuild(np.concatenate([self._ids[self._alive], pending_ids]), indptr, indices)
+
+    def _rebuild(self, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> None:
+        # Recompute IDF over the live recipes and store the normalized rows, sorted by
+        # recipe id, and their postings.
+        vocabulary_size = len(self._vocabulary)
+        document_frequency = np.bincount(indices, minlength=vocabulary_size)
+        self._idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self._extra_idf = []
+        matrix = sparse.csr_matrix((self._idf[indices], indices, indptr), shape=(len(ids), vocabulary_size), dtype=np.float32)
+        order = np.argsort(ids, kind="stable")
+        if np.any(order != np.arange(len(ids))):
+            ids, matrix = ids[order], matrix[order]
+        self._base = _normalize_rows(matrix)
+        self._postings = self._base.T.tocsr()
+        self._term_max = np.zeros(vocabulary_size, dtype=np.float32)
+        used = np.flatnonzero(np.diff(self._postings.indptr))
+        if len(used):
+            self._term_max[used] = np.maximum.reduceat(self._postings.data, self._postings.indptr[used])
+        self._ids = ids
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._live = len(ids)
+        self._pending_matrix = None
+        self._dead = 0
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+def _row_dot(matrix: sparse.csr_matrix, rows: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    # matrix[rows] @ vector straight from the CSR arrays, without building the submatrix.
+    starts = matrix.indptr[rows]
+    lengths = matrix.indptr[rows + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+    products = matrix.data[positions] * vector[matrix.indices[positions]]
+    scores = np.zeros(len(rows), dtype=np.float32)
+    nonempty = lengths > 0
+    if len(products):
+        scores[nonempty] = np.add.reduceat(products, offsets[nonempty])
+    return scores
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    if len(ids) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))
+    return [(int(ids[i]), round(float(scores[i]), 6)) for i in order]
+
+
+def recipe_ingredients(chunk_rows: int = 10000) -> Iterator[Tuple[int, str]]:
+    """
+    Stream `(id, ingredients)` of every recipe, in id order, from an own session.
+    Args:
+        chunk_rows (int): Rows fetched per round trip.
+    Yields:
+        Tuple[int, str]: Recipe id and ingredients.
+    """
+    session = SessionLocal()
+    try:
+        yield from session.query(Recipe.id, Recipe.ingredients).order_by(Recipe.id).yield_per(chunk_rows)
+    finally:
+        session.close()
+
+
+def index_new_recipes(session: Session) -> None:
+    """
+    Index recipes inserted without going through the index (bulk import): every
+    id above the highest one indexed so far.
+    Args:
+        session (Session): SQLAlchemy session that sees the committed rows.
+    """
+    rows = session.query(Recipe.id, Recipe.ingredients).filter(Recipe.id > similarity_index.max_id).order_by(Recipe.id)
+    similarity_index.upsert_many(rows.yield_per(10000))
+
+
+settings = get_settings()
+similarity_index = RecipeSimilarityIndex(settings.similar_compact_rows, settings.similar_candidate_postings)
@@ -0,0 +1,46 @@
+from typing import Iterable, Iterator, Sequence, Tuple, Any
+import orjson
+
+
+def encode_rows(rows: Iterable[Tuple[Any, ...]], fields: Sequence[str]) -> bytes:
+    """
+    Encode trusted database rows as a JSON array with orjson.
+    Rows read from our own tables already match the response schema, so they
+    skip pydantic validation and are encoded straight from column tuples.
+    Args:
+        rows (Iterable[Tuple[Any, ...]]): Database rows, in the order of `fields`.
+        fields (Sequence[str]): Key names of each object.
+    Returns:
+        bytes: The encoded JSON array.
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def iter_json_array(
+    rows: Iterable[Tuple[Any, ...]],
+    fields: Sequence[str],
+    chunk_rows: int = 1000,
+) -> Iterator[bytes]:
+    """
+    Serialize rows as a JSON array of objects, one chunk at a time.
+    Each chunk of `chunk_rows` rows is emitted as soon as it is ready, so peak
+    memory does not depend on the size of the result.
+    Args:
+        rows (Iterable[Tuple[Any, ...]]): Database rows, in the order of `fields`.
+        fields (Sequence[str]): Key names of each object.
+        chunk_rows (int): Rows per emitted chunk.
+    Yields:
+        bytes: Fragments of the JSON array.
+    """
+    yield b"["
+    chunk = []
+    separator = b""
+    for row in rows:
+        chunk.append(dict(zip(fields, row)))
+        if len(chunk) >= chunk_rows:
+            yield separator + orjson.dumps(chunk)[1:-1]
+            separator = b","
+            chunk = []
+    if chunk:
+        yield separator + orjson.dumps(chunk)[1:-1]
+    yield b"]"
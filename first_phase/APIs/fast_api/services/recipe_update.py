@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from models.models import Recipe
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse an `If-Match` header into the versions an update may apply to.
+    Comparison is strong, as `If-Match` requires: weak tags and values that
+    are not versions never match.
+    Returns:
+        Optional[List[int]]: None when the header is absent or `*` (any version
+        will do); otherwise the accepted versions, possibly empty.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def conditional_update(
+    session: Session,
+    recipe_id: int,
+    values: Dict[str, Any],
+    versions: Optional[List[int]] = None,
+) -> Tuple[str, Optional[int]]:
+    """
+    Update a recipe with a single `UPDATE ... WHERE id = ? AND version IN (...)
+    RETURNING version` that bumps the version, with no prior SELECT and no lock.
+    Only when no row changed does an extra query tell a missing recipe apart
+    from a version conflict. The caller commits.
+    Args:
+        session (Session): SQLAlchemy session.
+        recipe_id (int): The recipe id.
+        values (Dict[str, Any]): Fields to change.
+        versions (Optional[List[int]]): Accepted versions (from `If-Match`);
+            None updates any version.
+    Returns:
+        Tuple[str, Optional[int]]: "updated" with the new version, "conflict"
+        with the current version, or "not_found" with None.
+    """
+    table = Recipe.__table__
+    statement = update(table).where(table.c.id == recipe_id)
+    if versions is not None:
+        statement = statement.where(table.c.version.in_(versions))
+    statement = statement.values(version=table.c.version + 1, **values).returning(table.c.version)
+
+    new_version = session.execute(statement).scalar()
+    if new_version is not None:
+        return "updated", new_version
+    current = session.execute(select(table.c.version).where(table.c.id == recipe_id)).scalar()
+    return ("not_found", None) if current is None else ("conflict", current)
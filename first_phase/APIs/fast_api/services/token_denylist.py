@@ -0,0 +1,158 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.models import RevokedToken
+from settings.config import get_settings
+import threading
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings, using double hashing on Python's
+    `hash()`. The filter only lives in process memory and is rebuilt on every
+    start, so the per-process hash seed does not matter. The bit count is
+    rounded up to a power of two so positions are masked instead of reduced
+    modulo the size.
+    Attributes:
+        capacity (int): Number of keys the filter is sized for.
+        size (int): Number of bits.
+        probes (int): Bits set per key.
+        count (int): Keys added so far.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        optimal = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = 1 << max(6, (optimal - 1).bit_length())
+        self.mask = self.size - 1
+        self.probes = max(1, round(optimal / capacity * math.log(2)))
+        self.capacity = capacity
+        self.bits = bytearray(self.size >> 3)
+        self.count = 0
+
+    def add(self, key: str) -> None:
+        """
+        Set the bits of `key`.
+        Args:
+            key (str): Key to add.
+        """
+        h = hash(key)
+        step = h >> 32 | 1
+        for i in range(self.probes):
+            position = (h + i * step) & self.mask
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        # A key that was never added usually stops at the first or second clear bit.
+        h = hash(key)
+        step = h >> 32 | 1
+        bits, mask = self.bits, self.mask
+        for i in range(self.probes):
+            position = (h + i * step) & mask
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+
+class TokenDenylist:
+    """
+    Revoked JWT ids, persisted in the `revoked_tokens` table and mirrored in an
+    in-memory bloom filter. A token that was never revoked (the common case) is
+    answered by the filter alone; only a filter hit, which may be a false
+    positive, queries the table. `load` rebuilds the filter from the table
+    (on startup and periodically, dropping expired revocations) and `sync`
+    picks up revocations made by other workers since the last read.
+    Attributes:
+        capacity (int): Minimum number of revocations the filter is sized for.
+        error_rate (float): Target false positive rate of the filter.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Check whether the token with id `jti` was revoked.
+        Args:
+            jti (str): The `jti` claim of the token.
+        Returns:
+            bool: True if the token is in the denylist.
+        """
+        if jti not in self._filter:
+            return False
+        db = SessionLocal()
+        try:
+            return db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+        finally:
+            db.close()
+
+    def revoke(self, db: Session, jti: str, expires_at: Optional[datetime]) -> None:
+        """
+        Persist the revocation, then add it to the filter. Writing first means a
+        concurrent `load` either reads the row or is followed by the filter add.
+        Args:
+            db (Session): Database session; the revocation is committed.
+            jti (str): The `jti` claim of the token.
+            expires_at (Optional[datetime]): Token expiry (UTC); the row is pruned after it.
+        """
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Already revoked.
+            db.rollback()
+        with self._lock:
+            self._filter.add(jti)
+
+    def load(self, engine: Engine) -> None:
+        """
+        Rebuild the filter from the table, after deleting revocations of tokens
+        that already expired (those are rejected by their own `exp`).
+        Args:
+            engine (Engine): Engine of the database holding the denylist.
+        """
+        with self._lock, engine.begin() as connection:
+            connection.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+            rows = connection.execute(select(RevokedToken.id, RevokedToken.jti)).all()
+            bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            for _, jti in rows:
+                bloom.add(jti)
+            self._filter = bloom
+            self._last_id = max((row_id for row_id, _ in rows), default=self._last_id)
+        logger.info("Token denylist loaded with %s revoked tokens", len(rows))
+
+    def sync(self, engine: Engine) -> None:
+        """
+        Add the revocations written since the last read (ids only grow). The
+        filter is rebuilt, twice as large, once it holds more than its capacity.
+        Args:
+            engine (Engine): Engine of the database holding the denylist.
+        """
+        with self._lock:
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self._last_id)
+                ).all()
+            for row_id, jti in rows:
+                self._filter.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            grow = self._filter.count > self._filter.capacity
+        if grow:
+            self.load(engine)
+
+
+settings = get_settings()
+token_denylist = TokenDenylist(settings.revocation_bloom_capacity, settings.revocation_bloom_error_rate)
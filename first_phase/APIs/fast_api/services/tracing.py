@@ -0,0 +1,254 @@
+from typing import Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from collections import Counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from settings.config import get_settings
+import threading
+import logging
+import random
+import json
+import time
+import uuid
+import re
+
+
+logger = logging.getLogger(__name__)
+
+# Collapses `IN (?, ?, ...)` lists of different sizes into one statement shape.
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class Trace:
+    """
+    State of one traced request.
+    Attributes:
+        trace_id (str): The trace identifier.
+        sampled (bool): Whether spans are exported (decided when the request starts).
+        spans (List[Dict[str, Any]]): Finished spans.
+        statements (Counter): Executions per SQL statement shape, for the N+1 detector.
+        stack (List[str]): Ids of the open spans; the top is the parent of new spans.
+        start (float): Request start (epoch).
+        began (float): Request start (`perf_counter`), for the duration.
+    """
+
+    __slots__ = ("trace_id", "sampled", "spans", "statements", "stack", "start", "began")
+
+    def __init__(self, sampled: bool) -> None:
+        self.start, self.began = time.time(), time.perf_counter()
+        self.trace_id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.spans: List[Dict[str, Any]] = []
+        self.statements: Counter = Counter()
+        self.stack: List[str] = []
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _record(trace: Trace, span_id: str, parent_id: Optional[str], name: str,
+            start: float, duration: float, attributes: Dict[str, Any]) -> None:
+    trace.spans.append({
+        "trace_id": trace.trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "name": name,
+        "start": start,
+        "duration_ms": round(duration * 1000, 3),
+        "attributes": attributes,
+    })
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Open a child span of the current span, e.g. around password hashing.
+    Does nothing unless a sampled trace is in progress.
+    Args:
+        name (str): The span name.
+        **attributes (Any): Attributes stored on the span.
+    """
+    trace = _current.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    span_id = _new_span_id()
+    parent_id = trace.stack[-1] if trace.stack else None
+    trace.stack.append(span_id)
+    start, began = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stack.pop()
+        _record(trace, span_id, parent_id, name, start, time.perf_counter() - began, attributes)
+
+
+class JsonLinesExporter:
+    """
+    Append spans to a JSON-lines file, one write per trace.
+    Attributes:
+        path (str): The file path; opened on first use.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(item, ensure_ascii=False, default=str) + "\n" for item in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+
+class Tracer:
+    """
+    Lightweight per-request tracing: one root span per request with child
+    spans for every SQL statement (through engine events) and for blocks
+    wrapped in `span()`.
+    Sampling is decided when the request starts. Unsampled requests only count
+    SQL statements per shape (with `IN` lists collapsed) for the N+1 detector,
+    which logs a warning when one shape runs more than `n_plus_one_threshold`
+    times in a request.
+    Attributes:
+        sample_rate (float): Fraction (0 to 1) of requests whose spans are exported.
+        n_plus_one_threshold (int): Executions of one statement shape above which a request is flagged.
+        exporter (JsonLinesExporter): Where spans are written.
+    """
+
+    def __init__(self, sample_rate: float, trace_file: str, n_plus_one_threshold: int) -> None:
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.exporter = JsonLinesExporter(trace_file)
+
+    def start_trace(self) -> Token:
+        """
+        Start the trace of a request and decide whether it is sampled.
+        Returns:
+            Token: To be passed back to `end_trace`.
+        """
+        trace = Trace(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+        if trace.sampled:
+            trace.stack.append(_new_span_id())
+        return _current.set(trace)
+
+    def end_trace(self, token: Token, name: str, attributes: Dict[str, Any]) -> None:
+        """
+        Finish the trace: run the N+1 detector and export the spans if sampled.
+        Args:
+            token (Token): Returned by `start_trace`.
+            name (str): Name of the root span.
+            attributes (Dict[str, Any]): Attributes of the root span.
+        """
+        trace = _current.get()
+        _current.reset(token)
+        if trace is None:
+            return
+
+        repeated = [
+            {"statement": statement, "count": count}
+            for statement, count in trace.statements.items()
+            if count > self.n_plus_one_threshold
+        ]
+        if repeated:
+            attributes["n_plus_one"] = repeated
+            for item in repeated:
+                logger.warning("Possible N+1 in %s: statement ran %s times: %s", name, item["count"], item["statement"])
+
+        if trace.sampled:
+            attributes["db.statements"] = sum(1 for item in trace.spans if item["name"] == "db.query")
+            _record(trace, trace.stack[0], None, name, trace.start, time.perf_counter() - trace.began, attributes)
+            try:
+                self.exporter.export(trace.spans)
+            except OSError as e:
+                logger.error("Error exporting trace %s: %s", trace.trace_id, e)
+
+    def current_trace_id(self) -> Optional[str]:
+        """
+        Return the id of the current trace if it is sampled.
+        """
+        trace = _current.get()
+        return trace.trace_id if trace is not None and trace.sampled else None
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """
+        Register the engine events that emit one span per SQL statement.
+        Args:
+            engine (Engine): The engine to instrument.
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current.get() is not None:
+                conn.info.setdefault("trace_started", []).append((time.time(), time.perf_counter()))
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            trace = _current.get()
+            if trace is None or not conn.info.get("trace_started"):
+                return
+            start, began = conn.info["trace_started"].pop()
+            statement = _SPACES.sub(" ", statement).strip()
+            if not executemany:
+                # executemany batches are bulk inserts, not N+1 queries
+                trace.statements[_IN_LIST.sub("(?)", statement)] += 1
+            if trace.sampled:
+                attributes: Dict[str, Any] = {"db.statement": statement}
+                if executemany:
+                    attributes["db.rows"] = len(parameters)
+                parent_id = trace.stack[-1] if trace.stack else None
+                _record(trace, _new_span_id(), parent_id, "db.query", start, time.perf_counter() - began, attributes)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that wraps every HTTP request in a trace. The trace ends
+    after the response body is sent, so streamed queries are included.
+    Sampled responses carry an `X-Trace-Id` header.
+    """
+
+    def __init__(self, app, tracer: Tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = self.tracer.start_trace()
+        trace_id = self.tracer.current_trace_id()
+        status_code = 500
+
+        async def send_with_trace(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trace_id is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            attributes = {
+                "http.method": scope["method"],
+                "http.path": scope["path"],
+                "http.status": status_code,
+            }
+            route = scope.get("route")
+            name = f"{scope['method']} {route.path if route is not None else scope['path']}"
+            self.tracer.end_trace(token, name, attributes)
+
+
+settings = get_settings()
+tracer = Tracer(settings.trace_sample_rate, settings.trace_file, settings.trace_n_plus_one_threshold)
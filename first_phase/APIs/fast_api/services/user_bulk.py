@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Sequence, Tuple
+from passlib.hash import bcrypt
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.models import User
+from services.tracing import span
+
+
+def _chunks(items: Sequence[Tuple[str, str]], size: int) -> Iterator[Sequence[Tuple[str, str]]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def provision_users(
+    session: Session,
+    users: List[Tuple[str, str]],
+    workers: int = 4,
+    batch_size: int = 500,
+) -> Dict[str, str]:
+    """
+    Create users in bulk: password hashing in parallel, inserts in batches.
+    bcrypt dominates the cost and releases the GIL, so each batch is hashed on
+    a thread pool and then written with a single
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING username`. Existing usernames
+    are detected by the UNIQUE index, without a prior SELECT. The caller commits.
+    Args:
+        session (Session): SQLAlchemy session.
+        users (List[Tuple[str, str]]): (username, plain-text password) pairs.
+        workers (int): Threads used to hash passwords.
+        batch_size (int): Users per INSERT.
+    Returns:
+        Dict[str, str]: Status per username, "created" or "exists". Usernames
+        repeated in the request are created once, with the first password.
+    """
+    status: Dict[str, str] = {}
+    unique: List[Tuple[str, str]] = []
+    for username, password in users:
+        if username not in status:
+            status[username] = "exists"
+            unique.append((username, password))
+
+    table = User.__table__
+    statement = insert(table).on_conflict_do_nothing(index_elements=["username"]).returning(table.c.username)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk in _chunks(unique, batch_size):
+            with span("password.hash", count=len(chunk), workers=workers):
+                hashes = list(executor.map(bcrypt.hash, [password for _, password in chunk]))
+            rows = [{"username": username, "password": hashed} for (username, _), hashed in zip(chunk, hashes)]
+            for username in session.execute(statement, rows).scalars():
+                status[username] = "created"
+    return status
@@ -1,7 +1,38 @@
 from pydantic import BaseModel
+from typing import List
+import os
 
 class Settings(BaseModel):
     authjwt_secret_key: str = "your-jwt-secret-key" 
+    authjwt_denylist_enabled: bool = True
+    authjwt_denylist_token_checks: set = {"access", "refresh"}
+    recipe_cache_max_entries: int = 256
+    recipe_import_batch_size: int = 1000
+    recipe_import_batches_per_commit: int = 50
+    recipe_import_max_errors: int = 1000
+    recipe_batch_max_items: int = 1000
+    recipe_stream_chunk_rows: int = 1000
+    similar_max_k: int = 100
+    similar_compact_rows: int = 10000
+    similar_candidate_postings: int = 20000
+    similar_refresh_seconds: float = float(os.getenv("SIMILAR_REFRESH_SECONDS", "0"))
+    autocomplete_max_limit: int = 50
+    autocomplete_max_bytes: int = int(os.getenv("AUTOCOMPLETE_MAX_BYTES", str(512 * 1024 * 1024)))
+    autocomplete_refresh_seconds: float = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "0"))
+    admin_usernames: List[str] = [name for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name]
+    user_bulk_max_items: int = 10000
+    user_bulk_batch_size: int = 500
+    user_hash_workers: int = os.cpu_count() or 1
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    trace_file: str = os.getenv("TRACE_FILE", "traces.jsonl")
+    trace_n_plus_one_threshold: int = 10
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "profiles")
+    profile_max_files: int = int(os.getenv("PROFILE_MAX_FILES", "100"))
+    revocation_bloom_capacity: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    revocation_bloom_error_rate: float = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+    revocation_sync_seconds: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    revocation_reload_seconds: float = float(os.getenv("REVOCATION_RELOAD_SECONDS", "3600"))
 
 def get_settings():
     return Settings()
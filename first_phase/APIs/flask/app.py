@@ -1,31 +1,41 @@
 import logging
 from flask import Flask
 from flask_jwt_extended import JWTManager
-from flasgger import Swagger
-from settings.config import Config
+from settings.config import get_config
+from settings.logging_config import configure_logging
+from settings.tracing import tracer
+from settings.profiling import profiler
 
-from models.models import db
+from models.models import db, upgrade_recipe_schema
 from routes.user_routes import register_user_routes
 from routes.recipe_routes import recipe_bp
+from routes.docs_routes import register_docs
+from services.recipe_cache import recipe_cache
+from services.recipe_similarity import similarity_index, recipe_ingredients
+from services.recipe_autocomplete import title_index, recipe_titles
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config(config_name))
 
-    logging.basicConfig(
-        level=logging.INFO,  
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    )
+    configure_logging(app)
     logger = logging.getLogger(__name__)
     logger.info("Starting Flask application...")
 
     db.init_app(app)
+    tracer.init_app(app)
+    with app.app_context():
+        tracer.instrument_engine(db.engine)
+    profiler.init_app(app)
+    recipe_cache.init_app(app)
+    similarity_index.init_app(app)
+    title_index.init_app(app)
 
     JWTManager(app)
-    Swagger(app)
 
     register_user_routes(app)
     app.register_blueprint(recipe_bp)
+    register_docs(app)
 
     logger.info("Flask application setup complete.")
     return app
@@ -36,5 +46,8 @@ app = create_app()
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        upgrade_recipe_schema(db.engine)
         app.logger.info("Database tables created.")
+        similarity_index.build(recipe_ingredients(db.engine))
+        title_index.build(recipe_titles(db.engine))
     app.run(debug=True, port=5000)
@@ -0,0 +1,113 @@
+"""
+Benchmark de vazão da API Flask servida pelo gunicorn com 1..N workers.
+
+Popula um banco SQLite temporário (modo WAL), sobe `gunicorn -c gunicorn.conf.py`
+para cada quantidade de workers e mede requisições por segundo de
+`GET /recipes/?stream=true` com faixas de tempo aleatórias, que ignoram o cache
+e exercitam banco e serialização. A carga vem de processos clientes separados,
+para que o cliente não seja o gargalo.
+
+Execute a partir do diretório flask:
+    python -m benchmarks.bench_workers --workers 1 2 4 --clients 16
+"""
+from http.client import HTTPConnection
+from multiprocessing import Pool
+from typing import List, Tuple
+import subprocess
+import argparse
+import tempfile
+import random
+import socket
+import time
+import sys
+import os
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed(database_url: str, rows: int) -> None:
+    os.environ['DATABASE_URL'] = database_url
+    from app import app
+    from models.models import db, Recipe, configure_sqlite
+    with app.app_context():
+        configure_sqlite(db.engine)
+        db.create_all()
+        db.session.execute(Recipe.__table__.insert(), [
+            {'title': f'Recipe {i}', 'ingredients': 'Flour, Eggs, Milk', 'time_minutes': i % 120}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/recipes/?max_time=0')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+
+def client(args: Tuple[int, float, int]) -> int:
+    port, duration, seed_value = args
+    rng = random.Random(seed_value)
+    connection = HTTPConnection('127.0.0.1', port)
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = rng.randrange(0, 110)
+        connection.request('GET', f'/recipes/?stream=true&min_time={start}&max_time={start + 2}')
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f'Unexpected status {response.status}')
+        done += 1
+    return done
+
+
+def run(workers: int, threads: int, clients: int, duration: float, database_url: str) -> float:
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads), BIND=f'127.0.0.1:{port}', LOG_LEVEL='WARNING')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        with Pool(clients) as pool:
+            total = sum(pool.map(client, [(port, duration, i) for i in range(clients)]))
+        return total / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        seed(database_url, args.rows)
+        print(f'cpus={os.cpu_count()} rows={args.rows} threads={args.threads} clients={args.clients}')
+        results: List[Tuple[int, float]] = []
+        for workers in args.workers:
+            throughput = run(workers, args.threads, args.clients, args.duration, database_url)
+            results.append((workers, throughput))
+            print(f'workers={workers:<3} {throughput:8.1f} req/s  ({throughput / results[0][1]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+# Configuração do gunicorn para a API Flask; valores ajustáveis por variáveis de ambiente.
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+# Importa a aplicação no mestre: schema e WAL são preparados uma vez e a versão
+# do cache de receitas fica em memória compartilhada com todos os workers.
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+
+
+def post_fork(server, worker):
+    from wsgi import reset_after_fork
+    reset_after_fork()
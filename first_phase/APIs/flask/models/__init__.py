@@ -1,3 +1,3 @@
-from .models import db, User, Recipe, BaseModel
+from .models import db, User, Recipe, BaseModel, configure_sqlite, upgrade_recipe_schema
 
-__all__ = ['db', 'User', 'Recipe', 'BaseModel']
+__all__ = ['db', 'User', 'Recipe', 'BaseModel', 'configure_sqlite', 'upgrade_recipe_schema']
@@ -1,6 +1,12 @@
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Connection, Engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
 from flask_sqlalchemy import SQLAlchemy
-from typing import Any
+from typing import Any, Dict, Union
+import logging
+
+logger = logging.getLogger(__name__)
 
 db = SQLAlchemy()
 
@@ -40,8 +46,149 @@ class Recipe(BaseModel):
         title (str): Título da receita.
         ingredients (str): Ingredientes necessários para a receita.
         time_minutes (int): Tempo estimado de preparo em minutos.
+        version (int): Versão da linha, incrementada a cada alteração; usada
+            no controle de concorrência otimista (`If-Match`).
+
+    Índices:
+        ix_recipe_time_minutes: filtros por faixa de tempo (`min_time`/`max_time`)
+            e ordenação por tempo de preparo.
+        ix_recipe_title_time_minutes: ordenação por título, avaliando o filtro
+            de tempo direto no índice.
+        ix_recipe_title_lower: faixas de prefixo do título, sem diferenciar
+            maiúsculas, da consulta de reserva do autocomplete.
+        recipe_fts: índice FTS5 por trigramas de `ingredients` (ver
+            `upgrade_recipe_schema`), que atende o filtro por trecho sem varrer a tabela.
     """
     __tablename__ = 'recipe'
+    __table_args__ = (
+        db.Index('ix_recipe_time_minutes', 'time_minutes'),
+        db.Index('ix_recipe_title_time_minutes', 'title', 'time_minutes'),
+    )
     title: Mapped[str] = mapped_column(db.String(120), nullable=False)
     ingredients: Mapped[str] = mapped_column(db.Text, nullable=False)
     time_minutes: Mapped[int] = mapped_column(db.Integer, nullable=False)
+    version: Mapped[int] = mapped_column(db.Integer, nullable=False, default=1, server_default='1')
+
+
+db.Index('ix_recipe_title_lower', db.func.lower(Recipe.title))
+
+
+RECIPE_SEARCH_TABLE = 'recipe_fts'
+# Tabela FTS5 de conteúdo externo sobre recipe.ingredients, mantida por triggers. O
+# tokenizador trigram permite que `LIKE '%texto%'` nela use o índice (SQLite 3.34+).
+_RECIPE_SEARCH_DDL = {
+    RECIPE_SEARCH_TABLE: f"""
+        CREATE VIRTUAL TABLE {RECIPE_SEARCH_TABLE}
+        USING fts5(ingredients, content='recipe', content_rowid='id', tokenize='trigram')""",
+    f'{RECIPE_SEARCH_TABLE}_ai': f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_ai AFTER INSERT ON recipe BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END""",
+    f'{RECIPE_SEARCH_TABLE}_ad': f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_ad AFTER DELETE ON recipe BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+        END""",
+    f'{RECIPE_SEARCH_TABLE}_au': f"""
+        CREATE TRIGGER {RECIPE_SEARCH_TABLE}_au AFTER UPDATE OF ingredients ON recipe BEGIN
+            INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}, rowid, ingredients) VALUES ('delete', old.id, old.ingredients);
+            INSERT INTO {RECIPE_SEARCH_TABLE}(rowid, ingredients) VALUES (new.id, new.ingredients);
+        END""",
+}
+_search_ready: Dict[str, bool] = {}
+
+
+def has_ingredient_search(bind: Union[Engine, Connection]) -> bool:
+    """
+    Indica se o banco tem a tabela de busca por ingredientes; verificado uma
+    vez por banco.
+
+    Args:
+        bind (Union[Engine, Connection]): Engine ou conexão do banco.
+
+    Returns:
+        bool: True se `RECIPE_SEARCH_TABLE` existe.
+    """
+    engine = bind.engine
+    key = str(engine.url)
+    if key not in _search_ready:
+        if engine.dialect.name != 'sqlite':
+            _search_ready[key] = False
+        else:
+            with engine.connect() as connection:
+                _search_ready[key] = connection.execute(
+                    text('SELECT 1 FROM sqlite_master WHERE name = :name'), {'name': RECIPE_SEARCH_TABLE}
+                ).first() is not None
+    return _search_ready[key]
+
+
+def upgrade_recipe_search(engine: Engine) -> None:
+    """
+    Cria a tabela de busca por ingredientes e seus triggers que faltarem e a
+    reindexa quando algo precisou ser criado. Sem FTS5 ou sem o tokenizador
+    trigram no SQLite, nada é criado e o filtro continua com LIKE.
+
+    Args:
+        engine (Engine): Engine do banco a atualizar.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    try:
+        with engine.begin() as connection:
+            existing = {row[0] for row in connection.execute(
+                text('SELECT name FROM sqlite_master WHERE name LIKE :prefix'), {'prefix': f'{RECIPE_SEARCH_TABLE}%'}
+            )}
+            missing = [name for name in _RECIPE_SEARCH_DDL if name not in existing]
+            for name in missing:
+                connection.exec_driver_sql(_RECIPE_SEARCH_DDL[name])
+            if missing:
+                connection.exec_driver_sql(f"INSERT INTO {RECIPE_SEARCH_TABLE}({RECIPE_SEARCH_TABLE}) VALUES ('rebuild')")
+    except OperationalError as e:
+        logger.warning('Ingredients search index unavailable, filtering with LIKE: %s', e)
+        return
+    _search_ready[str(engine.url)] = True
+
+
+def upgrade_recipe_schema(engine: Engine) -> None:
+    """
+    Aplica a bancos já existentes o que `create_all` não altera em tabelas
+    criadas: a coluna `version`, os índices de `Recipe` e a tabela de busca
+    por ingredientes.
+
+    Args:
+        engine (Engine): Engine do banco a atualizar.
+    """
+    table = Recipe.__table__
+    columns = {column['name'] for column in inspect(engine).get_columns(table.name)}
+    if 'version' not in columns:
+        with engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+    # IF NOT EXISTS em vez de checkfirst: a reflexão ignora índices de expressão
+    with engine.begin() as connection:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    upgrade_recipe_search(engine)
+
+
+def configure_sqlite(engine: Engine, busy_timeout_ms: int = 5000) -> None:
+    """
+    Prepara um banco SQLite para vários processos: ativa o journal WAL (leitores
+    não bloqueiam o escritor e vice-versa) e, em cada nova conexão, define o
+    `busy_timeout` e `synchronous=NORMAL`, seguro com WAL.
+
+    Args:
+        engine (Engine): Engine do banco; ignorado se não for SQLite.
+        busy_timeout_ms (int): Espera máxima por um lock de escrita, em milissegundos.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    # O modo WAL fica gravado no arquivo do banco
+    with engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA journal_mode=WAL')
@@ -0,0 +1,82 @@
+from flask import Flask, Response, request
+import click
+from services.apispec import apispec_path, build_apispec, load_apispec, write_apispec
+from typing import Optional, Tuple
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+SWAGGER_UI_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <link rel="stylesheet" href="{cdn}/swagger-ui.css">
+</head>
+<body>
+    <div id="swagger-ui"></div>
+    <script src="{cdn}/swagger-ui-bundle.js"></script>
+    <script>
+        window.onload = () => SwaggerUIBundle({{url: '/apispec_1.json', dom_id: '#swagger-ui'}});
+    </script>
+</body>
+</html>
+"""
+
+
+def register_docs(app: Flask) -> None:
+    """
+    Registra a documentação da API conforme `DOCS_MODE`.
+
+    - 'dynamic': flasgger gera o spec a partir das docstrings em runtime.
+    - 'static': serve o spec pré-gerado (`flask build-apispec`) como asset
+      gzip, e a UI é uma página estática que carrega o Swagger UI do CDN.
+    - 'disabled': nenhuma rota de documentação.
+
+    O comando `build-apispec` é registrado em todos os modos.
+
+    Args:
+        app (Flask): Aplicação onde a documentação será registrada.
+    """
+
+    @app.cli.command('build-apispec')
+    def build_apispec_command() -> None:
+        """Gera o spec OpenAPI e grava o JSON e a cópia gzip em APISPEC_FILE."""
+        path = apispec_path(app)
+        raw, compressed = write_apispec(build_apispec(app), path)
+        click.echo(f"Wrote {path} ({len(raw)} bytes, {len(compressed)} gzipped)")
+
+    mode = app.config['DOCS_MODE']
+    if mode == 'dynamic':
+        from flasgger import Swagger
+        Swagger(app)
+        return
+    if mode != 'static':
+        return
+
+    # Carregado no primeiro acesso, não na inicialização dos workers
+    spec: Optional[Tuple[bytes, bytes, str]] = None
+    ui_page = SWAGGER_UI_PAGE.format(title=app.config['SWAGGER']['title'], cdn=app.config['DOCS_UI_CDN'])
+
+    @app.route('/apispec_1.json', methods=['GET'])
+    def apispec() -> Response:
+        nonlocal spec
+        if spec is None:
+            spec = load_apispec(app)
+            logger.info("API spec loaded (%d bytes)", len(spec[0]))
+        raw, compressed, etag = spec
+
+        gzipped = 'gzip' in request.accept_encodings
+        response = Response(compressed if gzipped else raw, mimetype='application/json')
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        response.set_etag(f'{etag}-gzip' if gzipped else etag)
+        return response.make_conditional(request)
+
+    @app.route('/apidocs/', methods=['GET'])
+    def apidocs() -> Response:
+        return Response(ui_page, mimetype='text/html')
@@ -1,16 +1,34 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from models.models import Recipe, db
-from typing import Tuple
+from services.recipe_cache import recipe_cache
+from services.recipe_import import import_recipes, iter_lines, resolve_format
+from services.recipe_batch import batch_delete, batch_update
+from services.recipe_stream import iter_json_array
+from services.recipe_update import conditional_update, if_match_versions
+from services.recipe_similarity import similarity_index, index_new_recipes, recipe_ingredients
+from services.recipe_autocomplete import title_index, index_new_titles, recipe_titles
+from services.recipe_query import recipe_list_query, title_prefix_query
+from validators.request_validator import validate_body, validate_query
+from validators.schemas import (
+    AutocompleteQuery, RecipeBatchDelete, RecipeBatchUpdate, RecipeCreate, RecipeListQuery, RecipeUpdate, SimilarRecipesQuery,
+)
+from msgspec import UNSET
+from typing import Any, Dict, Iterator, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 recipe_bp = Blueprint('recipes', __name__, url_prefix='/recipes')
 
+STREAM_FIELDS = ('id', 'title', 'ingredients', 'time_minutes', 'version')
+
 
 @recipe_bp.route('/', methods=['POST'])
 @jwt_required()
-def create_recipe() -> Tuple[Response, int]:
+@validate_body(RecipeCreate)
+def create_recipe(body: RecipeCreate) -> Tuple[Response, int]:
     """
     Create a new recipe
     ---
@@ -61,30 +79,120 @@ def create_recipe() -> Tuple[Response, int]:
                   example: "Invalid input data"
     """
     logger.info("Request to create recipe received")
-    data = request.get_json()
-    if not data or not all(k in data for k in ('title', 'ingredients', 'time_minutes')):
-        logger.warning("Invalid input data for creating recipe")
-        return jsonify({"message": "Invalid input data"}), 400
     try:
         new_recipe = Recipe(
-            title=data['title'],
-            ingredients=data['ingredients'],
-            time_minutes=int(data['time_minutes'])
+            title=body.title,
+            ingredients=body.ingredients,
+            time_minutes=body.time_minutes
         )
         db.session.add(new_recipe)
         db.session.commit()
-        logger.info(f"Recipe '{new_recipe.title}' created successfully")
+        recipe_cache.bump_version()
+        similarity_index.upsert(new_recipe.id, new_recipe.ingredients)
+        title_index.upsert(new_recipe.id, new_recipe.title)
+        logger.info("Recipe '%s' created successfully", new_recipe.title)
         return jsonify({"message": "Recipe created successfully"}), 201
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error creating recipe: {e}")
+        logger.error("Error creating recipe: %s", e)
         return jsonify({"message": f"Error creating recipe: {str(e)}"}), 400
 
 
+@recipe_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_recipes_bulk() -> Tuple[Response, int]:
+    """
+    Bulk import recipes from a streamed NDJSON or CSV body
+    ---
+    tags:
+      - Recipes
+    security:
+      - jwt: []
+    parameters:
+      - in: query
+        name: format
+        schema:
+          type: string
+          enum: [ndjson, csv]
+        description: Body format; defaults to the one implied by Content-Type
+    requestBody:
+      required: true
+      content:
+        application/x-ndjson:
+          schema:
+            type: string
+            example: '{"title": "Pancakes", "ingredients": "Flour, Eggs, Milk", "time_minutes": 15}'
+        text/csv:
+          schema:
+            type: string
+            example: "title,ingredients,time_minutes"
+    responses:
+      200:
+        description: Import report with per-row errors
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                inserted:
+                  type: integer
+                  example: 998
+                failed:
+                  type: integer
+                  example: 2
+                errors:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      line:
+                        type: integer
+                        example: 17
+                      message:
+                        type: string
+                        example: "Invalid value for time_minutes"
+                errors_truncated:
+                  type: boolean
+                  example: false
+      400:
+        description: Error importing recipes
+      415:
+        description: Unsupported body format
+    """
+    logger.info("Request to import recipes received")
+    fmt = resolve_format(request.content_type, request.args.get('format'))
+    if fmt is None:
+        logger.warning("Unsupported import format: %s", request.content_type)
+        return jsonify({"message": "Unsupported format, use NDJSON or CSV"}), 415
+
+    def on_commit() -> None:
+        recipe_cache.bump_version()
+        index_new_recipes(db.session)
+        index_new_titles(db.session)
+
+    try:
+        report = import_recipes(
+            db.session,
+            iter_lines(request.stream),
+            fmt,
+            batch_size=current_app.config['RECIPE_IMPORT_BATCH_SIZE'],
+            batches_per_commit=current_app.config['RECIPE_IMPORT_BATCHES_PER_COMMIT'],
+            max_errors=current_app.config['RECIPE_IMPORT_MAX_ERRORS'],
+            on_commit=on_commit,
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error importing recipes: %s", e)
+        return jsonify({"message": f"Error importing recipes: {str(e)}"}), 400
+    logger.info("Imported %s recipes, %s rows rejected", report['inserted'], report['failed'])
+    return jsonify(report), 200
+
+
 @recipe_bp.route('/', methods=['GET'])
-def get_recipes() -> Tuple[Response, int]:
+@validate_query(RecipeListQuery)
+def get_recipes(query: RecipeListQuery) -> Tuple[Response, int]:
     """
-    Retrieve all recipes with optional filtering by ingredients and max time.
+    Retrieve all recipes with optional filtering by ingredients and time range, and sorting.
     ---
     tags:
       - Recipes
@@ -94,14 +202,40 @@ def get_recipes() -> Tuple[Response, int]:
         schema:
           type: string
         description: Filter recipes by ingredients (partial match)
+      - in: query
+        name: min_time
+        schema:
+          type: integer
+        description: Filter recipes by minimum time in minutes
       - in: query
         name: max_time
         schema:
           type: integer
         description: Filter recipes by maximum time in minutes
+      - in: query
+        name: sort
+        schema:
+          type: string
+          enum: [id, -id, title, -title, time_minutes, -time_minutes]
+        description: Sort field; prefix with '-' for descending order
+      - in: query
+        name: stream
+        schema:
+          type: boolean
+        description: Stream the JSON array incrementally instead of building it in memory (bypasses the cache)
+      - in: header
+        name: If-None-Match
+        schema:
+          type: string
+        description: ETag from a previous response; answered with 304 if the list is unchanged
     responses:
       200:
         description: A list of recipes matching the filters
+        headers:
+          ETag:
+            schema:
+              type: string
+            description: Strong validator for this list and query
         content:
           application/json:
             schema:
@@ -121,6 +255,11 @@ def get_recipes() -> Tuple[Response, int]:
                   time_minutes:
                     type: integer
                     example: 15
+                  version:
+                    type: integer
+                    example: 1
+      304:
+        description: The list has not changed since the ETag in If-None-Match
       400:
         description: Invalid query parameters
         content:
@@ -133,32 +272,241 @@ def get_recipes() -> Tuple[Response, int]:
                   example: "Invalid query parameters"
     """
     logger.info("Request to retrieve recipes received")
-    ingredients = request.args.get('ingredients')
-    max_time = request.args.get('max_time', type=int)
+    ingredients, min_time, max_time, sort = query.ingredients, query.min_time, query.max_time, query.sort
+
+    params = {'ingredients': ingredients, 'min_time': min_time, 'max_time': max_time, 'sort': sort}
+    etag = recipe_cache.etag(params)
+    if request.if_none_match.contains_weak(etag):
+        logger.info("Recipe list not modified")
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified, 304
 
-    query = Recipe.query
     if ingredients:
-        query = query.filter(Recipe.ingredients.contains(ingredients))
-        logger.info(f"Filtering by ingredients containing: {ingredients}")
+        logger.info("Filtering by ingredients containing: %s", ingredients)
+    if min_time is not None:
+        logger.info("Filtering by min_time >= %s", min_time)
     if max_time is not None:
-        query = query.filter(Recipe.time_minutes <= max_time)
-        logger.info(f"Filtering by max_time <= {max_time}")
+        logger.info("Filtering by max_time <= %s", max_time)
+    recipes_query = recipe_list_query(db.session, ingredients, min_time, max_time, sort)
+
+    if query.stream:
+        logger.info("Streaming recipe list")
+        chunk_rows = current_app.config['RECIPE_STREAM_CHUNK_ROWS']
+
+        def stream_recipes() -> Iterator[str]:
+            # Sessão própria: a sessão da requisição é encerrada no teardown,
+            # antes de o corpo ser consumido, e reabri-la vazaria a conexão.
+            with Session(db.engine) as session:
+                rows = recipes_query.with_session(session).with_entities(
+                    Recipe.id, Recipe.title, Recipe.ingredients, Recipe.time_minutes, Recipe.version
+                )
+                yield from iter_json_array(rows.yield_per(chunk_rows), STREAM_FIELDS, chunk_rows)
+
+        response = Response(stream_with_context(stream_recipes()), mimetype='application/json')
+        response.set_etag(etag)
+        return response, 200
+
+    def load_recipes() -> List[Dict[str, Any]]:
+        recipes = recipes_query.all()
+        logger.info("Found %s recipes", len(recipes))
+        return [
+            {
+                'id': recipe.id,
+                'title': recipe.title,
+                'ingredients': recipe.ingredients,
+                'time_minutes': recipe.time_minutes,
+                'version': recipe.version
+            } for recipe in recipes
+        ]
+
+    response = jsonify(recipe_cache.get_or_compute(params, load_recipes))
+    response.set_etag(etag)
+    return response, 200
+
+
+@recipe_bp.route('/autocomplete', methods=['GET'])
+@validate_query(AutocompleteQuery)
+def autocomplete_recipes(query: AutocompleteQuery) -> Tuple[Response, int]:
+    """
+    Suggest recipes whose title, or a later word of it, starts with the typed text
+    ---
+    tags:
+      - Recipes
+    parameters:
+      - in: query
+        name: q
+        required: true
+        schema:
+          type: string
+        description: Title prefix typed so far (case and accents are ignored)
+      - in: query
+        name: limit
+        schema:
+          type: integer
+          default: 10
+        description: Maximum number of matches (at most AUTOCOMPLETE_MAX_LIMIT)
+    responses:
+      200:
+        description: Matches, titles starting with the prefix first
+        content:
+          application/json:
+            schema:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                    example: 1
+                  title:
+                    type: string
+                    example: "Pancakes"
+      400:
+        description: Invalid query parameters
+    """
+    if query.limit > title_index.max_limit:
+        return jsonify({"message": f"limit must be at most {title_index.max_limit}"}), 400
+
+    engine = db.engine
+    if not title_index.built:
+        # Servidor de desenvolvimento sem o wsgi.py: monta na primeira consulta
+        title_index.build(recipe_titles(engine))
+    title_index.refresh(lambda: recipe_titles(engine))
+    matches = title_index.search(query.q, query.limit)
+    if matches is None:
+        # Índice acima do teto de memória: consulta por prefixo no banco
+        matches = title_prefix_query(db.session, query.q.strip(), query.limit).all()
+    return jsonify([{'id': recipe_id, 'title': title} for recipe_id, title in matches]), 200
+
+
+@recipe_bp.route('/<int:recipe_id>/similar', methods=['GET'])
+@validate_query(SimilarRecipesQuery)
+def get_similar_recipes(recipe_id: int, query: SimilarRecipesQuery) -> Tuple[Response, int]:
+    """
+    Retrieve the recipes whose ingredients are most similar to a recipe's (TF-IDF cosine)
+    ---
+    tags:
+      - Recipes
+    parameters:
+      - in: path
+        name: recipe_id
+        required: true
+        schema:
+          type: integer
+        description: The ID of the recipe
+      - in: query
+        name: k
+        schema:
+          type: integer
+          default: 10
+        description: Number of related recipes to return (at most SIMILAR_MAX_K)
+    responses:
+      200:
+        description: Related recipes by decreasing similarity
+        content:
+          application/json:
+            schema:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                    example: 2
+                  title:
+                    type: string
+                    example: "Crepes"
+                  ingredients:
+                    type: string
+                    example: "Flour, Eggs, Milk, Butter"
+                  time_minutes:
+                    type: integer
+                    example: 20
+                  version:
+                    type: integer
+                    example: 1
+                  score:
+                    type: number
+                    example: 0.87
+      400:
+        description: Invalid query parameters
+      404:
+        description: Recipe not found
+    """
+    logger.info("Request for recipes similar to ID %s received", recipe_id)
+    if query.k > similarity_index.max_k:
+        return jsonify({"message": f"k must be at most {similarity_index.max_k}"}), 400
+
+    engine = db.engine
+    if not similarity_index.built:
+        # Servidor de desenvolvimento sem o wsgi.py: monta na primeira consulta
+        similarity_index.build(recipe_ingredients(engine))
+    similarity_index.refresh(lambda: recipe_ingredients(engine))
+    neighbors = similarity_index.neighbors([recipe_id], query.k).get(recipe_id)
+    if neighbors is None:
+        return jsonify({"message": "Recipe not found"}), 404
 
-    recipes = query.all()
-    logger.info(f"Found {len(recipes)} recipes")
-    return jsonify([
-        {
-            'id': recipe.id,
-            'title': recipe.title,
-            'ingredients': recipe.ingredients,
-            'time_minutes': recipe.time_minutes
-        } for recipe in recipes
-    ]), 200
+    # Os vizinhos já vêm ordenados do índice; um único IN traz as linhas
+    rows = db.session.execute(
+        select(Recipe.id, Recipe.title, Recipe.ingredients, Recipe.time_minutes, Recipe.version)
+        .where(Recipe.id.in_([neighbor for neighbor, _ in neighbors]))
+    )
+    recipes = {row.id: dict(zip(STREAM_FIELDS, row)) for row in rows}
+    logger.info("Found %s similar recipes", len(recipes))
+    return jsonify([{**recipes[neighbor], 'score': score} for neighbor, score in neighbors if neighbor in recipes]), 200
+
+
+@recipe_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats() -> Tuple[Response, int]:
+    """
+    Retrieve hit-rate metrics of the recipe list cache
+    ---
+    tags:
+      - Recipes
+    security:
+      - jwt: []
+    responses:
+      200:
+        description: Current cache metrics
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                version:
+                  type: integer
+                  example: 12
+                size:
+                  type: integer
+                  example: 3
+                max_entries:
+                  type: integer
+                  example: 256
+                hits:
+                  type: integer
+                  example: 40
+                misses:
+                  type: integer
+                  example: 10
+                coalesced:
+                  type: integer
+                  example: 2
+                evictions:
+                  type: integer
+                  example: 0
+                hit_rate:
+                  type: number
+                  example: 0.8
+    """
+    return jsonify(recipe_cache.stats()), 200
 
 
 @recipe_bp.route('/<int:recipe_id>', methods=['PUT'])
 @jwt_required()
-def update_recipe(recipe_id: int) -> Tuple[Response, int]:
+@validate_body(RecipeUpdate)
+def update_recipe(recipe_id: int, body: RecipeUpdate) -> Tuple[Response, int]:
     """
     Update an existing recipe by ID
     ---
@@ -173,6 +521,11 @@ def update_recipe(recipe_id: int) -> Tuple[Response, int]:
         schema:
           type: integer
         description: The ID of the recipe to update
+      - in: header
+        name: If-Match
+        schema:
+          type: string
+        description: Quoted version the update is based on (e.g. "3"); a different current version returns 409
     requestBody:
       required: true
       content:
@@ -200,6 +553,14 @@ def update_recipe(recipe_id: int) -> Tuple[Response, int]:
                 message:
                   type: string
                   example: "Recipe updated successfully"
+                version:
+                  type: integer
+                  example: 4
+        headers:
+          ETag:
+            schema:
+              type: string
+            description: The new version of the recipe
       400:
         description: Invalid input data or error updating recipe
         content:
@@ -220,39 +581,45 @@ def update_recipe(recipe_id: int) -> Tuple[Response, int]:
                 message:
                   type: string
                   example: "Recipe not found"
+      409:
+        description: If-Match does not match the current version; the ETag header carries the current one
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                message:
+                  type: string
+                  example: "Recipe was modified by another request"
+                version:
+                  type: integer
+                  example: 5
     """
-    logger.info(f"Request to update recipe ID {recipe_id} received")
-    data = request.get_json()
-    recipe = Recipe.query.get_or_404(recipe_id)
-
-    if not data or not any(k in data for k in ('title', 'ingredients', 'time_minutes')):
-        logger.warning(f"No data provided to update recipe ID {recipe_id}")
-        return jsonify({"message": "No data provided"}), 400
-
-    fields = {
-        'title': str,
-        'ingredients': str,
-        'time_minutes': int
-    }
-
-    updated = False
-    for field, cast in fields.items():
-        if field in data:
-            try:
-                setattr(recipe, field, cast(data[field]))
-                logger.info(f"Field '{field}' updated for recipe ID {recipe_id}")
-                updated = True
-            except (ValueError, TypeError):
-                logger.error(f"Invalid value for '{field}' in recipe ID {recipe_id}")
-                return jsonify({"message": f"Invalid value for {field}"}), 400
-
-    if not updated:
-        logger.warning(f"No valid fields provided to update for recipe ID {recipe_id}")
-        return jsonify({"message": "No valid fields provided to update"}), 400
+    logger.info("Request to update recipe ID %s received", recipe_id)
+    values = {field: getattr(body, field) for field in body.__struct_fields__ if getattr(body, field) is not UNSET}
+    status, version = conditional_update(db.session, recipe_id, values, if_match_versions(request.if_match))
+
+    if status == 'not_found':
+        db.session.rollback()
+        return jsonify({"message": "Recipe not found"}), 404
+    if status == 'conflict':
+        db.session.rollback()
+        logger.info("Version conflict updating recipe ID %s (current version %s)", recipe_id, version)
+        conflict = jsonify({"message": "Recipe was modified by another request", "version": version})
+        conflict.set_etag(str(version))
+        return conflict, 409
 
     db.session.commit()
-    logger.info(f"Recipe ID {recipe_id} updated successfully")
-    return jsonify({"message": "Recipe updated successfully"}), 200
+    recipe_cache.bump_version()
+    if 'ingredients' in values:
+        similarity_index.upsert(recipe_id, values['ingredients'])
+    if 'title' in values:
+        title_index.upsert(recipe_id, values['title'])
+    logger.debug("Fields %s updated for recipe ID %s", list(values), recipe_id)
+    logger.info("Recipe ID %s updated successfully to version %s", recipe_id, version)
+    response = jsonify({"message": "Recipe updated successfully", "version": version})
+    response.set_etag(str(version))
+    return response, 200
 
 
 @recipe_bp.route('/<int:recipe_id>', methods=['DELETE'])
@@ -304,14 +671,175 @@ def delete_recipe(recipe_id: int) -> Tuple[Response, int]:
                   type: string
                   example: "Error deleting recipe"
     """
-    logger.info(f"Request to delete recipe ID {recipe_id} received")
+    logger.info("Request to delete recipe ID %s received", recipe_id)
     try:
         recipe = Recipe.query.get_or_404(recipe_id)
         db.session.delete(recipe)
         db.session.commit()
-        logger.info(f"Recipe ID {recipe_id} deleted successfully")
+        recipe_cache.bump_version()
+        similarity_index.remove(recipe_id)
+        title_index.remove(recipe_id)
+        logger.info("Recipe ID %s deleted successfully", recipe_id)
         return jsonify({"message": "Recipe deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error deleting recipe ID {recipe_id}: {e}")
+        logger.error("Error deleting recipe ID %s: %s", recipe_id, e)
         return jsonify({"message": "Error deleting recipe"}), 400
+
+
+@recipe_bp.route('/batch', methods=['PUT'])
+@jwt_required()
+@validate_body(RecipeBatchUpdate)
+def update_recipes_batch(body: RecipeBatchUpdate) -> Tuple[Response, int]:
+    """
+    Update several recipes in one transaction
+    ---
+    tags:
+      - Recipes
+    security:
+      - jwt: []
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - recipes
+            properties:
+              recipes:
+                type: array
+                items:
+                  type: object
+                  required:
+                    - id
+                  properties:
+                    id:
+                      type: integer
+                      example: 1
+                    title:
+                      type: string
+                      example: "Updated Pancakes"
+                    ingredients:
+                      type: string
+                      example: "Flour, Eggs, Milk, Sugar"
+                    time_minutes:
+                      type: integer
+                      example: 20
+    responses:
+      200:
+        description: Per-item results (updated or not_found)
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                results:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      id:
+                        type: integer
+                        example: 1
+                      status:
+                        type: string
+                        example: "updated"
+      400:
+        description: Invalid input data or error updating recipes
+    """
+    logger.info("Request to batch update recipes received")
+    if len(body.recipes) > current_app.config['RECIPE_BATCH_MAX_ITEMS']:
+        logger.warning("Batch update with %s items exceeds the limit", len(body.recipes))
+        return jsonify({"message": f"At most {current_app.config['RECIPE_BATCH_MAX_ITEMS']} items per batch"}), 400
+
+    patches = [
+        {field: getattr(patch, field) for field in patch.__struct_fields__ if getattr(patch, field) is not UNSET}
+        for patch in body.recipes
+    ]
+    try:
+        statuses = batch_update(db.session, patches)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error batch updating recipes: %s", e)
+        return jsonify({"message": f"Error updating recipes: {str(e)}"}), 400
+
+    if 'updated' in statuses.values():
+        recipe_cache.bump_version()
+        updated = [patch for patch in patches if statuses[patch['id']] == 'updated']
+        similarity_index.upsert_many((patch['id'], patch['ingredients']) for patch in updated if 'ingredients' in patch)
+        title_index.upsert_many((patch['id'], patch['title']) for patch in updated if 'title' in patch)
+    logger.info("Batch update applied to %s recipes", list(statuses.values()).count('updated'))
+    return jsonify({"results": [{'id': patch['id'], 'status': statuses[patch['id']]} for patch in patches]}), 200
+
+
+@recipe_bp.route('/batch/delete', methods=['POST'])
+@jwt_required()
+@validate_body(RecipeBatchDelete)
+def delete_recipes_batch(body: RecipeBatchDelete) -> Tuple[Response, int]:
+    """
+    Delete several recipes by ID in one transaction
+    ---
+    tags:
+      - Recipes
+    security:
+      - jwt: []
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - ids
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+                example: [1, 2, 3]
+    responses:
+      200:
+        description: Per-id results (deleted or not_found)
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                results:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      id:
+                        type: integer
+                        example: 1
+                      status:
+                        type: string
+                        example: "deleted"
+      400:
+        description: Invalid input data or error deleting recipes
+    """
+    logger.info("Request to batch delete recipes received")
+    ids = body.ids
+    if len(ids) > current_app.config['RECIPE_BATCH_MAX_ITEMS']:
+        logger.warning("Batch delete with %s items exceeds the limit", len(ids))
+        return jsonify({"message": f"At most {current_app.config['RECIPE_BATCH_MAX_ITEMS']} items per batch"}), 400
+
+    try:
+        statuses = batch_delete(db.session, ids)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error batch deleting recipes: %s", e)
+        return jsonify({"message": "Error deleting recipes"}), 400
+
+    if 'deleted' in statuses.values():
+        recipe_cache.bump_version()
+        for recipe_id, outcome in statuses.items():
+            if outcome == 'deleted':
+                similarity_index.remove(recipe_id)
+                title_index.remove(recipe_id)
+    logger.info("Batch delete removed %s recipes", list(statuses.values()).count('deleted'))
+    return jsonify({"results": [{'id': i, 'status': statuses[i]} for i in ids]}), 200
@@ -1,7 +1,10 @@
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from validators.request_validator import validate_json_fields
-from flask import request, jsonify, Flask, Response
+from validators.request_validator import validate_body
+from validators.schemas import UserBulkCreate, UserCredentials
+from flask import jsonify, Flask, Response, current_app
 from services.user_service import UserService
+from services.user_bulk import provision_users
+from models.models import db
 from typing import Tuple, Optional
 import logging
 
@@ -11,7 +14,8 @@ logger = logging.getLogger(__name__)
 def register_user_routes(app: Flask) -> None:
 
     @app.route('/register', methods=['POST'])
-    def register_user() -> Tuple[Response, int]:
+    @validate_body(UserCredentials)
+    def register_user(body: UserCredentials) -> Tuple[Response, int]:
         """
         Register a new user
         ---
@@ -56,16 +60,13 @@ def register_user_routes(app: Flask) -> None:
                                     example: "Invalid input data or error registering user"
         """
         logger.info("Register user request received")
-        data, error = validate_json_fields(request.get_json(), ['username', 'password'])
-        if error:
-            logger.warning("Register user validation failed")
-            return error
-        response = UserService.register(data)
+        response = UserService.register({'username': body.username, 'password': body.password})
         logger.info("User registered successfully")
         return response
 
     @app.route('/login', methods=['POST'])
-    def login_user() -> Tuple[Response, int]:
+    @validate_body(UserCredentials)
+    def login_user(body: UserCredentials) -> Tuple[Response, int]:
         """
         Login an existing user
         ---
@@ -110,11 +111,7 @@ def register_user_routes(app: Flask) -> None:
                                     example: "Invalid input data or error logging in user"
         """
         logger.info("Login user request received")
-        data, error = validate_json_fields(request.get_json(), ['username', 'password'])
-        if error:
-            logger.warning("Login validation failed")
-            return error
-        response = UserService.login(data)
+        response = UserService.login({'username': body.username, 'password': body.password})
         logger.info("User logged in successfully")
         return response
 
@@ -151,5 +148,92 @@ def register_user_routes(app: Flask) -> None:
                                     example: "Missing or invalid JWT token"
         """
         current_user: Optional[str] = get_jwt_identity()
-        logger.info(f"Protected route accessed by user: {current_user}")
+        logger.info("Protected route accessed by user: %s", current_user)
         return jsonify(logged_in_as=current_user), 200
+
+    @app.route('/admin/users/bulk', methods=['POST'])
+    @jwt_required()
+    @validate_body(UserBulkCreate)
+    def provision_users_bulk(body: UserBulkCreate) -> Tuple[Response, int]:
+        """
+        Create many users at once (admin only)
+        ---
+        tags:
+            - Users
+        security:
+            - jwt: []
+        requestBody:
+            required: true
+            content:
+                application/json:
+                    schema:
+                        type: object
+                        required:
+                            - users
+                        properties:
+                            users:
+                                type: array
+                                items:
+                                    type: object
+                                    required:
+                                        - username
+                                        - password
+                                    properties:
+                                        username:
+                                            type: string
+                                            example: "john_doe"
+                                        password:
+                                            type: string
+                                            example: "securepassword123"
+        responses:
+            200:
+                description: Per-user results (created or exists)
+                content:
+                    application/json:
+                        schema:
+                            type: object
+                            properties:
+                                created:
+                                    type: integer
+                                    example: 1
+                                results:
+                                    type: array
+                                    items:
+                                        type: object
+                                        properties:
+                                            username:
+                                                type: string
+                                                example: "john_doe"
+                                            status:
+                                                type: string
+                                                example: "created"
+            400:
+                description: Invalid input data or error creating users
+            403:
+                description: The authenticated user is not an admin
+        """
+        current_user: Optional[str] = get_jwt_identity()
+        if current_user not in current_app.config['ADMIN_USERNAMES']:
+            logger.warning("Bulk user provisioning denied for user: %s", current_user)
+            return jsonify({"message": "Admin privileges required"}), 403
+        if len(body.users) > current_app.config['USER_BULK_MAX_ITEMS']:
+            return jsonify({"message": f"At most {current_app.config['USER_BULK_MAX_ITEMS']} users per request"}), 400
+
+        logger.info("Bulk user provisioning of %s users requested by %s", len(body.users), current_user)
+        try:
+            statuses = provision_users(
+                db.session,
+                [(user.username, user.password) for user in body.users],
+                workers=current_app.config['USER_HASH_WORKERS'],
+                batch_size=current_app.config['USER_BULK_BATCH_SIZE'],
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Error provisioning users: %s", e)
+            return jsonify({"message": f"Error creating users: {str(e)}"}), 400
+
+        results = [{'username': username, 'status': status} for username, status in statuses.items()]
+        created = sum(1 for status in statuses.values() if status == 'created')
+        logger.info("Bulk user provisioning created %s users", created)
+        return jsonify({"created": created, "results": results}), 200
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Tuple
+from flask import Flask
+from uuid import uuid4
+import hashlib
+import json
+import gzip
+import os
+
+
+# Rotas que não fazem parte da API documentada: as do modo 'static' e as do
+# blueprint do flasgger no modo 'dynamic'
+DOCS_ENDPOINTS = ('static', 'apispec', 'apidocs')
+DOCS_BLUEPRINT = 'flasgger.'
+
+
+def apispec_path(app: Flask) -> str:
+    """
+    Caminho absoluto do spec pré-gerado, a partir de `APISPEC_FILE`.
+    """
+    return os.path.join(app.root_path, app.config['APISPEC_FILE'])
+
+
+def build_apispec(app: Flask) -> Dict[str, Any]:
+    """
+    Gera o spec OpenAPI a partir das docstrings YAML das rotas via flasgger.
+
+    O flasgger só é importado aqui, para que as aplicações servindo o spec
+    pré-gerado não paguem o custo de importação nem de parsing do YAML. Ele é
+    registrado em uma cópia das rotas de `app`, que não é alterada e pode já
+    estar atendendo requisições.
+
+    Args:
+        app (Flask): Aplicação com todas as rotas já registradas.
+
+    Returns:
+        Dict[str, Any]: O spec, igual ao servido em `/apispec_1.json`.
+    """
+    from flasgger import Swagger
+
+    shadow = Flask(app.import_name, root_path=app.root_path)
+    shadow.config.update(app.config)
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint not in DOCS_ENDPOINTS and not rule.endpoint.startswith(DOCS_BLUEPRINT):
+            shadow.add_url_rule(rule.rule, rule.endpoint, app.view_functions[rule.endpoint], methods=rule.methods)
+    swagger = Swagger(shadow)
+    with shadow.test_request_context():
+        return swagger.get_apispecs('apispec_1')
+
+
+def write_apispec(spec: Dict[str, Any], path: str) -> Tuple[bytes, bytes]:
+    """
+    Grava o spec em `path` e uma cópia gzip em `path + '.gz'`.
+
+    A gravação é determinística (chaves ordenadas, mtime do gzip zerado), de
+    modo que o mesmo código gera os mesmos bytes e o mesmo ETag.
+
+    Args:
+        spec (Dict[str, Any]): Spec gerado por `build_apispec`.
+        path (str): Destino do JSON.
+
+    Returns:
+        Tuple[bytes, bytes]: Conteúdo JSON e conteúdo gzip gravados.
+    """
+    raw = json.dumps(spec, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for target, content in ((path, raw), (path + '.gz', compressed)):
+        # Nome único por processo: workers gerando o spec ao mesmo tempo não
+        # gravam no mesmo arquivo temporário
+        tmp = f'{target}.{os.getpid()}.{uuid4().hex}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, target)
+    return raw, compressed
+
+
+def load_apispec(app: Flask) -> Tuple[bytes, bytes, str]:
+    """
+    Lê o spec pré-gerado do disco; se ainda não existir, gera e grava uma vez.
+
+    Args:
+        app (Flask): Aplicação cujo spec será carregado.
+
+    Returns:
+        Tuple[bytes, bytes, str]: JSON, JSON gzip e ETag do conteúdo.
+    """
+    path = apispec_path(app)
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        with open(path + '.gz', 'rb') as f:
+            compressed = f.read()
+    except FileNotFoundError:
+        raw, compressed = write_apispec(build_apispec(app), path)
+    return raw, compressed, hashlib.blake2b(raw, digest_size=16).hexdigest()
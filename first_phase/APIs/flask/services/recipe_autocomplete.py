@@ -0,0 +1,401 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from flask import Flask
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models.models import Recipe
+import numpy as np
+import unicodedata
+import threading
+import logging
+import sys
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Chaves de largura fixa: um byte de marcação mais o início do texto normalizado.
+KEY_BYTES = 32
+_TITLE, _WORD = b'\x01', b'\x02'
+_SEPARATORS = re.compile(r'[\W_]+')
+# Custo aproximado por título do dicionário id -> título além da própria string (int da chave, slot).
+_ENTRY_OVERHEAD = 70
+
+# Estado trocado por uma remontagem em segundo plano (ver TitlePrefixIndex.refresh).
+_STATE = ('_titles', '_keys', '_ids', '_alive', '_dead', '_pending', '_title_bytes', 'enabled', 'max_id', 'built_at')
+
+
+def normalize_title(text: str) -> str:
+    """
+    Normaliza um título para a busca por prefixo: sem acentos, em minúsculas e
+    com sequências de pontuação ou espaços reduzidas a um espaço.
+
+    Args:
+        text (str): Título como gravado na receita.
+
+    Returns:
+        str: Título normalizado.
+    """
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return _SEPARATORS.sub(' ', text.casefold()).strip()
+
+
+def title_keys(title: str) -> List[bytes]:
+    """
+    Chaves de um título no índice: o título normalizado inteiro e o texto a
+    partir de cada palavra seguinte, para que "Bolo de Cenoura" também seja
+    encontrado por "cen".
+
+    Args:
+        title (str): Título como gravado na receita.
+
+    Returns:
+        List[bytes]: Chaves distintas, truncadas em `KEY_BYTES`.
+    """
+    normalized = normalize_title(title)
+    if not normalized:
+        return []
+    keys = {(_TITLE + normalized.encode())[:KEY_BYTES]: None}
+    for position, char in enumerate(normalized):
+        if char == ' ':
+            keys[(_WORD + normalized[position + 1:].encode())[:KEY_BYTES]] = None
+    return list(keys)
+
+
+class TitlePrefixIndex:
+    """
+    Índice em memória dos títulos normalizados das receitas, usado pelo
+    autocompletar.
+
+    As chaves ficam num array ordenado de bytes de largura fixa, com os ids
+    das receitas ao lado: um prefixo custa duas buscas binárias e os
+    resultados são a fatia entre elas. Títulos que começam pelo prefixo vêm
+    antes dos que têm uma palavra seguinte começando por ele, cada grupo em
+    ordem alfabética.
+
+    As escritas são incrementais: chaves novas entram numa lista ordenada
+    pendente e as chaves antigas de uma receita alterada ou removida são
+    marcadas como mortas; as duas são fundidas nos arrays quando passam de
+    `compact_rows` (ou de um décimo do array).
+
+    Se o índice passar de `max_bytes`, ele é descartado, `enabled` fica falso
+    e a rota consulta o banco até uma remontagem caber de novo. Com
+    `preload_app`, o índice é montado no mestre e herdado pelos workers; cada
+    worker aplica apenas as próprias escritas e as dos demais aparecem na
+    próxima remontagem (`refresh`).
+
+    Attributes:
+        max_bytes (int): Teto de memória do índice, em bytes.
+        compact_rows (int): Chaves pendentes mais mortas que disparam a fusão.
+        max_limit (int): Máximo de resultados por consulta aceito pela rota.
+        refresh_seconds (float): Idade máxima do índice antes de uma remontagem em segundo plano.
+        enabled (bool): Se o índice está montado e dentro do teto de memória.
+        max_id (int): Maior id de receita já indexado.
+        built_at (float): `time.monotonic()` da última montagem completa.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, compact_rows: int = 10000) -> None:
+        self.max_bytes = max_bytes
+        self.compact_rows = compact_rows
+        self.max_limit = 50
+        self.refresh_seconds = 0.0
+        self.enabled = False
+        self.max_id = 0
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._titles: Dict[int, str] = {}
+        self._title_bytes = 0
+        self._keys = np.zeros(0, dtype=f'S{KEY_BYTES}')
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._dead = 0
+        self._pending: List[Tuple[bytes, int]] = []
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Configura o índice a partir de `AUTOCOMPLETE_*` e o registra na aplicação.
+        """
+        self.max_bytes = app.config.get('AUTOCOMPLETE_MAX_BYTES', self.max_bytes)
+        self.max_limit = app.config.get('AUTOCOMPLETE_MAX_LIMIT', self.max_limit)
+        self.refresh_seconds = app.config.get('AUTOCOMPLETE_REFRESH_SECONDS', self.refresh_seconds)
+        app.extensions['recipe_autocomplete'] = self
+
+    @property
+    def built(self) -> bool:
+        """
+        Indica se já houve uma tentativa de montagem a partir do banco.
+        """
+        return self.built_at > 0
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Substitui o índice pelas receitas dadas.
+
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, título)` de todas as receitas.
+        """
+        titles, keys, ids, title_bytes = {}, [], [], 0
+        for recipe_id, title in rows:
+            self.max_id = max(self.max_id, recipe_id)
+            titles[recipe_id] = title
+            title_bytes += sys.getsizeof(title) + _ENTRY_OVERHEAD
+            recipe_keys = title_keys(title)
+            keys.extend(recipe_keys)
+            ids.extend([recipe_id] * len(recipe_keys))
+            if title_bytes + len(keys) * (KEY_BYTES + 9) > self.max_bytes:
+                with self._lock:
+                    self._disable()
+                    self.built_at = time.monotonic()
+                logger.warning('Title index exceeds %s bytes; autocomplete falls back to the database', self.max_bytes)
+                return
+        keys = np.array(keys, dtype=f'S{KEY_BYTES}')
+        order = np.argsort(keys, kind='stable')
+        with self._lock:
+            self._titles = titles
+            self._title_bytes = title_bytes
+            self._keys = keys[order]
+            self._ids = np.array(ids, dtype=np.int64)[order]
+            self._alive = np.ones(len(keys), dtype=bool)
+            self._dead = 0
+            self._pending = []
+            self.enabled = True
+            self.built_at = time.monotonic()
+
+    def upsert(self, recipe_id: int, title: str) -> None:
+        """
+        Indexa uma receita criada ou reindexa uma cujo título mudou.
+
+        Args:
+            recipe_id (int): Id da receita.
+            title (str): Título atual da receita.
+        """
+        self.upsert_many([(recipe_id, title)])
+
+    def upsert_many(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Indexa várias receitas criadas ou alteradas, fundindo no máximo uma vez.
+
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, título)` das receitas.
+        """
+        with self._lock:
+            for recipe_id, title in rows:
+                if self._journal is not None:
+                    self._journal.append((recipe_id, title))
+                self.max_id = max(self.max_id, recipe_id)
+                if not self.enabled or self._titles.get(recipe_id) == title:
+                    continue
+                self._discard(recipe_id)
+                self._titles[recipe_id] = title
+                self._title_bytes += sys.getsizeof(title) + _ENTRY_OVERHEAD
+                for key in title_keys(title):
+                    insort(self._pending, (key, recipe_id))
+            self._maybe_compact()
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Retira do índice uma receita removida.
+
+        Args:
+            recipe_id (int): Id da receita.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((recipe_id, None))
+            if self.enabled and self._discard(recipe_id):
+                self._maybe_compact()
+
+    def search(self, prefix: str, limit: int) -> Optional[List[Tuple[int, str]]]:
+        """
+        Busca as receitas cujo título, ou uma palavra seguinte dele, começa por `prefix`.
+
+        Args:
+            prefix (str): Texto digitado até agora; normalizado como os títulos.
+            limit (int): Máximo de resultados.
+
+        Returns:
+            Optional[List[Tuple[int, str]]]: Pares `(id, título)`, com os títulos que
+            começam pelo prefixo primeiro, ou None se o índice está desligado.
+        """
+        query = normalize_title(prefix)
+        with self._lock:
+            if not self.enabled:
+                return None
+            if not query:
+                return []
+            matches: Dict[int, str] = {}
+            for tag in (_TITLE, _WORD):
+                for recipe_id in self._range(tag, query):
+                    matches.setdefault(recipe_id, self._titles[recipe_id])
+                    if len(matches) == limit:
+                        return list(matches.items())
+            return list(matches.items())
+
+    def stats(self) -> Dict[str, Union[int, bool]]:
+        """
+        Retorna os contadores do índice: receitas, chaves, chaves pendentes,
+        mortas e a memória estimada em bytes frente ao teto.
+        """
+        with self._lock:
+            return {
+                'recipes': len(self._titles),
+                'keys': len(self._keys) - self._dead + len(self._pending),
+                'pending': len(self._pending),
+                'tombstones': self._dead,
+                'memory_bytes': self._memory(),
+                'max_bytes': self.max_bytes,
+                'enabled': self.enabled,
+            }
+
+    def refresh(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        """
+        Remonta o índice numa thread em segundo plano quando a última montagem
+        tem mais de `refresh_seconds`, trazendo as escritas feitas por outros
+        workers. Escritas aplicadas enquanto isso são registradas e reaplicadas
+        no índice novo.
+
+        Args:
+            load (Callable[[], Iterable[Tuple[int, str]]]): Retorna `(id, título)`
+                de todas as receitas.
+        """
+        with self._lock:
+            if self.refresh_seconds <= 0 or self._refreshing or time.monotonic() - self.built_at < self.refresh_seconds:
+                return
+            self._refreshing = True
+            self._journal = []
+
+        def rebuild() -> None:
+            try:
+                fresh = TitlePrefixIndex(self.max_bytes, self.compact_rows)
+                fresh.build(load())
+                with self._lock:
+                    for recipe_id, title in self._journal:
+                        if title is None:
+                            fresh.remove(recipe_id)
+                        else:
+                            fresh.upsert(recipe_id, title)
+                    for name in _STATE:
+                        setattr(self, name, getattr(fresh, name))
+            except Exception:
+                logger.exception('Recipe title index refresh failed')
+            finally:
+                with self._lock:
+                    self._journal = None
+                    self._refreshing = False
+                    self.built_at = max(self.built_at, time.monotonic())
+
+        threading.Thread(target=rebuild, name='recipe-title-refresh', daemon=True).start()
+
+    def _range(self, tag: bytes, query: str) -> Iterator[int]:
+        # Ids das chaves vivas que começam por tag + query, em ordem, do array e da lista
+        # pendente. Uma consulta mais longa que as chaves é conferida nos títulos.
+        prefix = (tag + query.encode())[:KEY_BYTES]
+        truncated = len(tag) + len(query.encode()) >= KEY_BYTES
+        if len(prefix) == KEY_BYTES:
+            # Chaves têm no máximo KEY_BYTES, então só as iguais têm esse prefixo
+            lo, hi = np.searchsorted(self._keys, prefix, 'left'), np.searchsorted(self._keys, prefix, 'right')
+            pending = self._pending[bisect_left(self._pending, (prefix,)):bisect_right(self._pending, (prefix, sys.maxsize))]
+        else:
+            upper = prefix + b'\xff'
+            lo, hi = np.searchsorted(self._keys, prefix, 'left'), np.searchsorted(self._keys, upper, 'left')
+            pending = self._pending[bisect_left(self._pending, (prefix,)):bisect_left(self._pending, (upper,))]
+        base = ((self._keys[row], int(self._ids[row])) for row in range(lo, hi) if self._alive[row])
+        for _, recipe_id in merge(base, pending):
+            if truncated and not self._matches(tag, query, self._titles[recipe_id]):
+                continue
+            yield recipe_id
+
+    @staticmethod
+    def _matches(tag: bytes, query: str, title: str) -> bool:
+        normalized = normalize_title(title)
+        return normalized.startswith(query) if tag == _TITLE else f' {query}' in normalized
+
+    def _discard(self, recipe_id: int) -> bool:
+        title = self._titles.pop(recipe_id, None)
+        if title is None:
+            return False
+        self._title_bytes -= sys.getsizeof(title) + _ENTRY_OVERHEAD
+        for key in title_keys(title):
+            position = bisect_left(self._pending, (key, recipe_id))
+            if position < len(self._pending) and self._pending[position] == (key, recipe_id):
+                del self._pending[position]
+                continue
+            lo, hi = np.searchsorted(self._keys, key, 'left'), np.searchsorted(self._keys, key, 'right')
+            rows = lo + np.flatnonzero((self._ids[lo:hi] == recipe_id) & self._alive[lo:hi])
+            self._alive[rows] = False
+            self._dead += len(rows)
+        return True
+
+    def _maybe_compact(self) -> None:
+        if self._memory() > self.max_bytes:
+            self._disable()
+            logger.warning('Title index exceeds %s bytes; autocomplete falls back to the database', self.max_bytes)
+            return
+        if len(self._pending) + self._dead <= max(self.compact_rows, len(self._keys) // 10):
+            return
+        keys, ids = self._keys[self._alive], self._ids[self._alive]
+        if self._pending:
+            # Os dois lados estão ordenados: as chaves pendentes entram nas suas posições
+            pending_keys = np.array([key for key, _ in self._pending], dtype=f'S{KEY_BYTES}')
+            pending_ids = np.array([recipe_id for _, recipe_id in self._pending], dtype=np.int64)
+            positions = np.searchsorted(keys, pending_keys, 'right')
+            keys, ids = np.insert(keys, positions, pending_keys), np.insert(ids, positions, pending_ids)
+        self._keys, self._ids = keys, ids
+        self._alive = np.ones(len(keys), dtype=bool)
+        self._dead = 0
+        self._pending = []
+
+    def _memory(self) -> int:
+        arrays = self._keys.nbytes + self._ids.nbytes + self._alive.nbytes
+        return arrays + self._title_bytes + len(self._pending) * (KEY_BYTES + _ENTRY_OVERHEAD)
+
+    def _disable(self) -> None:
+        self.enabled = False
+        self._titles = {}
+        self._title_bytes = 0
+        self._keys = np.zeros(0, dtype=f'S{KEY_BYTES}')
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._dead = 0
+        self._pending = []
+
+
+def recipe_titles(engine: Engine, chunk_rows: int = 10000) -> Iterator[Tuple[int, str]]:
+    """
+    Lê `(id, título)` de todas as receitas numa sessão própria (pode rodar fora
+    do contexto da aplicação).
+
+    Args:
+        engine (Engine): Engine do banco de receitas.
+        chunk_rows (int): Linhas buscadas por ida ao banco.
+
+    Yields:
+        Tuple[int, str]: Id e título da receita.
+    """
+    with Session(engine) as session:
+        yield from session.execute(select(Recipe.id, Recipe.title).execution_options(yield_per=chunk_rows))
+
+
+def index_new_titles(session: Session) -> None:
+    """
+    Indexa os títulos das receitas inseridas sem passar pelo índice
+    (importação em massa): todo id acima do maior já indexado.
+
+    Args:
+        session (Session): Sessão SQLAlchemy que enxerga as linhas confirmadas.
+    """
+    rows = session.execute(
+        select(Recipe.id, Recipe.title)
+        .where(Recipe.id > title_index.max_id)
+        .order_by(Recipe.id)
+        .execution_options(yield_per=10000)
+    )
+    title_index.upsert_many(rows)
+
+
+title_index = TitlePrefixIndex()
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterator, List, Sequence, Set
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+from models.models import Recipe
+
+
+# Ids por instrução; mantém CASE + IN abaixo do limite de 999 parâmetros do SQLite.
+CHUNK_SIZE = 100
+FIELDS = ('title', 'ingredients', 'time_minutes')
+
+
+def _chunks(items: Sequence[Any], size: int = CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing_ids(session: Session, ids: Sequence[int]) -> Set[int]:
+    table = Recipe.__table__
+    found: Set[int] = set()
+    for chunk in _chunks(ids):
+        found.update(session.execute(select(table.c.id).where(table.c.id.in_(chunk))).scalars())
+    return found
+
+
+def batch_update(session: Session, patches: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Aplica vários patches com um único `UPDATE ... WHERE id IN (...)` por bloco.
+
+    Cada coluna recebe um `CASE id WHEN ... THEN ...` com os valores dos
+    patches que a alteram; as demais linhas mantêm o valor atual. A versão de
+    cada receita alterada é incrementada. O commit
+    fica a cargo de quem chama, para que o lote seja uma única transação.
+
+    Args:
+        session (Session): Sessão SQLAlchemy.
+        patches (List[Dict[str, Any]]): Patches validados, com `id` e os campos a alterar.
+
+    Returns:
+        Dict[int, str]: Status por id: 'updated' ou 'not_found'.
+    """
+    table = Recipe.__table__
+    found = _existing_ids(session, [patch['id'] for patch in patches])
+    to_apply = [patch for patch in patches if patch['id'] in found]
+
+    for chunk in _chunks(to_apply):
+        values = {}
+        for field in FIELDS:
+            whens = {patch['id']: patch[field] for patch in chunk if field in patch}
+            if whens:
+                values[field] = case(whens, value=table.c.id, else_=table.c[field])
+        ids = [patch['id'] for patch in chunk]
+        session.execute(update(table).where(table.c.id.in_(ids)).values(version=table.c.version + 1, **values))
+
+    return {patch['id']: 'updated' if patch['id'] in found else 'not_found' for patch in patches}
+
+
+def batch_delete(session: Session, ids: List[int]) -> Dict[int, str]:
+    """
+    Remove várias receitas com um `DELETE ... WHERE id IN (...)` por bloco.
+    O commit fica a cargo de quem chama.
+
+    Args:
+        session (Session): Sessão SQLAlchemy.
+        ids (List[int]): Ids das receitas a remover.
+
+    Returns:
+        Dict[int, str]: Status por id: 'deleted' ou 'not_found'.
+    """
+    table = Recipe.__table__
+    found = _existing_ids(session, ids)
+    for chunk in _chunks(sorted(found)):
+        session.execute(delete(table).where(table.c.id.in_(chunk)))
+    return {recipe_id: 'deleted' if recipe_id in found else 'not_found' for recipe_id in ids}
@@ -0,0 +1,169 @@
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from collections import OrderedDict
+from flask import Flask
+import multiprocessing
+import hashlib
+import threading
+import uuid
+
+
+CacheKey = Tuple[int, Tuple[Tuple[str, Hashable], ...]]
+
+
+class RecipeCache:
+    """
+    Cache de respostas em memória para listagens e buscas de receitas.
+
+    As entradas são indexadas pela versão global dos dados mais os parâmetros
+    de consulta normalizados. Toda escrita (`create`, `update`, `delete`) chama
+    `bump_version`, o que invalida imediatamente todas as entradas. O cache é
+    limitado (LRU) e evita o efeito manada: chamadas concorrentes para a mesma
+    chave esperam uma única recomputação.
+
+    A versão fica em memória compartilhada: com a aplicação pré-carregada
+    (`preload_app` no gunicorn), todos os workers criados por fork enxergam
+    as escritas uns dos outros e geram os mesmos ETags. As entradas em si
+    continuam locais a cada worker.
+
+    Attributes:
+        max_entries (int): Número máximo de entradas mantidas.
+        epoch (str): Identificador da instância, que diferencia versões entre reinícios.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.epoch = uuid.uuid4().hex[:8]
+        self._shared_version = multiprocessing.RawValue('q', 0)
+        self._shared_lock = multiprocessing.Lock()
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._inflight: Dict[CacheKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Configura o cache a partir de `RECIPE_CACHE_MAX_ENTRIES` e o registra na aplicação.
+        """
+        self.max_entries = app.config.get('RECIPE_CACHE_MAX_ENTRIES', self.max_entries)
+        app.extensions['recipe_cache'] = self
+
+    @property
+    def version(self) -> int:
+        """
+        Versão global dos dados de receitas, compartilhada entre os workers.
+        """
+        return self._shared_version.value
+
+    @staticmethod
+    def normalize(params: Mapping[str, Any]) -> Tuple[Tuple[str, Hashable], ...]:
+        """
+        Normaliza os parâmetros de consulta: descarta valores vazios, remove
+        espaços das strings e ordena por nome.
+        """
+        normalized = []
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '':
+                continue
+            normalized.append((name, value))
+        return tuple(sorted(normalized))
+
+    def bump_version(self) -> int:
+        """
+        Incrementa a versão global dos dados e descarta as entradas antigas.
+
+        Returns:
+            int: A nova versão.
+        """
+        with self._shared_lock:
+            self._shared_version.value += 1
+            version = self._shared_version.value
+        with self._lock:
+            self._entries.clear()
+        return version
+
+    def etag(self, params: Mapping[str, Any]) -> str:
+        """
+        Gera um ETag forte (sem aspas) para a consulta, a partir da versão atual
+        dos dados e de um digest dos parâmetros normalizados. Não acessa o banco.
+
+        Args:
+            params (Mapping[str, Any]): Parâmetros de consulta da requisição.
+
+        Returns:
+            str: O valor do ETag.
+        """
+        digest = hashlib.blake2b(repr(self.normalize(params)).encode(), digest_size=8).hexdigest()
+        return f'{self.epoch}-{self.version}-{digest}'
+
+    def get_or_compute(self, params: Mapping[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o resultado em cache para `params` ou o calcula com `compute`.
+
+        Apenas uma thread recalcula uma chave ausente; as demais aguardam e
+        reutilizam o resultado. Resultados calculados durante uma escrita
+        concorrente não são armazenados.
+
+        Args:
+            params (Mapping[str, Any]): Parâmetros de consulta da requisição.
+            compute (Callable[[], Any]): Função que produz o resultado a partir do banco.
+
+        Returns:
+            Any: O resultado em cache ou recém calculado.
+        """
+        normalized = self.normalize(params)
+        while True:
+            with self._lock:
+                key = (self.version, normalized)
+                if self._entries and next(iter(self._entries))[0] != key[0]:
+                    # Outro worker escreveu desde a última consulta
+                    self._entries.clear()
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return self._entries[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self._misses += 1
+                    break
+                self._coalesced += 1
+            event.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                if key[0] == self.version:
+                    self._entries[key] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._evictions += 1
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """
+        Retorna as métricas do cache, incluindo a taxa de acerto.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'hit_rate': self._hits / lookups if lookups else None,
+            }
+
+
+recipe_cache = RecipeCache()
@@ -0,0 +1,161 @@
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models.models import Recipe
+from validators.schemas import RecipeCreate
+import msgspec
+import csv
+
+
+FORMATS = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+}
+_row_decoder = msgspec.json.Decoder(RecipeCreate, strict=False)
+
+
+def resolve_format(content_type: Optional[str], fmt: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve o formato da importação ('ndjson' ou 'csv') a partir do parâmetro
+    `format` ou, na ausência dele, do Content-Type da requisição.
+
+    Returns:
+        Optional[str]: O formato reconhecido ou None se não suportado.
+    """
+    if fmt:
+        return fmt if fmt in ('ndjson', 'csv') else None
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    return FORMATS.get(mimetype)
+
+
+def _as_values(recipe: RecipeCreate) -> Dict[str, Any]:
+    return {'title': recipe.title, 'ingredients': recipe.ingredients, 'time_minutes': recipe.time_minutes}
+
+
+def iter_lines(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Divide o corpo da requisição em linhas lendo blocos de `chunk_size` bytes.
+
+    A iteração nativa do stream WSGI lê byte a byte, o que domina o custo da
+    importação em corpos grandes.
+    """
+    buffer = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        *complete, buffer = (buffer + chunk).split(b'\n')
+        yield from complete
+    if buffer:
+        yield buffer
+
+
+def iter_records(lines: Iterable[bytes], fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Lê e valida o corpo da requisição linha a linha, sem carregá-lo inteiro em memória.
+
+    Args:
+        lines (Iterable[bytes]): Linhas brutas do corpo da requisição.
+        fmt (str): 'ndjson' ou 'csv' (com cabeçalho).
+
+    Yields:
+        Tuple[int, Optional[Dict[str, Any]], Optional[str]]: Número da linha,
+        valores validados pelo schema `RecipeCreate` e mensagem de erro, se houver.
+    """
+    if fmt == 'ndjson':
+        for line_no, raw in enumerate(lines, 1):
+            if not raw.strip():
+                continue
+            try:
+                yield line_no, _as_values(_row_decoder.decode(raw)), None
+            except (msgspec.ValidationError, msgspec.DecodeError) as e:
+                yield line_no, None, str(e)
+        return
+
+    decode_errors: List[int] = []
+
+    def decoded() -> Iterator[str]:
+        for line_no, raw in enumerate(lines, 1):
+            try:
+                yield raw.decode('utf-8')
+            except UnicodeDecodeError:
+                decode_errors.append(line_no)
+                yield '\n'
+
+    reader = csv.DictReader(decoded())
+    for row in reader:
+        while decode_errors:
+            yield decode_errors.pop(0), None, "Invalid UTF-8"
+        try:
+            yield reader.line_num, _as_values(msgspec.convert(row, RecipeCreate, strict=False)), None
+        except msgspec.ValidationError as e:
+            yield reader.line_num, None, str(e)
+    while decode_errors:
+        yield decode_errors.pop(0), None, "Invalid UTF-8"
+
+
+def import_recipes(
+    session: Session,
+    lines: Iterable[bytes],
+    fmt: str,
+    batch_size: int = 1000,
+    batches_per_commit: int = 50,
+    max_errors: int = 1000,
+    on_commit: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Importa receitas em massa a partir de um corpo NDJSON ou CSV em streaming.
+
+    As linhas são validadas à medida que chegam e inseridas com `executemany`
+    em lotes de `batch_size`; a transação é confirmada a cada
+    `batches_per_commit` lotes, mantendo memória e tamanho do journal constantes.
+
+    Args:
+        session (Session): Sessão SQLAlchemy usada nas inserções.
+        lines (Iterable[bytes]): Linhas brutas do corpo da requisição.
+        fmt (str): 'ndjson' ou 'csv'.
+        batch_size (int): Linhas por `executemany`.
+        batches_per_commit (int): Lotes por transação.
+        max_errors (int): Máximo de erros detalhados no relatório.
+        on_commit (Optional[Callable[[], Any]]): Chamado após cada commit.
+
+    Returns:
+        Dict[str, Any]: Relatório com `inserted`, `failed`, `errors` por linha
+        e `errors_truncated`.
+    """
+    statement = Recipe.__table__.insert()
+    report: Dict[str, Any] = {'inserted': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    batch: List[Dict[str, Any]] = []
+    pending_batches = 0
+
+    def commit() -> None:
+        session.commit()
+        if on_commit is not None:
+            on_commit()
+
+    for line_no, values, error in iter_records(lines, fmt):
+        if error is not None:
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'line': line_no, 'message': error})
+            else:
+                report['errors_truncated'] = True
+            continue
+
+        batch.append(values)
+        if len(batch) >= batch_size:
+            session.execute(statement, batch)
+            report['inserted'] += len(batch)
+            batch = []
+            pending_batches += 1
+            if pending_batches >= batches_per_commit:
+                commit()
+                pending_batches = 0
+
+    if batch:
+        session.execute(statement, batch)
+        report['inserted'] += len(batch)
+        pending_batches += 1
+    if pending_batches:
+        commit()
+    return report
@@ -0,0 +1,116 @@
+from typing import Optional
+from sqlalchemy import ColumnElement, column, func, select, table
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.orm import Query, Session
+from models.models import Recipe, RECIPE_SEARCH_TABLE, has_ingredient_search
+
+# Campos aceitos em `?sort=`; todos são cobertos por índices de `Recipe`.
+SORT_FIELDS = {
+    'id': Recipe.id,
+    'title': Recipe.title,
+    'time_minutes': Recipe.time_minutes,
+}
+
+_search = table(RECIPE_SEARCH_TABLE, column('rowid'), column('ingredients'))
+# O lower() do SQLite só converte ASCII, então o prefixo é convertido do mesmo jeito.
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def ingredients_filter(session: Session, text: str) -> ColumnElement[bool]:
+    """
+    Filtro por trecho dos ingredientes, respondido pela tabela de busca por
+    trigramas quando o banco a tem e por um LIKE simples caso contrário.
+
+    Args:
+        session (Session): Sessão em que a consulta vai rodar.
+        text (str): Trecho que os ingredientes devem conter.
+
+    Returns:
+        ColumnElement[bool]: A expressão do filtro.
+    """
+    if has_ingredient_search(session.get_bind()):
+        return Recipe.id.in_(select(_search.c.rowid).where(_search.c.ingredients.contains(text)))
+    return Recipe.ingredients.contains(text)
+
+
+def recipe_list_query(
+    session: Session,
+    ingredients: Optional[str] = None,
+    min_time: Optional[int] = None,
+    max_time: Optional[int] = None,
+    sort: str = 'id',
+) -> Query:
+    """
+    Consulta de `GET /recipes`: filtros opcionais por ingredientes e faixa de
+    tempo, ordenada por `sort`.
+
+    Args:
+        session (Session): Sessão em que a consulta vai rodar.
+        ingredients (Optional[str]): Trecho que os ingredientes devem conter.
+        min_time (Optional[int]): Tempo mínimo de preparo.
+        max_time (Optional[int]): Tempo máximo de preparo.
+        sort (str): Chave de `SORT_FIELDS`, com '-' para ordem decrescente.
+
+    Returns:
+        Query: A consulta de receitas.
+    """
+    query = session.query(Recipe)
+    if ingredients:
+        query = query.filter(ingredients_filter(session, ingredients))
+    if min_time is not None:
+        query = query.filter(Recipe.time_minutes >= min_time)
+    if max_time is not None:
+        query = query.filter(Recipe.time_minutes <= max_time)
+    sort_column = SORT_FIELDS[sort.lstrip('-')]
+    if (min_time is not None or max_time is not None) and sort_column is not Recipe.time_minutes:
+        # Ordenar por `+coluna` (sem efeito no SQLite) impede o planejador de
+        # responder à faixa de tempo percorrendo inteiro o rowid ou o índice de
+        # título na ordem pedida: ele busca no índice de tempo e ordena só as
+        # linhas encontradas.
+        sort_column = UnaryExpression(sort_column, operator=operators.custom_op('+'))
+    return query.order_by(sort_column.desc() if sort.startswith('-') else sort_column.asc())
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Menor texto maior que todo texto que começa por `prefix`, na ordem dos
+    code points (a collation BINARY do SQLite sobre UTF-8).
+
+    Args:
+        prefix (str): Prefixo não vazio.
+
+    Returns:
+        Optional[str]: O limite, ou None quando não existe.
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def title_prefix_query(session: Session, prefix: str, limit: int) -> Query:
+    """
+    Consulta de reserva de `GET /recipes/autocomplete`: títulos que começam por
+    `prefix`, sem diferenciar maiúsculas ASCII. É uma faixa sobre `lower(title)`
+    em vez de LIKE, então o SQLite busca em ix_recipe_title_lower e para após
+    `limit` linhas.
+
+    Args:
+        session (Session): Sessão em que a consulta vai rodar.
+        prefix (str): Início do título.
+        limit (int): Máximo de linhas.
+
+    Returns:
+        Query: Linhas `(id, título)` ordenadas pelo título em minúsculas.
+    """
+    folded = prefix.translate(_ASCII_LOWER)
+    title = func.lower(Recipe.title)
+    query = session.query(Recipe.id, Recipe.title).filter(title >= folded)
+    upper = prefix_upper_bound(folded)
+    if upper is not None:
+        query = query.filter(title < upper)
+    return query.order_by(title).limit(limit)
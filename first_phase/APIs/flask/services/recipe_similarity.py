@@ -0,0 +1,477 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from flask import Flask
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models.models import Recipe
+import numpy as np
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Estado trocado por uma remontagem em segundo plano (ver RecipeSimilarityIndex.refresh).
+_STATE = ('_vocabulary', '_idf', '_extra_idf', '_ids', '_alive', '_live', '_base', '_postings',
+          '_term_max', '_pending', '_pending_matrix', '_dead', 'max_id', 'built_at')
+
+
+def normalize_ingredients(text: str) -> List[str]:
+    """
+    Separa os ingredientes por vírgula em nomes distintos, em minúsculas e com
+    espaços colapsados, para que "Flour,  eggs" e "flour, Eggs" sejam o mesmo
+    documento.
+
+    Args:
+        text (str): Ingredientes como gravados na receita.
+
+    Returns:
+        List[str]: Nomes normalizados, na ordem em que aparecem.
+    """
+    names: Dict[str, None] = {}
+    for part in text.split(','):
+        name = ' '.join(part.split()).lower()
+        if name:
+            names[name] = None
+    return list(names)
+
+
+class RecipeSimilarityIndex:
+    """
+    Índice TF-IDF em memória dos ingredientes das receitas, usado pela busca
+    de receitas relacionadas.
+
+    Cada receita é um conjunto de ingredientes normalizados com peso IDF e
+    norma L2 unitária, então o produto escalar de duas linhas é a similaridade
+    de cosseno. As linhas ficam numa matriz CSR base e na sua transposta
+    (ingrediente -> receitas); os vizinhos de um lote de receitas saem de um
+    único produto esparso com a transposta, que só toca receitas com algum
+    ingrediente em comum.
+
+    As escritas são incrementais: uma receita criada ou alterada entra num
+    segmento pendente pequeno e a linha antiga da base é marcada como
+    removida. Quando pendentes e removidas passam de `compact_rows` (ou de um
+    décimo da base), a base é remontada e os pesos IDF recalculados; até lá,
+    ingredientes novos recebem o IDF de um termo visto uma vez e os existentes
+    mantêm seus pesos.
+
+    Ingredientes básicos aparecem na maioria das receitas, então uma consulta
+    lê primeiro as listas dos seus ingredientes mais raros, um por vez, e
+    para assim que o k-ésimo melhor escore supera o máximo que qualquer outra
+    receita alcançaria pelos ingredientes restantes (MaxScore). Só se isso
+    exigir mais de quatro vezes `candidate_postings` entradas a consulta cai
+    no produto completo; o resultado é exato nos dois casos.
+
+    Com `preload_app`, o índice é montado no mestre e herdado pelos workers
+    por fork. Cada worker aplica apenas as próprias escritas; as dos demais
+    aparecem na próxima remontagem (`refresh`).
+
+    Attributes:
+        compact_rows (int): Pendentes mais removidas que disparam a remontagem.
+        candidate_postings (int): Entradas lidas antes de cair no produto completo.
+        refresh_seconds (float): Idade máxima do índice antes de uma remontagem em segundo plano.
+        max_k (int): Máximo de vizinhos por consulta aceito pela rota.
+        max_id (int): Maior id de receita já indexado.
+        built_at (float): `time.monotonic()` da última montagem completa.
+    """
+
+    def __init__(self, compact_rows: int = 10000, candidate_postings: int = 20000) -> None:
+        self.compact_rows = compact_rows
+        self.candidate_postings = candidate_postings
+        self.refresh_seconds = 0.0
+        self.max_k = 100
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._vocabulary: Dict[str, int] = {}
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._extra_idf: List[float] = []
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._live = 0
+        self._base = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._postings = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._term_max = np.zeros(0, dtype=np.float32)
+        self._pending: Dict[int, np.ndarray] = {}
+        self._pending_matrix: Optional[Tuple[np.ndarray, sparse.csr_matrix]] = None
+        self._dead = 0
+        self.max_id = 0
+        self.built_at = 0.0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Configura o índice a partir de `SIMILAR_*` e o registra na aplicação.
+        """
+        self.compact_rows = app.config.get('SIMILAR_COMPACT_ROWS', self.compact_rows)
+        self.candidate_postings = app.config.get('SIMILAR_CANDIDATE_POSTINGS', self.candidate_postings)
+        self.refresh_seconds = app.config.get('SIMILAR_REFRESH_SECONDS', self.refresh_seconds)
+        self.max_k = app.config.get('SIMILAR_MAX_K', self.max_k)
+        app.extensions['recipe_similarity'] = self
+
+    @property
+    def built(self) -> bool:
+        """
+        Indica se o índice já foi montado a partir do banco.
+        """
+        return self.built_at > 0
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Substitui o índice pelas receitas dadas.
+
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, ingredientes)` de todas as receitas.
+        """
+        ids, indptr, indices, vocabulary = [], [0], [], {}
+        for recipe_id, ingredients in rows:
+            ids.append(recipe_id)
+            indices.extend(vocabulary.setdefault(name, len(vocabulary)) for name in normalize_ingredients(ingredients))
+            indptr.append(len(indices))
+        with self._lock:
+            self._vocabulary = vocabulary
+            self._extra_idf = []
+            self._pending = {}
+            self._rebuild(np.array(ids, dtype=np.int64), np.array(indptr, dtype=np.int64),
+                          np.array(indices, dtype=np.int32))
+            self.max_id = max(ids, default=0)
+            self.built_at = time.monotonic()
+
+    def upsert(self, recipe_id: int, ingredients: str) -> None:
+        """
+        Indexa uma receita criada ou reindexa uma cujos ingredientes mudaram.
+
+        Args:
+            recipe_id (int): Id da receita.
+            ingredients (str): Ingredientes atuais da receita.
+        """
+        self.upsert_many([(recipe_id, ingredients)])
+
+    def upsert_many(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Indexa várias receitas criadas ou alteradas, compactando no máximo uma vez.
+
+        Args:
+            rows (Iterable[Tuple[int, str]]): `(id, ingredientes)` das receitas.
+        """
+        with self._lock:
+            for recipe_id, ingredients in rows:
+                if self._journal is not None:
+                    self._journal.append((recipe_id, ingredients))
+                self._discard(recipe_id)
+                self._pending[recipe_id] = self._term_ids(normalize_ingredients(ingredients))
+                self.max_id = max(self.max_id, recipe_id)
+            self._pending_matrix = None
+            self._maybe_compact()
+
+    def remove(self, recipe_id: int) -> None:
+        """
+        Retira do índice uma receita removida.
+
+        Args:
+            recipe_id (int): Id da receita.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((recipe_id, None))
+            if self._discard(recipe_id):
+                self._pending_matrix = None
+                self._maybe_compact()
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._pending or self._row(recipe_id) is not None
+
+    def neighbors(self, recipe_ids: Sequence[int], k: int) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Calcula juntos os k vizinhos mais similares de várias receitas.
+
+        Args:
+            recipe_ids (Sequence[int]): Receitas consultadas; ids desconhecidos são ignorados.
+            k (int): Vizinhos por receita.
+
+        Returns:
+            Dict[int, List[Tuple[int, float]]]: Pares `(id, escore)` em ordem decrescente de
+            escore (empates por id) para cada receita conhecida; receitas sem ingrediente em
+            comum ficam de fora.
+        """
+        with self._lock:
+            known = [recipe_id for recipe_id in recipe_ids if recipe_id in self]
+            if not known:
+                return {}
+            queries = self._matrix([self._terms(recipe_id) for recipe_id in known])
+            base_queries = queries[:, :self._postings.shape[0]].tocsr()
+            pending_ids, pending = self._pending_rows()
+            pending_scores = (queries @ pending.T).tocsr()
+
+            base = {row: self._pruned(base_queries, row, recipe_id, k) for row, recipe_id in enumerate(known)}
+            full = [row for row, found in base.items() if found is None]
+            if full:
+                # Consultas que a poda não resolveu dividem um único produto esparso
+                scores = (base_queries[full] @ self._postings).tocsr()
+                for position, row in enumerate(full):
+                    start, stop = scores.indptr[position], scores.indptr[position + 1]
+                    base[row] = self._live_rows(scores.indices[start:stop], scores.data[start:stop])
+
+            results = {}
+            for row, recipe_id in enumerate(known):
+                start, stop = pending_scores.indptr[row], pending_scores.indptr[row + 1]
+                candidate_ids = np.concatenate([base[row][0], pending_ids[pending_scores.indices[start:stop]]])
+                scores = np.concatenate([base[row][1], pending_scores.data[start:stop]])
+                mask = candidate_ids != recipe_id
+                results[recipe_id] = _top_k(candidate_ids[mask], scores[mask], k)
+            return results
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna os contadores de tamanho do índice: receitas indexadas,
+        pendentes, removidas, vocabulário e memória aproximada das matrizes
+        esparsas em bytes.
+        """
+        with self._lock:
+            matrices = (self._base, self._postings)
+            memory = sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
+            return {
+                'recipes': self._live + len(self._pending),
+                'pending': len(self._pending),
+                'tombstones': self._dead,
+                'vocabulary': len(self._vocabulary),
+                'memory_bytes': int(memory + self._ids.nbytes + self._alive.nbytes),
+            }
+
+    def refresh(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        """
+        Remonta o índice numa thread em segundo plano quando a última montagem
+        tem mais de `refresh_seconds`, trazendo as escritas feitas por outros
+        workers. Escritas aplicadas enquanto isso são registradas e reaplicadas
+        no índice novo.
+
+        Args:
+            load (Callable[[], Iterable[Tuple[int, str]]]): Retorna `(id, ingredientes)`
+                de todas as receitas.
+        """
+        with self._lock:
+            if self.refresh_seconds <= 0 or self._refreshing or time.monotonic() - self.built_at < self.refresh_seconds:
+                return
+            self._refreshing = True
+            self._journal = []
+
+        def rebuild() -> None:
+            try:
+                fresh = RecipeSimilarityIndex(self.compact_rows, self.candidate_postings)
+                fresh.build(load())
+                with self._lock:
+                    for recipe_id, ingredients in self._journal:
+                        if ingredients is None:
+                            fresh.remove(recipe_id)
+                        else:
+                            fresh.upsert(recipe_id, ingredients)
+                    for name in _STATE:
+                        setattr(self, name, getattr(fresh, name))
+            except Exception:
+                logger.exception('Recipe similarity index refresh failed')
+            finally:
+                with self._lock:
+                    self._journal = None
+                    self._refreshing = False
+                    self.built_at = max(self.built_at, time.monotonic())
+
+        threading.Thread(target=rebuild, name='recipe-similarity-refresh', daemon=True).start()
+
+    def _pruned(self, queries: sparse.csr_matrix, row: int, recipe_id: int, k: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # Escores exatos das receitas que dividem os ingredientes mais raros da consulta,
+        # lidos um por vez até nenhuma outra receita poder entrar no top k; None quando
+        # isso exige mais de quatro vezes `candidate_postings` entradas.
+        start, stop = queries.indptr[row], queries.indptr[row + 1]
+        if start == stop:
+            return None
+        terms, weights = queries.indices[start:stop], queries.data[start:stop]
+        indptr = self._postings.indptr
+        order = np.argsort(indptr[terms + 1] - indptr[terms], kind='stable')
+        terms, weights = terms[order], weights[order]
+        # O máximo que uma receita sem nenhum de terms[:i] alcança por terms[i:]: limitado
+        # pelos maiores pesos dos termos e, sendo as linhas unitárias, pela norma dos pesos.
+        bounds = np.minimum(
+            np.cumsum((weights * self._term_max[terms])[::-1])[::-1],
+            np.sqrt(np.cumsum((weights ** 2)[::-1])[::-1]),
+        )
+        query = np.zeros(self._postings.shape[0], dtype=np.float32)
+        query[terms] = weights
+        seen = np.zeros(len(self._ids), dtype=bool)
+        ids, scores, best = [], [], np.zeros(0, dtype=np.float32)
+        read = 0
+        for position, term in enumerate(terms):
+            rows = self._postings.indices[indptr[term]:indptr[term + 1]]
+            read += len(rows)
+            if read > 4 * self.candidate_postings and position > 0:
+                return None
+            rows = rows[~seen[rows]]
+            seen[rows] = True
+            rows = rows[self._alive[rows]]
+            ids.append(self._ids[rows])
+            scores.append(_row_dot(self._base, rows, query))
+            best = np.concatenate([best, scores[-1][ids[-1] != recipe_id]])
+            if len(best) > k:
+                best = np.partition(best, len(best) - k)[len(best) - k:]
+            if position + 1 == len(terms) or (len(best) == k and best.min() >= bounds[position + 1]):
+                break
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def _live_rows(self, rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keep = self._alive[rows]
+        return self._ids[rows[keep]], np.asarray(scores)[keep]
+
+    def _term_ids(self, names: List[str]) -> np.ndarray:
+        # Ingredientes novos recebem o IDF de um termo de uma só receita até a próxima remontagem
+        terms = []
+        for name in names:
+            term = self._vocabulary.get(name)
+            if term is None:
+                term = self._vocabulary[name] = len(self._vocabulary)
+                self._extra_idf.append(float(np.log((1 + self._live + len(self._pending)) / 2) + 1))
+            terms.append(term)
+        return np.array(terms, dtype=np.int32)
+
+    def _weights(self) -> np.ndarray:
+        if self._extra_idf:
+            self._idf = np.concatenate([self._idf, np.array(self._extra_idf, dtype=np.float32)])
+            self._extra_idf = []
+        return self._idf
+
+    def _terms(self, recipe_id: int) -> np.ndarray:
+        if recipe_id in self._pending:
+            return self._pending[recipe_id]
+        row = self._row(recipe_id)
+        return self._base.indices[self._base.indptr[row]:self._base.indptr[row + 1]]
+
+    def _matrix(self, rows: List[np.ndarray]) -> sparse.csr_matrix:
+        # Linhas IDF normalizadas sobre o vocabulário atual
+        idf = self._weights()
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(terms) for terms in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        matrix = sparse.csr_matrix((idf[indices], indices, indptr), shape=(len(rows), len(idf)), dtype=np.float32)
+        return _normalize_rows(matrix)
+
+    def _pending_rows(self) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        if self._pending_matrix is None or self._pending_matrix[1].shape[1] != len(self._vocabulary):
+            ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+            self._pending_matrix = (ids, self._matrix(list(self._pending.values())))
+        return self._pending_matrix
+
+    def _discard(self, recipe_id: int) -> bool:
+        if self._pending.pop(recipe_id, None) is not None:
+            return True
+        row = self._row(recipe_id)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._live -= 1
+        self._dead += 1
+        return True
+
+    def _row(self, recipe_id: int) -> Optional[int]:
+        # Linhas da base ordenadas por id; linhas removidas não contam
+        row = int(np.searchsorted(self._ids, recipe_id))
+        if row < len(self._ids) and self._ids[row] == recipe_id and self._alive[row]:
+            return row
+        return None
+
+    def _maybe_compact(self) -> None:
+        if len(self._pending) + self._dead <= max(self.compact_rows, self._live // 10):
+            return
+        live = self._base[self._alive]
+        pending_ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        pending_terms = list(self._pending.values())
+        indptr = np.concatenate([live.indptr, live.indptr[-1] + np.cumsum([len(terms) for terms in pending_terms], dtype=np.int64)])
+        indices = np.concatenate([live.indices] + pending_terms).astype(np.int32)
+        self._pending = {}
+        self._rebuild(np.concatenate([self._ids[self._alive], pending_ids]), indptr, indices)
+
+    def _rebuild(self, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> None:
+        # Recalcula o IDF sobre as receitas vivas e guarda as linhas normalizadas,
+        # ordenadas por id, e a transposta.
+        vocabulary_size = len(self._vocabulary)
+        document_frequency = np.bincount(indices, minlength=vocabulary_size)
+        self._idf = (np.log((1 + len(ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self._extra_idf = []
+        matrix = sparse.csr_matrix((self._idf[indices], indices, indptr), shape=(len(ids), vocabulary_size), dtype=np.float32)
+        order = np.argsort(ids, kind='stable')
+        if np.any(order != np.arange(len(ids))):
+            ids, matrix = ids[order], matrix[order]
+        self._base = _normalize_rows(matrix)
+        self._postings = self._base.T.tocsr()
+        self._term_max = np.zeros(vocabulary_size, dtype=np.float32)
+        used = np.flatnonzero(np.diff(self._postings.indptr))
+        if len(used):
+            self._term_max[used] = np.maximum.reduceat(self._postings.data, self._postings.indptr[used])
+        self._ids = ids
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._live = len(ids)
+        self._pending_matrix = None
+        self._dead = 0
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+def _row_dot(matrix: sparse.csr_matrix, rows: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    # matrix[rows] @ vector direto dos arrays CSR, sem montar a submatriz
+    starts = matrix.indptr[rows]
+    lengths = matrix.indptr[rows + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+    products = matrix.data[positions] * vector[matrix.indices[positions]]
+    scores = np.zeros(len(rows), dtype=np.float32)
+    nonempty = lengths > 0
+    if len(products):
+        scores[nonempty] = np.add.reduceat(products, offsets[nonempty])
+    return scores
+
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    if len(ids) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))
+    return [(int(ids[i]), round(float(scores[i]), 6)) for i in order]
+
+
+def recipe_ingredients(engine: Engine, chunk_rows: int = 10000) -> Iterator[Tuple[int, str]]:
+    """
+    Lê `(id, ingredientes)` de todas as receitas, em ordem de id, numa sessão
+    própria (pode rodar fora do contexto da aplicação).
+
+    Args:
+        engine (Engine): Engine do banco de receitas.
+        chunk_rows (int): Linhas buscadas por ida ao banco.
+
+    Yields:
+        Tuple[int, str]: Id e ingredientes da receita.
+    """
+    with Session(engine) as session:
+        yield from session.execute(
+            select(Recipe.id, Recipe.ingredients).order_by(Recipe.id).execution_options(yield_per=chunk_rows)
+        )
+
+
+def index_new_recipes(session: Session) -> None:
+    """
+    Indexa as receitas inseridas sem passar pelo índice (importação em massa):
+    todo id acima do maior já indexado.
+
+    Args:
+        session (Session): Sessão SQLAlchemy que enxerga as linhas confirmadas.
+    """
+    rows = session.execute(
+        select(Recipe.id, Recipe.ingredients)
+        .where(Recipe.id > similarity_index.max_id)
+        .order_by(Recipe.id)
+        .execution_options(yield_per=10000)
+    )
+    similarity_index.upsert_many(rows)
+
+
+similarity_index = RecipeSimilarityIndex()
@@ -0,0 +1,36 @@
+from typing import Iterable, Iterator, Sequence, Tuple, Any
+import json
+
+
+def iter_json_array(
+    rows: Iterable[Tuple[Any, ...]],
+    fields: Sequence[str],
+    chunk_rows: int = 1000,
+) -> Iterator[str]:
+    """
+    Serializa linhas como um array JSON de objetos, bloco a bloco.
+
+    Cada bloco de `chunk_rows` linhas é emitido assim que fica pronto, então a
+    memória de pico não depende do tamanho do resultado.
+
+    Args:
+        rows (Iterable[Tuple[Any, ...]]): Linhas do banco, na ordem de `fields`.
+        fields (Sequence[str]): Nomes das chaves de cada objeto.
+        chunk_rows (int): Linhas por bloco emitido.
+
+    Yields:
+        str: Fragmentos do array JSON.
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    yield '['
+    chunk = []
+    separator = ''
+    for row in rows:
+        chunk.append(encode(dict(zip(fields, row))))
+        if len(chunk) >= chunk_rows:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']'
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import ETags
+from models.models import Recipe
+
+
+def if_match_versions(if_match: ETags) -> Optional[List[int]]:
+    """
+    Converte o cabeçalho `If-Match` nas versões aceitas para a atualização.
+
+    A comparação é forte, como pede o `If-Match`: ETags fracos e valores que
+    não são versões nunca casam.
+
+    Returns:
+        Optional[List[int]]: None se o cabeçalho está ausente ou é `*` (qualquer
+        versão serve); caso contrário, as versões aceitas, possivelmente vazia.
+    """
+    if not if_match or if_match.star_tag:
+        return None
+    return [int(tag) for tag in if_match.as_set() if tag.isdigit()]
+
+
+def conditional_update(
+    session: Session,
+    recipe_id: int,
+    values: Dict[str, Any],
+    versions: Optional[List[int]] = None,
+) -> Tuple[str, Optional[int]]:
+    """
+    Atualiza uma receita com um único `UPDATE ... WHERE id = ? AND version IN (...)
+    RETURNING version`, incrementando a versão, sem SELECT prévio nem lock.
+
+    Só quando nenhuma linha é alterada uma consulta extra distingue receita
+    inexistente de conflito de versão. O commit fica a cargo de quem chama.
+
+    Args:
+        session (Session): Sessão SQLAlchemy.
+        recipe_id (int): Id da receita.
+        values (Dict[str, Any]): Campos a alterar.
+        versions (Optional[List[int]]): Versões aceitas (de `If-Match`); None
+            atualiza qualquer versão.
+
+    Returns:
+        Tuple[str, Optional[int]]: 'updated' com a nova versão, 'conflict' com a
+        versão atual ou 'not_found' com None.
+    """
+    table = Recipe.__table__
+    statement = update(table).where(table.c.id == recipe_id)
+    if versions is not None:
+        statement = statement.where(table.c.version.in_(versions))
+    statement = statement.values(version=table.c.version + 1, **values).returning(table.c.version)
+
+    new_version = session.execute(statement).scalar()
+    if new_version is not None:
+        return 'updated', new_version
+    current = session.execute(select(table.c.version).where(table.c.id == recipe_id)).scalar()
+    return ('not_found', None) if current is None else ('conflict', current)
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Sequence, Tuple
+from werkzeug.security import generate_password_hash
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from models.models import User
+from settings.tracing import span
+
+
+def _chunks(items: Sequence[Tuple[str, str]], size: int) -> Iterator[Sequence[Tuple[str, str]]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def provision_users(
+    session: Session,
+    users: List[Tuple[str, str]],
+    workers: int = 4,
+    batch_size: int = 500,
+) -> Dict[str, str]:
+    """
+    Cria usuários em massa: hashes de senha em paralelo e INSERT em lotes.
+
+    O hash domina o custo e libera o GIL, então roda em um pool de threads,
+    um lote por vez, enquanto cada lote é inserido com um único
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING username`. Usernames já
+    existentes são detectados pela restrição UNIQUE, sem SELECT prévio. O
+    commit fica a cargo de quem chama.
+
+    Args:
+        session (Session): Sessão SQLAlchemy.
+        users (List[Tuple[str, str]]): Pares (username, senha em texto plano).
+        workers (int): Threads usadas no hash das senhas.
+        batch_size (int): Usuários por INSERT.
+
+    Returns:
+        Dict[str, str]: Status por username: 'created' ou 'exists'. Usernames
+        repetidos na requisição são criados uma vez, com a primeira senha.
+    """
+    status: Dict[str, str] = {}
+    unique: List[Tuple[str, str]] = []
+    for username, password in users:
+        if username not in status:
+            status[username] = 'exists'
+            unique.append((username, password))
+
+    table = User.__table__
+    statement = insert(table).on_conflict_do_nothing(index_elements=['username']).returning(table.c.username)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk in _chunks(unique, batch_size):
+            with span('password.hash', count=len(chunk), workers=workers):
+                hashes = list(executor.map(generate_password_hash, [password for _, password in chunk]))
+            rows = [{'username': username, 'password': hashed} for (username, _), hashed in zip(chunk, hashes)]
+            for username in session.execute(statement, rows).scalars():
+                status[username] = 'created'
+    return status
@@ -1,8 +1,10 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import IntegrityError
 from flask import jsonify, Response
 from typing import Dict, Tuple
 from models import db, User
+from settings.tracing import span
 
 
 class UserService:
@@ -11,6 +13,9 @@ class UserService:
         """
         Registra um novo usuário no banco de dados.
 
+        Faz um único INSERT e confia na restrição UNIQUE de `username` para
+        detectar duplicatas, sem SELECT prévio nem janela de corrida.
+
         Args:
             data (Dict[str, str]): Dicionário contendo 'username' e 'password'.
 
@@ -19,13 +24,15 @@ class UserService:
                 201 se usuário criado com sucesso,
                 400 se usuário já existe.
         """
-        if User.query.filter_by(username=data['username']).first():
-            return jsonify({"message": "User already exists"}), 400
-        
-        hashed_password = generate_password_hash(data['password'])
+        with span('password.hash'):
+            hashed_password = generate_password_hash(data['password'])
         user = User(username=data['username'], password=hashed_password)
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"message": "User already exists"}), 400
         return jsonify({"message": "User created successfully"}), 201
 
     @staticmethod
@@ -42,7 +49,9 @@ class UserService:
                 401 se credenciais inválidas.
         """
         user = User.query.filter_by(username=data['username']).first()
-        if not user or not check_password_hash(user.password, data['password']):
+        with span('password.verify'):
+            valid = user is not None and check_password_hash(user.password, data['password'])
+        if not valid:
             return jsonify({"message": "Invalid credentials"}), 401
         
         token = create_access_token(identity=user.username)
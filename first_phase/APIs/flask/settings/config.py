@@ -1,22 +1,137 @@
+from typing import Optional
+import os
+
+
 class Config:
     """
     Configurações da aplicação Flask.
 
     Attributes:
         SECRET_KEY (str): Chave secreta usada pelo Flask para sessões e segurança.
-        CACHE_TYPE (str): Tipo de cache utilizado pela aplicação (ex: 'simple').
+        RECIPE_CACHE_MAX_ENTRIES (int): Número máximo de respostas de listagem de receitas mantidas em cache.
+        RECIPE_IMPORT_BATCH_SIZE (int): Linhas inseridas por `executemany` na importação em massa.
+        RECIPE_IMPORT_BATCHES_PER_COMMIT (int): Lotes confirmados por transação na importação em massa.
+        RECIPE_IMPORT_MAX_ERRORS (int): Máximo de erros por linha detalhados no relatório de importação.
+        RECIPE_BATCH_MAX_ITEMS (int): Máximo de itens aceitos pelos endpoints de atualização e remoção em lote.
+        RECIPE_STREAM_CHUNK_ROWS (int): Linhas lidas do banco e serializadas por bloco na listagem em streaming.
+        SIMILAR_MAX_K (int): Máximo de receitas relacionadas retornadas por `GET /recipes/<id>/similar`.
+        SIMILAR_COMPACT_ROWS (int): Receitas pendentes mais removidas que disparam a remontagem do índice de similaridade.
+        SIMILAR_CANDIDATE_POSTINGS (int): Entradas lidas pela busca podada antes de cair no produto esparso completo.
+        SIMILAR_REFRESH_SECONDS (float): Idade máxima do índice de similaridade antes de ser remontado em segundo plano, trazendo escritas de outros workers (0 desliga).
+        AUTOCOMPLETE_MAX_LIMIT (int): Máximo de resultados retornados por `GET /recipes/autocomplete`.
+        AUTOCOMPLETE_MAX_BYTES (int): Teto de memória do índice de títulos; acima dele o autocompletar consulta o banco.
+        AUTOCOMPLETE_REFRESH_SECONDS (float): Idade máxima do índice de títulos antes de ser remontado em segundo plano (0 desliga).
+        ADMIN_USERNAMES (tuple): Usuários com acesso aos endpoints administrativos (variável `ADMIN_USERNAMES`, separada por vírgulas).
+        USER_BULK_MAX_ITEMS (int): Máximo de usuários aceitos por requisição de criação em massa.
+        USER_BULK_BATCH_SIZE (int): Usuários por INSERT na criação em massa.
+        USER_HASH_WORKERS (int): Threads usadas para calcular hashes de senha na criação em massa.
         SWAGGER (dict): Configurações para a documentação Swagger UI.
-        SQLALCHEMY_DATABASE_URI (str): URI de conexão do banco de dados SQLAlchemy.
+        DOCS_MODE (str): Documentação da API: 'dynamic' (flasgger em runtime), 'static' (spec pré-gerado) ou 'disabled'.
+        APISPEC_FILE (str): Spec pré-gerado por `flask build-apispec`, relativo à raiz da aplicação.
+        DOCS_UI_CDN (str): Base de onde a página da documentação carrega os assets do Swagger UI no modo 'static'.
+        SQLALCHEMY_DATABASE_URI (str): URI de conexão do banco de dados SQLAlchemy (variável `DATABASE_URL`).
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag para desabilitar o monitoramento de modificações no SQLAlchemy.
+        SQLITE_BUSY_TIMEOUT_MS (int): Espera máxima por um lock de escrita do SQLite entre workers, em milissegundos.
         JWT_SECRET_KEY (str): Chave secreta usada para assinatura dos tokens JWT.
+        LOG_LEVEL (str): Nível mínimo dos logs.
+        LOG_HANDLER (str): Destino dos logs: 'stream' (stderr) ou 'file'.
+        LOG_FORMAT (str): Formato dos registros: 'text' ou 'json' (estruturado).
+        LOG_FILE (str): Arquivo de log quando `LOG_HANDLER` é 'file'.
+        LOG_FILE_MAX_BYTES (int): Tamanho máximo do arquivo de log antes da rotação.
+        LOG_FILE_BACKUP_COUNT (int): Quantidade de arquivos de log rotacionados mantidos.
+        LOG_INFO_SAMPLE_RATE (float): Fração dos logs INFO por requisição mantidos (1.0 mantém todos).
+        LOG_SAMPLED_LOGGERS (tuple): Prefixos dos loggers sujeitos à amostragem.
+        TRACE_SAMPLE_RATE (float): Fração das requisições cujos spans são exportados (0 desliga a exportação).
+        TRACE_FILE (str): Arquivo JSON lines que recebe os spans.
+        TRACE_N_PLUS_ONE_THRESHOLD (int): Execuções de uma mesma instrução SQL por requisição acima das quais um possível N+1 é registrado.
+        PROFILE_SAMPLE_RATE (float): Fração das requisições perfiladas com cProfile (além das pedidas por admins com `X-Profile: 1`).
+        PROFILE_DIR (str): Diretório onde os perfis pstats são gravados.
+        PROFILE_MAX_FILES (int): Quantidade de perfis mais recentes mantidos em `PROFILE_DIR`.
     """
 
     SECRET_KEY = 'your_secret_key_here'
-    CACHE_TYPE = 'simple'
+    RECIPE_CACHE_MAX_ENTRIES = 256
+    RECIPE_IMPORT_BATCH_SIZE = 1000
+    RECIPE_IMPORT_BATCHES_PER_COMMIT = 50
+    RECIPE_IMPORT_MAX_ERRORS = 1000
+    RECIPE_BATCH_MAX_ITEMS = 1000
+    RECIPE_STREAM_CHUNK_ROWS = 1000
+    SIMILAR_MAX_K = 100
+    SIMILAR_COMPACT_ROWS = 10000
+    SIMILAR_CANDIDATE_POSTINGS = 20000
+    SIMILAR_REFRESH_SECONDS = float(os.getenv('SIMILAR_REFRESH_SECONDS', '0'))
+    AUTOCOMPLETE_MAX_LIMIT = 50
+    AUTOCOMPLETE_MAX_BYTES = int(os.getenv('AUTOCOMPLETE_MAX_BYTES', str(512 * 1024 * 1024)))
+    AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', '0'))
+    ADMIN_USERNAMES = tuple(name for name in os.getenv('ADMIN_USERNAMES', '').split(',') if name)
+    USER_BULK_MAX_ITEMS = 10000
+    USER_BULK_BATCH_SIZE = 500
+    USER_HASH_WORKERS = os.cpu_count() or 1
     SWAGGER = {
         'title': 'Catálogo de Receitas',
         'uiversion': 3
     }
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///recipes.db'
+    DOCS_MODE = 'static'
+    APISPEC_FILE = 'static/apispec_1.json'
+    DOCS_UI_CDN = 'https://cdn.jsdelivr.net/npm/swagger-ui-dist@5'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///recipes.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_BUSY_TIMEOUT_MS = 5000
     JWT_SECRET_KEY = 'your_jwt_secret_key_here'
+    LOG_LEVEL = 'INFO'
+    LOG_HANDLER = 'stream'
+    LOG_FORMAT = 'text'
+    LOG_FILE = 'app.log'
+    LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT = 5
+    LOG_INFO_SAMPLE_RATE = 1.0
+    LOG_SAMPLED_LOGGERS = ('routes.', 'services.', 'validators.')
+    TRACE_SAMPLE_RATE = 0.0
+    TRACE_FILE = 'traces.jsonl'
+    TRACE_N_PLUS_ONE_THRESHOLD = 10
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '100'))
+
+
+class DevelopmentConfig(Config):
+    """
+    Configurações de desenvolvimento: logs em texto no stderr, sem amostragem,
+    documentação gerada em runtime para refletir as docstrings editadas e
+    spans de todas as requisições exportados.
+    """
+    LOG_LEVEL = 'DEBUG'
+    DOCS_MODE = 'dynamic'
+    TRACE_SAMPLE_RATE = 1.0
+
+
+class ProductionConfig(Config):
+    """
+    Configurações de produção: logs JSON estruturados em arquivo rotacionado,
+    com amostragem dos logs INFO por requisição. A documentação usa o spec
+    pré-gerado e pode ser desligada com `DOCS_MODE=disabled`. Exporta spans de
+    1% das requisições, ajustável por `TRACE_SAMPLE_RATE`. Com vários workers,
+    os índices de similaridade e de títulos de cada um são remontados a cada
+    5 minutos.
+    """
+    DOCS_MODE = os.getenv('DOCS_MODE', 'static')
+    LOG_HANDLER = 'file'
+    LOG_FORMAT = 'json'
+    LOG_INFO_SAMPLE_RATE = 0.1
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+    SIMILAR_REFRESH_SECONDS = float(os.getenv('SIMILAR_REFRESH_SECONDS', '300'))
+    AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', '300'))
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name: Optional[str] = None) -> type:
+    """
+    Retorna a classe de configuração do ambiente `name` ou, se omitido, da
+    variável de ambiente `APP_ENV` (padrão 'development').
+    """
+    return config_by_name[name or os.getenv('APP_ENV', 'development')]
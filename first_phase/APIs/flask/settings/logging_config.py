@@ -0,0 +1,145 @@
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional, Sequence
+from flask import Flask, has_request_context, request
+import logging
+import random
+import atexit
+import queue
+import copy
+import json
+
+
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostra logs de nível INFO ou inferior emitidos pelos loggers por requisição.
+
+    Avisos e erros sempre passam. Registros descartados nem chegam à fila.
+
+    Attributes:
+        rate (float): Fração (0 a 1) dos registros INFO mantidos.
+        prefixes (Sequence[str]): Prefixos dos loggers amostrados.
+    """
+
+    def __init__(self, rate: float, prefixes: Sequence[str]) -> None:
+        super().__init__()
+        self.rate = rate
+        self.prefixes = tuple(prefixes)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.rate >= 1.0:
+            return True
+        if not record.name.startswith(self.prefixes):
+            return True
+        return random.random() < self.rate
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Anexa método e caminho da requisição ao registro. Roda na thread da
+    requisição, antes do enfileiramento, pois o listener não tem contexto Flask.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    `QueueHandler` que deixa `msg` e `args` sem formatar para o listener.
+
+    O `prepare` padrão formata a mensagem na thread da requisição, move o
+    traceback para `msg` e limpa `exc_info`/`exc_text`. Aqui só o traceback é
+    formatado antes do enfileiramento, em `exc_text`, já que o objeto de
+    traceback não deve atravessar a fila.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata registros como uma linha JSON estruturada.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in ('method', 'path'):
+            if hasattr(record, field):
+                payload[field] = getattr(record, field)
+        if record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _build_handler(app: Flask) -> logging.Handler:
+    if app.config['LOG_HANDLER'] == 'file':
+        handler: logging.Handler = RotatingFileHandler(
+            app.config['LOG_FILE'],
+            maxBytes=app.config['LOG_FILE_MAX_BYTES'],
+            backupCount=app.config['LOG_FILE_BACKUP_COUNT'],
+        )
+    else:
+        handler = logging.StreamHandler()
+    if app.config['LOG_FORMAT'] == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    return handler
+
+
+def configure_logging(app: Flask) -> None:
+    """
+    Configura o logging sem bloqueio: as rotas só enfileiram registros em um
+    `QueueHandler`, e um `QueueListener` em background faz a formatação e a I/O.
+
+    Lê da configuração `LOG_LEVEL`, `LOG_HANDLER` ('stream' ou 'file'),
+    `LOG_FORMAT` ('json' ou 'text'), `LOG_FILE*` e `LOG_INFO_SAMPLE_RATE`.
+
+    Args:
+        app (Flask): Aplicação cuja configuração define o logging.
+    """
+    global _listener, _listener_running
+    if _listener is None:
+        atexit.register(_stop_listener)
+    else:
+        _stop_listener()
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(app.config['LOG_INFO_SAMPLE_RATE'], app.config['LOG_SAMPLED_LOGGERS']))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(app.config['LOG_LEVEL'])
+
+    _listener = QueueListener(log_queue, _build_handler(app), respect_handler_level=True)
+    _listener.start()
+    _listener_running = True
+
+
+def _stop_listener() -> None:
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
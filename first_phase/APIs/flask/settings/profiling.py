@@ -0,0 +1,126 @@
+from typing import Optional, Tuple
+from flask import Flask, Response, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+import threading
+import cProfile
+import logging
+import random
+import time
+import uuid
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileStore:
+    """
+    Diretório de arquivos pstats com retenção por quantidade.
+
+    Attributes:
+        directory (str): Diretório onde os perfis são gravados.
+        max_files (int): Quantidade de perfis mais recentes mantidos.
+    """
+
+    def __init__(self, directory: str, max_files: int) -> None:
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, profile: cProfile.Profile) -> None:
+        """
+        Grava o perfil em `<profile_id>.prof` e remove os arquivos mais antigos
+        além de `max_files`.
+
+        Args:
+            profile_id (str): Nome do arquivo.
+            profile (cProfile.Profile): Perfil da requisição.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{profile_id}.prof')
+        profile.dump_stats(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        with self._lock:
+            entries = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith('.prof')),
+                key=lambda entry: entry.stat().st_mtime_ns,
+            )
+            for entry in entries[:max(len(entries) - self.max_files, 0)]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class Profiler:
+    """
+    Profiling sob demanda com cProfile: perfila a requisição quando um admin
+    envia `X-Profile: 1` com o seu token, ou uma fração `sample_rate` das
+    requisições.
+
+    O perfil cobre a requisição inteira, inclusive o corpo em streaming, e
+    termina ao fechar a resposta. O id do perfil volta no cabeçalho
+    `X-Profile-Id`; o arquivo é `<PROFILE_DIR>/<id>.prof`, legível com `pstats`
+    ou snakeviz.
+
+    Attributes:
+        sample_rate (float): Fração (0 a 1) das requisições perfiladas.
+        store (Optional[ProfileStore]): Destino dos perfis.
+    """
+
+    def __init__(self) -> None:
+        self.sample_rate = 0.0
+        self.store: Optional[ProfileStore] = None
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Configura o profiler a partir de `PROFILE_SAMPLE_RATE`, `PROFILE_DIR` e
+        `PROFILE_MAX_FILES` e registra os hooks de requisição.
+        """
+        self.sample_rate = app.config['PROFILE_SAMPLE_RATE']
+        self.store = ProfileStore(app.config['PROFILE_DIR'], app.config['PROFILE_MAX_FILES'])
+        app.extensions['profiler'] = self
+
+        @app.before_request
+        def start_profile() -> None:
+            if (self.sample_rate > 0 and random.random() < self.sample_rate) or self._requested_by_admin(app):
+                profile = cProfile.Profile()
+                g.profile = (f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}", profile)
+                profile.enable()
+
+        @app.after_request
+        def stop_profile_on_close(response: Response) -> Response:
+            current = g.pop('profile', None)
+            if current is not None:
+                response.headers['X-Profile-Id'] = current[0]
+                response.call_on_close(lambda: self._finish(current))
+            return response
+
+        @app.teardown_request
+        def stop_unfinished_profile(error: Optional[BaseException]) -> None:
+            current = g.pop('profile', None)
+            if current is not None:
+                self._finish(current)
+
+    @staticmethod
+    def _requested_by_admin(app: Flask) -> bool:
+        if request.headers.get('X-Profile') != '1' or not app.config['ADMIN_USERNAMES']:
+            return False
+        try:
+            verify_jwt_in_request(optional=True)
+        except (JWTExtendedException, PyJWTError):
+            return False
+        return get_jwt_identity() in app.config['ADMIN_USERNAMES']
+
+    def _finish(self, current: Tuple[str, cProfile.Profile]) -> None:
+        profile_id, profile = current
+        profile.disable()
+        try:
+            self.store.save(profile_id, profile)
+        except OSError as e:
+            logger.error("Error saving profile %s: %s", profile_id, e)
+
+
+profiler = Profiler()
@@ -0,0 +1,264 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from collections import Counter
+from sqlalchemy import Engine, event
+from flask import Flask, Response, g, request
+import threading
+import logging
+import random
+import json
+import time
+import uuid
+import re
+
+
+logger = logging.getLogger(__name__)
+
+# Colapsa listas `IN (?, ?, ...)` de tamanhos diferentes no mesmo formato de instrução.
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+class Trace:
+    """
+    Estado de uma requisição rastreada.
+
+    Attributes:
+        trace_id (str): Identificador do trace.
+        sampled (bool): Se os spans serão exportados (amostragem na entrada).
+        spans (List[Dict[str, Any]]): Spans concluídos.
+        statements (Counter): Execuções por formato de instrução SQL, para o detector de N+1.
+        stack (List[str]): Ids dos spans abertos; o topo é o pai dos novos spans.
+        start (float): Início da requisição (epoch).
+        began (float): Início da requisição (`perf_counter`), para a duração.
+    """
+
+    __slots__ = ('trace_id', 'sampled', 'spans', 'statements', 'stack', 'start', 'began')
+
+    def __init__(self, sampled: bool) -> None:
+        self.start, self.began = time.time(), time.perf_counter()
+        self.trace_id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.spans: List[Dict[str, Any]] = []
+        self.statements: Counter = Counter()
+        self.stack: List[str] = []
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _record(trace: Trace, span_id: str, parent_id: Optional[str], name: str,
+            start: float, duration: float, attributes: Dict[str, Any]) -> None:
+    trace.spans.append({
+        'trace_id': trace.trace_id,
+        'span_id': span_id,
+        'parent_id': parent_id,
+        'name': name,
+        'start': start,
+        'duration_ms': round(duration * 1000, 3),
+        'attributes': attributes,
+    })
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Abre um span filho do span atual, como inferência ou hash de senha.
+    Sem trace amostrado em andamento, não faz nada.
+
+    Args:
+        name (str): Nome do span.
+        **attributes (Any): Atributos gravados no span.
+    """
+    trace = _current.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    span_id = _new_span_id()
+    parent_id = trace.stack[-1] if trace.stack else None
+    trace.stack.append(span_id)
+    start, began = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stack.pop()
+        _record(trace, span_id, parent_id, name, start, time.perf_counter() - began, attributes)
+
+
+class JsonLinesExporter:
+    """
+    Grava spans em um arquivo JSON lines, um trace por escrita.
+
+    O arquivo é aberto no primeiro uso, então cada worker criado por fork
+    abre o seu próprio descritor em modo append.
+
+    Attributes:
+        path (str): Caminho do arquivo.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = ''.join(json.dumps(item, ensure_ascii=False, default=str) + '\n' for item in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(lines)
+            self._file.flush()
+
+
+class Tracer:
+    """
+    Tracing leve por requisição: um span raiz por requisição com spans filhos
+    para cada instrução SQL (via eventos da engine) e para trechos marcados
+    com `span()`.
+
+    A amostragem é decidida na entrada da requisição; requisições não
+    amostradas só contam as instruções SQL por formato (listas `IN` colapsadas),
+    para o detector de N+1, que registra um aviso quando um mesmo formato roda
+    mais de `n_plus_one_threshold` vezes.
+
+    Attributes:
+        sample_rate (float): Fração (0 a 1) das requisições exportadas.
+        n_plus_one_threshold (int): Execuções de um mesmo formato de instrução acima das quais a requisição é sinalizada.
+        exporter (Optional[JsonLinesExporter]): Destino dos spans.
+    """
+
+    def __init__(self) -> None:
+        self.sample_rate = 0.0
+        self.n_plus_one_threshold = 10
+        self.exporter: Optional[JsonLinesExporter] = None
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Configura o tracer a partir de `TRACE_SAMPLE_RATE`, `TRACE_FILE` e
+        `TRACE_N_PLUS_ONE_THRESHOLD` e registra os hooks de requisição.
+        """
+        self.sample_rate = app.config['TRACE_SAMPLE_RATE']
+        self.n_plus_one_threshold = app.config['TRACE_N_PLUS_ONE_THRESHOLD']
+        self.exporter = JsonLinesExporter(app.config['TRACE_FILE'])
+        app.extensions['tracer'] = self
+
+        @app.before_request
+        def start_request_trace() -> None:
+            g.trace_token = self.start_trace()
+
+        @app.after_request
+        def end_trace_on_close(response: Response) -> Response:
+            token = g.pop('trace_token', None)
+            if token is None:
+                return response
+            trace = _current.get()
+            if trace is not None and trace.sampled:
+                response.headers['X-Trace-Id'] = trace.trace_id
+            name, attributes = self._request_span(response.status_code)
+            # Encerrado ao fechar a resposta, para incluir as consultas feitas
+            # durante o streaming do corpo.
+            response.call_on_close(lambda: self.end_trace(token, name, attributes))
+            return response
+
+        @app.teardown_request
+        def end_unfinished_trace(error: Optional[BaseException]) -> None:
+            token = g.pop('trace_token', None)
+            if token is not None:
+                self.end_trace(token, *self._request_span(500))
+
+    @staticmethod
+    def _request_span(status: int) -> Tuple[str, Dict[str, Any]]:
+        rule = request.url_rule.rule if request.url_rule else request.path
+        return f'{request.method} {rule}', {
+            'http.method': request.method,
+            'http.path': request.path,
+            'http.status': status,
+        }
+
+    def start_trace(self) -> Token:
+        """
+        Inicia o trace de uma requisição, decidindo a amostragem.
+
+        Returns:
+            Token: Token a devolver em `end_trace`.
+        """
+        trace = Trace(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+        if trace.sampled:
+            trace.stack.append(_new_span_id())
+        return _current.set(trace)
+
+    def end_trace(self, token: Token, name: str, attributes: Dict[str, Any]) -> None:
+        """
+        Encerra o trace: roda o detector de N+1 e exporta os spans, se amostrado.
+
+        Args:
+            token (Token): Token devolvido por `start_trace`.
+            name (str): Nome do span raiz.
+            attributes (Dict[str, Any]): Atributos do span raiz.
+        """
+        trace = _current.get()
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Encerrado em outro contexto que o da abertura
+            _current.set(None)
+        if trace is None:
+            return
+
+        repeated = [
+            {'statement': statement, 'count': count}
+            for statement, count in trace.statements.items()
+            if count > self.n_plus_one_threshold
+        ]
+        if repeated:
+            attributes['n_plus_one'] = repeated
+            for item in repeated:
+                logger.warning("Possible N+1 in %s: statement ran %s times: %s", name, item['count'], item['statement'])
+
+        if trace.sampled and self.exporter is not None:
+            attributes['db.statements'] = sum(1 for item in trace.spans if item['name'] == 'db.query')
+            _record(trace, trace.stack[0], None, name, trace.start, time.perf_counter() - trace.began, attributes)
+            try:
+                self.exporter.export(trace.spans)
+            except OSError as e:
+                logger.error("Error exporting trace %s: %s", trace.trace_id, e)
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """
+        Registra os eventos da engine que geram um span por instrução SQL.
+
+        Args:
+            engine (Engine): Engine a instrumentar.
+        """
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any,
+                                  context: Any, executemany: bool) -> None:
+            if _current.get() is not None:
+                conn.info.setdefault('trace_started', []).append((time.time(), time.perf_counter()))
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any,
+                                 context: Any, executemany: bool) -> None:
+            trace = _current.get()
+            if trace is None or not conn.info.get('trace_started'):
+                return
+            start, began = conn.info['trace_started'].pop()
+            statement = _SPACES.sub(' ', statement).strip()
+            if not executemany:
+                # Lotes de executemany são inserções em massa, não N+1
+                trace.statements[_IN_LIST.sub('(?)', statement)] += 1
+            if trace.sampled:
+                attributes: Dict[str, Any] = {'db.statement': statement}
+                if executemany:
+                    attributes['db.rows'] = len(parameters)
+                parent_id = trace.stack[-1] if trace.stack else None
+                _record(trace, _new_span_id(), parent_id, 'db.query', start, time.perf_counter() - began, attributes)
+
+
+tracer = Tracer()
@@ -1,33 +1,67 @@
-from typing import Optional, Dict, Any, Tuple, List
-from flask import jsonify, Response
+from typing import Any, Callable, Tuple, Type, TypeVar
+from flask import jsonify, request, Response
+from functools import wraps
+import msgspec
 import logging
 
 logger = logging.getLogger(__name__)
 
-def validate_json_fields(
-    data: Optional[Dict[str, Any]], 
-    required_fields: List[str]
-) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Response, int]]]:
+View = TypeVar('View', bound=Callable[..., Any])
+
+
+def _invalid(error: Exception) -> Tuple[Response, int]:
+    logger.warning("Validation error: %s", error)
+    return jsonify({"message": f"Invalid input data: {error}"}), 400
+
+
+def validate_body(schema: Type[msgspec.Struct]) -> Callable[[View], View]:
     """
-    Valida se o JSON recebido contém os campos obrigatórios.
+    Decodifica e valida o corpo JSON da requisição em uma única passada.
+
+    O decoder do msgspec é compilado uma vez, quando a rota é declarada. A view
+    recebe a instância de `schema` no argumento `body`; erros de sintaxe ou de
+    validação retornam 400 com `{"message": ...}`.
+
+    Args:
+        schema (Type[msgspec.Struct]): Schema esperado do corpo.
+
+    Returns:
+        Callable[[View], View]: Decorator da view.
+    """
+    decoder = msgspec.json.Decoder(schema, strict=False)
+
+    def decorator(view: View) -> View:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                body = decoder.decode(request.get_data(cache=False))
+            except (msgspec.ValidationError, msgspec.DecodeError) as e:
+                return _invalid(e)
+            return view(*args, body=body, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def validate_query(schema: Type[msgspec.Struct]) -> Callable[[View], View]:
+    """
+    Converte e valida os parâmetros de consulta da requisição.
+
+    A view recebe a instância de `schema` no argumento `query`; parâmetros
+    inválidos retornam 400 com `{"message": ...}`.
 
     Args:
-        data (Optional[Dict[str, Any]]): Dados JSON da requisição a serem validados.
-        required_fields (List[str]): Lista de campos obrigatórios que devem existir em `data`.
+        schema (Type[msgspec.Struct]): Schema esperado dos parâmetros.
 
     Returns:
-        Tuple[Optional[Dict[str, Any]], Optional[Tuple[Response, int]]]:  
-        Retorna os dados validados e None se sucesso,  
-        ou None e uma resposta JSON com erro e código HTTP se falha na validação.
+        Callable[[View], View]: Decorator da view.
     """
-    if not data:
-        logger.error("Validation error: No data provided")
-        return None, (jsonify({"message": "No data provided"}), 400)
-    
-    missing = [field for field in required_fields if field not in data]
-    if missing:
-        logger.error(f"Validation error: Missing fields: {missing}")
-        return None, (jsonify({"message": f"Missing fields: {missing}"}), 400)
-
-    logger.info("JSON validation passed")
-    return data, None
+    def decorator(view: View) -> View:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                query = msgspec.convert(request.args.to_dict(), schema, strict=False)
+            except msgspec.ValidationError as e:
+                return _invalid(e)
+            return view(*args, query=query, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
@@ -0,0 +1,135 @@
+from typing import Annotated, List, Optional, Union
+from msgspec import Meta, Struct, UNSET, UnsetType
+
+
+NonNegativeInt = Annotated[int, Meta(ge=0)]
+PositiveInt = Annotated[int, Meta(ge=1)]
+SortField = Annotated[str, Meta(pattern=r'^-?(id|title|time_minutes)$')]
+
+
+class UserCredentials(Struct):
+    """
+    Corpo de `/register` e `/login`.
+
+    Attributes:
+        username (str): Nome do usuário.
+        password (str): Senha em texto plano.
+    """
+    username: str
+    password: str
+
+
+class UserBulkCreate(Struct):
+    """
+    Corpo de `POST /admin/users/bulk`.
+
+    Attributes:
+        users (List[UserCredentials]): Usuários a criar.
+    """
+    users: Annotated[List[UserCredentials], Meta(min_length=1)]
+
+
+class RecipeCreate(Struct):
+    """
+    Corpo de `POST /recipes`.
+
+    Attributes:
+        title (str): Título da receita.
+        ingredients (str): Ingredientes da receita.
+        time_minutes (int): Tempo de preparo em minutos.
+    """
+    title: str
+    ingredients: str
+    time_minutes: int
+
+
+class RecipeUpdate(Struct):
+    """
+    Corpo de `PUT /recipes/<id>`; campos ausentes ficam `UNSET` e não são alterados.
+
+    Attributes:
+        title (str): Novo título da receita.
+        ingredients (str): Novos ingredientes da receita.
+        time_minutes (int): Novo tempo de preparo em minutos.
+    """
+    title: Union[str, UnsetType] = UNSET
+    ingredients: Union[str, UnsetType] = UNSET
+    time_minutes: Union[int, UnsetType] = UNSET
+
+    def __post_init__(self) -> None:
+        if self.title is UNSET and self.ingredients is UNSET and self.time_minutes is UNSET:
+            raise ValueError("No valid fields provided to update")
+
+
+class RecipePatch(RecipeUpdate, kw_only=True):
+    """
+    Item de `PUT /recipes/batch`.
+
+    Attributes:
+        id (int): Id da receita a atualizar.
+    """
+    id: int
+
+
+class RecipeBatchUpdate(Struct):
+    """
+    Corpo de `PUT /recipes/batch`.
+
+    Attributes:
+        recipes (List[RecipePatch]): Patches a aplicar.
+    """
+    recipes: Annotated[List[RecipePatch], Meta(min_length=1)]
+
+
+class RecipeBatchDelete(Struct):
+    """
+    Corpo de `POST /recipes/batch/delete`.
+
+    Attributes:
+        ids (List[int]): Ids das receitas a remover.
+    """
+    ids: Annotated[List[int], Meta(min_length=1)]
+
+
+class RecipeListQuery(Struct):
+    """
+    Parâmetros de consulta de `GET /recipes`.
+
+    Attributes:
+        ingredients (Optional[str]): Filtro parcial por ingredientes.
+        min_time (Optional[int]): Tempo mínimo de preparo.
+        max_time (Optional[int]): Tempo máximo de preparo.
+        sort (str): Campo de ordenação, com '-' para ordem decrescente.
+        stream (bool): Se a lista deve ser enviada em streaming.
+    """
+    ingredients: Optional[str] = None
+    min_time: Optional[NonNegativeInt] = None
+    max_time: Optional[NonNegativeInt] = None
+    sort: SortField = 'id'
+    stream: bool = False
+
+    def __post_init__(self) -> None:
+        if self.min_time is not None and self.max_time is not None and self.min_time > self.max_time:
+            raise ValueError("min_time must be less than or equal to max_time")
+
+
+class SimilarRecipesQuery(Struct):
+    """
+    Parâmetros de consulta de `GET /recipes/<id>/similar`.
+
+    Attributes:
+        k (int): Quantidade de receitas relacionadas.
+    """
+    k: PositiveInt = 10
+
+
+class AutocompleteQuery(Struct):
+    """
+    Parâmetros de consulta de `GET /recipes/autocomplete`.
+
+    Attributes:
+        q (str): Início do título digitado até agora.
+        limit (int): Máximo de resultados.
+    """
+    q: Annotated[str, Meta(min_length=1)]
+    limit: PositiveInt = 10
@@ -0,0 +1,35 @@
+# Ponto de entrada de produção. Execute a partir deste diretório com:
+#     gunicorn -c gunicorn.conf.py
+# O módulo é importado uma vez no processo mestre (`preload_app`), antes do fork.
+import os
+
+os.environ.setdefault('APP_ENV', 'production')
+
+from app import app
+from models.models import db, configure_sqlite, upgrade_recipe_schema
+from services.recipe_similarity import similarity_index, recipe_ingredients
+from services.recipe_autocomplete import title_index, recipe_titles
+from settings.logging_config import configure_logging
+
+
+with app.app_context():
+    configure_sqlite(db.engine, app.config['SQLITE_BUSY_TIMEOUT_MS'])
+    db.create_all()
+    upgrade_recipe_schema(db.engine)
+    # Montados uma vez no mestre; os workers herdam os índices por fork
+    similarity_index.build(recipe_ingredients(db.engine))
+    title_index.build(recipe_titles(db.engine))
+    # Os workers não devem herdar conexões abertas pelo mestre
+    db.engine.dispose()
+
+
+def reset_after_fork() -> None:
+    """
+    Prepara um worker recém-criado por fork: descarta o pool herdado do mestre
+    sem fechar as conexões dele e reinicia a thread de logging, que não
+    sobrevive ao fork.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    configure_logging(app)
@@ -0,0 +1,119 @@
+"""
+EXPLAIN QUERY PLAN checks for the recipe list and search queries of both APIs.
+
+Each app's schema is created on a temporary SQLite database and every query
+`GET /recipes` and the `/recipes/autocomplete` fallback can issue is compiled
+and planned. Filtered queries must reach the recipes table through SEARCH
+rows only: any `SCAN <table>` row, even one "USING INDEX", reads the whole
+table or index. The only scan allowed is an ORDER BY walk bounded by a LIMIT,
+and the unfiltered list, which returns every row anyway.
+
+Run from first_phase/APIs:
+    python -m pytest -q tests
+"""
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+import importlib
+import pytest
+import sys
+
+APIS_DIR = Path(__file__).resolve().parent.parent
+# Top-level packages both apps define; purged between apps so each imports its own.
+APP_PACKAGES = ("models", "services", "settings", "database", "routes", "validators", "utils")
+
+
+def load_app(name: str):
+    for module in list(sys.modules):
+        if module.split(".")[0] in APP_PACKAGES:
+            del sys.modules[module]
+    app_dir = str(APIS_DIR / name)
+    sys.path.insert(0, app_dir)
+    try:
+        return importlib.import_module("models.models"), importlib.import_module("services.recipe_query")
+    finally:
+        sys.path.remove(app_dir)
+
+
+@pytest.fixture(scope="module", params=["fast_api", "flask"])
+def app(request, tmp_path_factory):
+    if request.param == "flask":
+        pytest.importorskip("flask_sqlalchemy")
+    models, recipe_query = load_app(request.param)
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp(request.param) / 'plans.db'}")
+    models.Recipe.__table__.metadata.create_all(engine)
+    models.upgrade_recipe_schema(engine)
+    assert models.has_ingredient_search(engine), "SQLite without FTS5 trigram support"
+    yield models, recipe_query, engine
+    engine.dispose()
+
+
+def query_plan(engine, query):
+    compiled = query.statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in plan]
+
+
+def table_rows(details, table: str):
+    return [detail for detail in details if detail.split()[:2] in (["SCAN", table], ["SEARCH", table])]
+
+
+def list_plan(app, **filters):
+    models, recipe_query, engine = app
+    with Session(engine) as session:
+        details = query_plan(engine, recipe_query.recipe_list_query(session, **filters))
+    return table_rows(details, models.Recipe.__tablename__), details
+
+
+def assert_searched(app, **filters):
+    rows, details = list_plan(app, **filters)
+    assert rows and all(row.startswith("SEARCH") for row in rows), f"{filters}: {details}"
+
+
+SORTS = ["id", "-id", "title", "-title", "time_minutes", "-time_minutes"]
+RANGES = [{"min_time": 10, "max_time": 30}, {"min_time": 10}, {"max_time": 30}]
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("time_range", RANGES)
+def test_time_range(app, sort, time_range):
+    assert_searched(app, sort=sort, **time_range)
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_ingredients(app, sort):
+    assert_searched(app, ingredients="flour", sort=sort)
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("time_range", RANGES)
+def test_ingredients_and_time_range(app, sort, time_range):
+    assert_searched(app, ingredients="flour", sort=sort, **time_range)
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_unfiltered_sort(app, sort):
+    # Without filters the list is every row, so it is read whole; it must still
+    # be one walk in sort order (rowid or the sort column's index), never a
+    # scan followed by a sort of the whole table.
+    rows, details = list_plan(app, sort=sort)
+    column = sort.lstrip("-")
+    assert len(rows) == 1 and not any("TEMP B-TREE" in detail for detail in details), details
+    assert column == "id" or "USING INDEX" in rows[0] and f"_{column}" in rows[0], details
+
+
+def test_sort_fields_covered(app):
+    _, recipe_query, _ = app
+    assert {sort.lstrip("-") for sort in SORTS} == set(recipe_query.SORT_FIELDS)
+
+
+@pytest.mark.parametrize("prefix", ["Choc", "choc", "c", "50%", ""])
+def test_title_prefix_fallback(app, prefix):
+    # A range search on lower(title): no scan of the table or of the title index
+    models, recipe_query, engine = app
+    with Session(engine) as session:
+        details = query_plan(engine, recipe_query.title_prefix_query(session, prefix, 10))
+    table = models.Recipe.__tablename__
+    assert len(details) == 1 and details[0].startswith(f"SEARCH {table} USING INDEX ix_{table}_title_lower ("), details
@@ -1,9 +1,20 @@
 from fastapi import FastAPI
+from routes.health import router as health_router, warm_up
 from routes.iris_routes import router as iris_router
 from routes.auth_routes import router as auth_router
+from routes.iris_ws import router as iris_ws_router
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 from database import Base, engine
+from database.partitions import migrate_legacy_table
+from database.retention import RETENTION_INTERVAL_SECONDS, apply_retention
+from routes.tracing import TracingMiddleware, tracer
+from routes.profiling import ProfilingMiddleware, profile_store, profile_sample_rate, admin_usernames
+from routes.revocation import REVOCATION_RELOAD_SECONDS, REVOCATION_SYNC_SECONDS, denylist
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import logging
+import time
 
 app = FastAPI(
     title="Iris Prediction API",
@@ -13,10 +24,12 @@ API para predição de espécies de Íris usando Random Forest.
 
 **Funcionalidades:**
 
-- Registro e autenticação de usuários com JWT
+- Registro e autenticação de usuários com JWT, com logout e revogação de tokens
 - Endpoint de predição da espécie de Íris
+- Canal WebSocket (`/iris/ws/predict`) para predições contínuas com uma única autenticação
 - Armazenamento dos logs de predição no banco SQLite
 - Cache em memória para melhorar performance
+- Sondas `/health/live` e `/health/ready`; o worker só fica pronto após o aquecimento
 
 Use o token JWT obtido no login para acessar as rotas protegidas.
 """,
@@ -28,16 +41,67 @@ Use o token JWT obtido no login para acessar as rotas protegidas.
 )
 
 
-# Cria as tabelas no SQLite
+# Tracing por requisição, com um span por instrução SQL
+tracer.instrument_engine(engine)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Profiling sob demanda (cabeçalho X-Profile de um admin) ou por amostragem
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    sample_rate=profile_sample_rate,
+    admin_usernames=admin_usernames,
+)
+
+# Cria as tabelas no SQLite e move os logs de predição antigos para as partições diárias
 Base.metadata.create_all(bind=engine)
+migrate_legacy_table(engine)
 
 # Inclui rotas
 app.include_router(auth_router, prefix="/users", tags=["Users"])
 app.include_router(iris_router, prefix="/iris", tags=["Iris"])
+app.include_router(iris_ws_router, prefix="/iris", tags=["Iris"])
+app.include_router(health_router, prefix="/health", tags=["Health"])
+
+async def retention_loop():
+    # Arquiva as partições antigas na subida e depois a cada intervalo
+    while True:
+        try:
+            await run_in_threadpool(apply_retention, engine)
+        except Exception:
+            logging.getLogger(__name__).exception("Prediction retention failed")
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+
+async def denylist_loop():
+    # O filtro de tokens revogados, montado na subida, é remontado da tabela de hora em hora;
+    # entre remontagens, recebe as revogações feitas pelos outros workers
+    reloaded = time.monotonic()
+    while True:
+        try:
+            if time.monotonic() - reloaded >= REVOCATION_RELOAD_SECONDS:
+                await run_in_threadpool(denylist.load, engine)
+                reloaded = time.monotonic()
+            else:
+                await run_in_threadpool(denylist.sync, engine)
+        except Exception:
+            logging.getLogger(__name__).exception("Token denylist sync failed")
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
 
 @app.on_event("startup")
 async def startup():
     FastAPICache.init(InMemoryBackend())
+    # Antes de aceitar requisições, para nenhum token revogado passar na subida
+    await run_in_threadpool(denylist.load, engine)
+    app.state.retention_task = asyncio.create_task(retention_loop())
+    app.state.denylist_task = asyncio.create_task(denylist_loop())
+    # Predições sintéticas, pool do banco e bcrypt aquecidos antes de /health/ready
+    app.state.warmup_task = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.retention_task.cancel()
+    app.state.denylist_task.cancel()
+    app.state.warmup_task.cancel()
 
 @app.get("/")
 def root():
@@ -0,0 +1,56 @@
+"""
+Benchmark do preditor por tabela de células contra a travessia das árvores.
+
+Monta a tabela (model/lookup.py), que já a verifica em todas as células contra
+model.predict, confere as duas implementações em pontos aleatórios e nos
+próprios limiares de split, e mede a inferência para alguns tamanhos de lote.
+
+Execute a partir do diretório iris_prediction:
+    python -m benchmarks.bench_lookup_predictor
+"""
+from model.artifact import load_model
+from model.lookup import LookupTablePredictor, build_predictor
+import numpy as np
+import argparse
+import time
+
+
+def best_of(func, features: np.ndarray, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(features)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = load_model()
+    start = time.perf_counter()
+    predictor = build_predictor(model)
+    if not isinstance(predictor, LookupTablePredictor):
+        raise SystemExit("Tabela de células indisponível para este modelo (veja LOOKUP_MAX_BYTES)")
+    print(f"tabela {predictor.table.shape} = {predictor.table.nbytes} bytes, montada e verificada em "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    features = rng.uniform([4.0, 2.0, 1.0, 0.0], [8.0, 4.5, 7.0, 2.5], size=(max(args.sizes), 4))
+    edges = np.column_stack([rng.choice(thresholds, len(features)) for thresholds in predictor.thresholds])
+    for sample in (features, edges):
+        assert np.array_equal(predictor.predict(sample), model.predict(sample))
+
+    for size in args.sizes:
+        batch = features[:size]
+        baseline = best_of(model.predict, batch, args.repeat)
+        lookup = best_of(predictor.predict, batch, args.repeat)
+        print(f"rows={size:>7}  árvores {baseline * 1000:8.3f} ms  tabela {lookup * 1000:8.3f} ms"
+              f"  ({baseline / lookup:.1f}x mais rápido)")
+
+
+if __name__ == "__main__":
+    main()
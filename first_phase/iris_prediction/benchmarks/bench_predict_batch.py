@@ -0,0 +1,66 @@
+"""
+Benchmark do scoring em lote: JSON contra o formato binário de POST /iris/predict/batch.
+
+Mede, para o mesmo lote, o trabalho do servidor por requisição sem o banco:
+no caminho JSON, parse do corpo, validação das linhas por IrisInput, montagem
+da matriz, inferência e serialização das classes; no caminho binário,
+decodificação sem cópia, inferência e empacotamento das classes em uint8.
+
+Execute a partir do diretório iris_prediction:
+    python -m benchmarks.bench_predict_batch --rows 10000
+"""
+from pydantic import TypeAdapter
+from routes.schemas import IrisInput
+from routes.batch_codec import encode_batch, decode_batch
+from routes.iris_routes import FEATURE_FIELDS, model
+import numpy as np
+import argparse
+import orjson
+import time
+
+
+ROWS_ADAPTER = TypeAdapter(list[IrisInput])
+
+
+def json_path(body: bytes) -> bytes:
+    rows = ROWS_ADAPTER.validate_python(orjson.loads(body))
+    features = np.array([[getattr(row, field) for field in FEATURE_FIELDS] for row in rows])
+    return orjson.dumps(model.predict(features).tolist())
+
+
+def binary_path(body: bytes) -> bytes:
+    return model.predict(decode_batch(body, len(FEATURE_FIELDS))).astype(np.uint8).tobytes()
+
+
+def best_of(func, body: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    features = rng.uniform([4.0, 2.0, 1.0, 0.0], [8.0, 4.5, 7.0, 2.5], size=(args.rows, 4)).astype(np.float32)
+    json_body = orjson.dumps([dict(zip(FEATURE_FIELDS, row)) for row in features.tolist()])
+    binary_body = encode_batch(features)
+
+    assert orjson.loads(json_path(json_body)) == list(np.frombuffer(binary_path(binary_body), dtype=np.uint8))
+    baseline = best_of(json_path, json_body, args.repeat)
+    binary = best_of(binary_path, binary_body, args.repeat)
+
+    print(f"rows={args.rows}")
+    print(f"JSON:    {baseline * 1000:8.1f} ms  corpo {len(json_body) / 1024:8.1f} KiB  {args.rows / baseline:10.0f} linhas/s")
+    print(f"binário: {binary * 1000:8.1f} ms  corpo {len(binary_body) / 1024:8.1f} KiB  {args.rows / binary:10.0f} linhas/s"
+          f"  ({baseline / binary:.1f}x mais rápido)")
+
+
+if __name__ == "__main__":
+    main()
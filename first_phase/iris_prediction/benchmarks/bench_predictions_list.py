@@ -0,0 +1,85 @@
+"""
+Benchmark dos caminhos de serialização de GET /iris/predictions.
+
+Compara o caminho do response_model (linhas validadas por
+PredictionLogOut e serializadas pelo FastAPI) com o caminho de linhas
+confiáveis (tuplas de colunas serializadas direto com orjson), em um banco
+SQLite temporário.
+
+Execute a partir do diretório iris_prediction:
+    python -m benchmarks.bench_predictions_list --rows 10000
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from fastapi.encoders import jsonable_encoder
+from database import Base
+from database.partitions import insert_predictions, partition_table, query_predictions
+from routes.schemas import PredictionLogOut
+from routes.iris_routes import PREDICTION_FIELDS
+from datetime import datetime
+import argparse
+import tempfile
+import orjson
+import json
+import time
+import os
+
+
+def seed(session, rows: int) -> None:
+    now = datetime.utcnow()
+    insert_predictions(session, [
+        {
+            "sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2,
+            "predicted_class": "setosa", "created_at": now,
+        }
+        for _ in range(rows)
+    ])
+    session.commit()
+
+
+def response_model_path(session) -> bytes:
+    table = partition_table(datetime.utcnow().date())
+    predictions = session.execute(table.select()).mappings().all()
+    validated = [PredictionLogOut.model_validate(dict(p)) for p in predictions]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def trusted_path(session) -> bytes:
+    rows = query_predictions(session, PREDICTION_FIELDS, limit=2 ** 31)
+    return orjson.dumps([dict(zip(PREDICTION_FIELDS, row)) for row in rows])
+
+
+def best_of(func, session, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(session)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        seed(session, args.rows)
+
+        assert json.loads(response_model_path(session)) == json.loads(trusted_path(session))
+        baseline = best_of(response_model_path, session, args.repeat)
+        trusted = best_of(trusted_path, session, args.repeat)
+        session.close()
+        engine.dispose()
+
+    print(f"rows={args.rows}")
+    print(f"caminho response_model: {baseline * 1000:8.1f} ms")
+    print(f"caminho orjson:         {trusted * 1000:8.1f} ms  ({baseline / trusted:.1f}x mais rápido)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,10 @@
 # database/models.py
 
-from sqlalchemy import Column, Integer, Float, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime
 from datetime import datetime
 from . import Base 
 
-class PredictionLog(Base):
-    __tablename__ = "predictions"
-
-    id = Column(Integer, primary_key=True, index=True)
-    sepal_length = Column(Float, nullable=False)
-    sepal_width = Column(Float, nullable=False)
-    petal_length = Column(Float, nullable=False)
-    petal_width = Column(Float, nullable=False)
-    predicted_class = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+# Os logs de predição ficam em partições diárias: ver database/partitions.py
 
 class User(Base):
     __tablename__ = "users"
@@ -21,4 +12,14 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    # AUTOINCREMENT: ids nunca são reaproveitados, e cada worker lê só id > último visto
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String, unique=True, nullable=False)
+    expires_at = Column(DateTime, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
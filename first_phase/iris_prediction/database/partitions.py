@@ -0,0 +1,212 @@
+# database/partitions.py
+
+# Logs de predição particionados por dia: uma tabela `predictions_AAAAMMDD` por dia
+# (UTC). Descartar um dia é um DROP TABLE da sua partição, sem DELETE linha a linha
+# nem manutenção de índice nas demais, e as leituras só abrem as partições que o
+# intervalo de tempo pedido cobre.
+
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable, Iterator, Optional
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index, MetaData, Table, func, select, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.orm import Session
+import threading
+
+PARTITION_PREFIX = "predictions_"
+PARTITION_GLOB = "predictions_[0-9]*"
+LEGACY_TABLE = "predictions"
+
+metadata = MetaData()
+_tables: dict[date, Table] = {}
+_ensured: set[date] = set()
+_lock = threading.Lock()
+
+# Semeia o AUTOINCREMENT da partição nova com o maior id já emitido, para os ids
+# continuarem únicos e crescentes entre dias. É um único INSERT condicional, então
+# workers concorrentes que criam a mesma partição semeiam uma vez só, e sempre
+# antes da primeira linha.
+_SEED_SEQUENCE = text(f"""
+    INSERT INTO sqlite_sequence (name, seq)
+    SELECT :name, (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name GLOB '{PARTITION_GLOB}')
+    WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)
+""")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> date:
+    return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+
+
+def partition_table(day: date) -> Table:
+    with _lock:
+        table = _tables.get(day)
+        if table is None:
+            name = partition_name(day)
+            table = Table(
+                name,
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("sepal_length", Float, nullable=False),
+                Column("sepal_width", Float, nullable=False),
+                Column("petal_length", Float, nullable=False),
+                Column("petal_width", Float, nullable=False),
+                Column("predicted_class", String, nullable=False),
+                Column("created_at", DateTime, nullable=False),
+                Index(f"ix_{name}_created_at", "created_at"),
+                sqlite_autoincrement=True,
+            )
+            _tables[day] = table
+    return table
+
+
+@contextmanager
+def write_transaction(engine) -> Iterator[Any]:
+    # BEGIN IMMEDIATE: toma o lock de escrita do banco já no início, então o que a
+    # transação lê não muda até o COMMIT. O pysqlite só abre transação sozinho antes
+    # de INSERT/UPDATE/DELETE, deixando SELECT e DDL fora dela. Com outro worker
+    # escrevendo, espera o busy timeout e falha com OperationalError.
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+
+
+def _create_partition(conn, table: Table) -> None:
+    conn.execute(CreateTable(table, if_not_exists=True))
+    for index in table.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    conn.execute(_SEED_SEQUENCE, {"name": table.name})
+
+
+def ensure_partition(engine, day: date) -> Table:
+    # Idempotente: pode ser repetido por qualquer worker antes de gravar no dia. Roda
+    # em transação própria, confirmada antes das inserções de quem chamou, para a
+    # partição nunca existir sem a sequência semeada.
+    table = partition_table(day)
+    if day in _ensured:
+        return table
+    with engine.begin() as conn:
+        _create_partition(conn, table)
+    _ensured.add(day)
+    return table
+
+
+def forget_partition(day: date) -> None:
+    with _lock:
+        _ensured.discard(day)
+        table = _tables.pop(day, None)
+        if table is not None:
+            metadata.remove(table)
+
+
+def list_partitions(conn) -> list[date]:
+    names = conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB :pattern"),
+        {"pattern": PARTITION_GLOB},
+    ).scalars()
+    return sorted(partition_day(name) for name in names)
+
+
+def insert_predictions(db: Session, rows: Iterable[dict[str, Any]]) -> None:
+    # Cada linha vai para a partição do dia do seu created_at (agora, se ausente).
+    # As partições são criadas antes da primeira escrita da sessão.
+    by_day: dict[date, list[dict[str, Any]]] = {}
+    now = datetime.utcnow()
+    for row in rows:
+        row = {**row, "created_at": row.get("created_at") or now}
+        by_day.setdefault(row["created_at"].date(), []).append(row)
+    tables = {day: ensure_partition(db.get_bind(), day) for day in by_day}
+    for day, day_rows in by_day.items():
+        db.execute(tables[day].insert(), day_rows)
+
+
+def insert_prediction_rows(db: Session, rows: Iterable[tuple], created_at: Optional[datetime] = None) -> None:
+    # Caminho de lote: tuplas (sepal_length, sepal_width, petal_length, petal_width,
+    # predicted_class) direto no executemany do driver, sem o processamento de
+    # parâmetros por linha do SQLAlchemy. Todas as linhas vão para a partição do dia
+    # de created_at, gravado no mesmo formato do tipo DateTime.
+    created_at = created_at or datetime.utcnow()
+    table = ensure_partition(db.get_bind(), created_at.date())
+    stamp = created_at.strftime("%Y-%m-%d %H:%M:%S.%f")
+    db.connection().exec_driver_sql(
+        f'INSERT INTO "{table.name}" (sepal_length, sepal_width, petal_length, petal_width, predicted_class, created_at)'
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [(*row, stamp) for row in rows],
+    )
+
+
+def query_predictions(conn, fields: tuple[str, ...], limit: int, offset: int = 0,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None) -> list[tuple]:
+    # Linhas com since <= created_at < until, em ordem de id, abrindo só as partições
+    # do intervalo; o filtro por created_at só é aplicado nas partições das pontas.
+    rows: list[tuple] = []
+    for day in list_partitions(conn):
+        day_start = datetime.combine(day, time.min)
+        day_end = day_start + timedelta(days=1)
+        if (since is not None and day_end <= since) or (until is not None and day_start >= until):
+            continue
+        table = partition_table(day)
+        query = select(*(table.c[field] for field in fields))
+        if since is not None and since > day_start:
+            query = query.where(table.c.created_at >= since)
+        if until is not None and until < day_end:
+            query = query.where(table.c.created_at < until)
+        if offset:
+            count = conn.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+            if count <= offset:
+                offset -= count
+                continue
+        rows.extend(conn.execute(query.order_by(table.c.id).offset(offset).limit(limit - len(rows))).all())
+        offset = 0
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def drop_partition(conn, day: date) -> None:
+    conn.execute(text(f'DROP TABLE IF EXISTS "{partition_name(day)}"'))
+    forget_partition(day)
+
+
+def _legacy_table_exists(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": LEGACY_TABLE}
+    ).first() is not None
+
+
+def migrate_legacy_table(engine) -> int:
+    # Move a tabela única `predictions` de versões anteriores para as partições
+    # diárias, preservando os ids, e a remove. Retorna o número de dias migrados.
+    # Roda no import de cada worker: a migração inteira é uma transação de escrita
+    # que confere de novo a tabela antiga, então só o primeiro worker migra e os
+    # demais encontram a tabela já removida.
+    with engine.connect() as conn:
+        if not _legacy_table_exists(conn):
+            return 0
+
+    now = datetime.utcnow()
+    with write_transaction(engine) as conn:
+        if not _legacy_table_exists(conn):
+            return 0
+        values = conn.execute(text(f"SELECT DISTINCT date(created_at) FROM {LEGACY_TABLE}")).scalars().all()
+        tables = {value: partition_table(date.fromisoformat(value) if value else now.date()) for value in values}
+        for table in set(tables.values()):
+            _create_partition(conn, table)
+        for value, table in tables.items():
+            condition = "date(created_at) = :day" if value else "created_at IS NULL"
+            conn.execute(
+                text(f"""
+                    INSERT OR IGNORE INTO "{table.name}"
+                        (id, sepal_length, sepal_width, petal_length, petal_width, predicted_class, created_at)
+                    SELECT id, sepal_length, sepal_width, petal_length, petal_width, predicted_class,
+                           COALESCE(created_at, :now)
+                    FROM {LEGACY_TABLE} WHERE {condition}
+                """),
+                {"day": value, "now": now.isoformat(sep=" ")},
+            )
+        conn.execute(text(f"DROP TABLE IF EXISTS {LEGACY_TABLE}"))
+    return len(values)
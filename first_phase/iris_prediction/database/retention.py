@@ -0,0 +1,134 @@
+# database/retention.py
+
+# Retenção dos logs de predição: partições diárias mais antigas que
+# PREDICTION_ARCHIVE_AFTER_DAYS são gravadas em um arquivo colunar comprimido
+# (`<PREDICTION_ARCHIVE_DIR>/predictions_AAAAMMDD.npz`, um array por coluna) e
+# descartadas do banco; arquivos mais antigos que PREDICTION_ARCHIVE_RETENTION_DAYS
+# são apagados (0 os mantém para sempre).
+#
+# Roda periodicamente dentro da API e também pela linha de comando, a partir do
+# diretório iris_prediction:
+#     python -m database.retention
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from uuid import uuid4
+from .partitions import (
+    PARTITION_PREFIX, drop_partition, list_partitions, partition_day, partition_name, partition_table, write_transaction,
+)
+import numpy as np
+import argparse
+import logging
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("PREDICTION_ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_DIR = os.getenv("PREDICTION_ARCHIVE_DIR", "archive")
+ARCHIVE_RETENTION_DAYS = int(os.getenv("PREDICTION_ARCHIVE_RETENTION_DAYS", "0"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("PREDICTION_RETENTION_INTERVAL_SECONDS", "3600"))
+
+ARCHIVE_DTYPES = {
+    "id": np.int64,
+    "sepal_length": np.float64,
+    "sepal_width": np.float64,
+    "petal_length": np.float64,
+    "petal_width": np.float64,
+    "predicted_class": np.str_,
+    "created_at": "datetime64[us]",
+}
+
+
+def archive_path(archive_dir: str, day: date) -> str:
+    return os.path.join(archive_dir, f"{partition_name(day)}.npz")
+
+
+def archive_partition(engine, day: date, archive_dir: str) -> Optional[str]:
+    # Lê, grava o arquivo (troca atômica) e descarta a partição numa única transação
+    # de escrita: só o worker que a descarta arquiva. Devolve None se outro worker já
+    # a arquivou. O arquivo é trocado antes do COMMIT, então uma falha no meio deixa
+    # a partição no banco para a próxima rodada, nunca os dados só no banco apagado.
+    table = partition_table(day)
+    path = archive_path(archive_dir, day)
+    tmp = f"{path}.{os.getpid()}.{uuid4().hex}.tmp"
+    with write_transaction(engine) as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+        ).first()
+        if exists is None:
+            return None
+        rows = conn.execute(select(*(table.c[name] for name in ARCHIVE_DTYPES)).order_by(table.c.id)).all()
+        columns = list(zip(*rows)) if rows else [()] * len(ARCHIVE_DTYPES)
+        arrays = {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(ARCHIVE_DTYPES.items(), columns)}
+
+        os.makedirs(archive_dir, exist_ok=True)
+        try:
+            with open(tmp, "wb") as file:
+                np.savez_compressed(file, **arrays)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        drop_partition(conn, day)
+    return path
+
+
+def load_archive(path: str) -> dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def apply_retention(engine, archive_after_days: int = ARCHIVE_AFTER_DAYS, archive_dir: str = ARCHIVE_DIR,
+                    archive_retention_days: int = ARCHIVE_RETENTION_DAYS, today: Optional[date] = None) -> list[date]:
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=archive_after_days)
+    with engine.connect() as conn:
+        days = list_partitions(conn)
+
+    archived = []
+    # A partição mais recente fica sempre no banco: ela guarda o maior id emitido,
+    # de onde as próximas partições semeiam a sequência.
+    for day in days[:-1]:
+        if day >= cutoff:
+            break
+        try:
+            path = archive_partition(engine, day, archive_dir)
+        except OperationalError as e:
+            # Banco ocupado por outro worker além do busy timeout; fica para a próxima rodada
+            logger.warning("Could not archive partition %s: %s", partition_name(day), e)
+            continue
+        if path is not None:
+            archived.append(day)
+
+    if archive_retention_days > 0 and os.path.isdir(archive_dir):
+        expired = today - timedelta(days=archive_retention_days)
+        for name in os.listdir(archive_dir):
+            if name.startswith(PARTITION_PREFIX) and name.endswith(".npz") and partition_day(name[:-4]) < expired:
+                os.remove(os.path.join(archive_dir, name))
+    return archived
+
+
+def main() -> None:
+    from . import engine
+    from .partitions import migrate_legacy_table
+
+    parser = argparse.ArgumentParser(description="Arquiva e descarta partições antigas dos logs de predição.")
+    parser.add_argument("--archive-after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--archive-retention-days", type=int, default=ARCHIVE_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    migrate_legacy_table(engine)
+    archived = apply_retention(engine, args.archive_after_days, args.archive_dir, args.archive_retention_days)
+    for day in archived:
+        print(archive_path(args.archive_dir, day))
+    print(f"{len(archived)} partições arquivadas")
+
+
+if __name__ == "__main__":
+    main()
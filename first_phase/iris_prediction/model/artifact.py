@@ -0,0 +1,21 @@
+import joblib
+import os
+
+# Artefato servido pela API (routes/iris_routes.py) e usado pelo scoring offline
+# (model/batch_score.py); caminhos relativos ao diretório iris_prediction.
+MODEL_PATH = os.path.join("model", "random_forest_iris.pkl")
+TARGET_NAMES = ["setosa", "versicolor", "virginica"]
+FEATURE_FIELDS = ("sepal_length", "sepal_width", "petal_length", "petal_width")
+
+
+def load_model(path: str = MODEL_PATH):
+    return joblib.load(path)
+
+
+def load_predictor(model):
+    # PREDICTOR=lookup troca a travessia das árvores pela tabela de células de
+    # model/lookup.py, que é verificada contra o modelo ao ser montada
+    if os.getenv("PREDICTOR", "model") == "lookup":
+        from model.lookup import build_predictor
+        return build_predictor(model)
+    return model
@@ -0,0 +1,154 @@
+"""
+Scoring offline em lote com o mesmo artefato servido pela API.
+
+Lê um CSV ou Parquet em blocos de --chunk-rows linhas e distribui os blocos
+entre um pool de processos; cada worker carrega o modelo uma vez. A saída
+tem o mesmo formato da entrada, com as colunas originais mais
+`predicted_class`, e é gravada em streaming na ordem da entrada. O progresso
+e a vazão (linhas/s) vão para o stderr.
+
+CSV: precisa de um cabeçalho com as colunas sepal_length, sepal_width,
+petal_length e petal_width (em qualquer posição). Parquet requer o pyarrow.
+
+Execute a partir do diretório iris_prediction:
+    python -m model.batch_score entrada.csv saida.csv --workers 4
+"""
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from typing import Iterator
+from model.artifact import FEATURE_FIELDS, MODEL_PATH, TARGET_NAMES, load_model, load_predictor
+import numpy as np
+import argparse
+import time
+import sys
+import csv
+import os
+
+_model = None
+_CLASS_NAMES = np.array(TARGET_NAMES, dtype=object)
+
+
+def _init_worker(model_path: str) -> None:
+    global _model
+    _model = load_predictor(load_model(model_path))
+
+
+def score_csv_chunk(text: str, usecols: tuple[int, ...]) -> tuple[int, str]:
+    # Recebe linhas CSV cruas e devolve as mesmas linhas com a classe prevista ao final
+    lines = [line for line in text.splitlines() if line.strip()]
+    features = np.loadtxt(lines, delimiter=",", usecols=usecols, quotechar='"', ndmin=2, dtype=np.float64)
+    names = _CLASS_NAMES[_model.predict(features)] if len(lines) else []
+    return len(lines), "".join(f"{line},{name}\n" for line, name in zip(lines, names))
+
+
+def score_features(features: np.ndarray) -> np.ndarray:
+    return _model.predict(features).astype(np.uint8)
+
+
+def _csv_chunks(file, chunk_rows: int) -> Iterator[str]:
+    while True:
+        text = "".join(islice(file, chunk_rows))
+        if not text:
+            return
+        yield text
+
+
+def _ordered(executor: ProcessPoolExecutor, func, chunks, max_pending: int, *args):
+    # Resultados na ordem da entrada, com no máximo `max_pending` blocos submetidos:
+    # a entrada é lida só à medida que a saída avança, sem carregar o arquivo inteiro.
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(func, chunk, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Progress:
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        elapsed = time.perf_counter() - self.started
+        self.stream.write(f"\r{self.rows:>12,} linhas  {self.rows / max(elapsed, 1e-9):>10,.0f} linhas/s")
+        self.stream.flush()
+
+    def finish(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        self.stream.write(f"\r{self.rows:>12,} linhas em {elapsed:.1f} s  ({self.rows / max(elapsed, 1e-9):,.0f} linhas/s)\n")
+        return elapsed
+
+
+def score_csv(input_path: str, output_path: str, executor: ProcessPoolExecutor, chunk_rows: int,
+              max_pending: int, progress: Progress) -> None:
+    with open(input_path, newline="") as source, open(output_path, "w", newline="") as target:
+        header = source.readline()
+        columns = next(csv.reader([header]))
+        missing = [field for field in FEATURE_FIELDS if field not in columns]
+        if missing:
+            raise SystemExit(f"Colunas ausentes no CSV: {', '.join(missing)}")
+        usecols = tuple(columns.index(field) for field in FEATURE_FIELDS)
+        header = header.rstrip("\r\n")
+        target.write(f"{header},predicted_class\n")
+        for rows, text in _ordered(executor, score_csv_chunk, _csv_chunks(source, chunk_rows), max_pending, usecols):
+            target.write(text)
+            progress.add(rows)
+
+
+def score_parquet(input_path: str, output_path: str, executor: ProcessPoolExecutor, chunk_rows: int,
+                  max_pending: int, progress: Progress) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Entrada Parquet requer o pyarrow (pip install pyarrow)")
+
+    source = pq.ParquetFile(input_path)
+    batches = deque()
+
+    def features_of():
+        for batch in source.iter_batches(batch_size=chunk_rows):
+            batches.append(batch)
+            yield np.column_stack([batch.column(field).to_numpy(zero_copy_only=False) for field in FEATURE_FIELDS])
+
+    class_names = pa.array(TARGET_NAMES)
+    writer = None
+    try:
+        for classes in _ordered(executor, score_features, features_of(), max_pending):
+            batch = batches.popleft()
+            batch = pa.RecordBatch.from_arrays(
+                batch.columns + [class_names.take(pa.array(classes))],
+                names=batch.schema.names + ["predicted_class"],
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, batch.schema)
+            writer.write_batch(batch)
+            progress.add(batch.num_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="Arquivo .csv ou .parquet")
+    parser.add_argument("output", help="Arquivo de saída, no mesmo formato da entrada")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    score = score_parquet if args.input.lower().endswith(".parquet") else score_csv
+    progress = Progress()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.model,)) as executor:
+        score(args.input, args.output, executor, args.chunk_rows, 2 * args.workers, progress)
+    progress.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from typing import Optional
+from dotenv import load_dotenv
+import numpy as np
+import logging
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo da tabela de células; acima disso o preditor volta à travessia das árvores
+LOOKUP_MAX_BYTES = int(os.getenv("LOOKUP_MAX_BYTES", str(16 * 1024 * 1024)))
+# Células avaliadas por chamada a model.predict ao montar e verificar a tabela
+_BUILD_BLOCK = 1 << 18
+_F32_MAX = np.finfo(np.float32).max
+
+
+class LookupTablePredictor:
+    # A função de decisão de uma floresta é constante em cada célula da grade formada
+    # pelos limiares de split de cada feature. A tabela guarda o índice da classe de
+    # cada célula, e prever vira uma busca binária por feature (np.searchsorted, já
+    # vetorizada para lotes) mais uma leitura da tabela.
+    def __init__(self, model, thresholds: list[np.ndarray], table: np.ndarray):
+        self.model = model
+        self.classes_ = model.classes_
+        self.thresholds = thresholds
+        self.table = table
+
+    def bins(self, X) -> tuple[np.ndarray, ...]:
+        # As árvores comparam o valor convertido para float32 com limiares float64
+        # (x <= limiar vai para a esquerda); o bin é o número de limiares menores que x.
+        X = np.asarray(X, dtype=np.float32)
+        return tuple(
+            np.searchsorted(thresholds, X[:, feature].astype(np.float64), side="left")
+            for feature, thresholds in enumerate(self.thresholds)
+        )
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.table[self.bins(X)]]
+
+
+def split_thresholds(model) -> Optional[list[np.ndarray]]:
+    # Limiares ordenados e sem repetição de cada feature, em todas as árvores do modelo
+    estimators = getattr(model, "estimators_", [model])
+    if not all(hasattr(estimator, "tree_") for estimator in estimators):
+        return None
+    values: list[list[np.ndarray]] = [[] for _ in range(model.n_features_in_)]
+    for estimator in estimators:
+        tree = estimator.tree_
+        for feature, feature_values in enumerate(values):
+            feature_values.append(tree.threshold[tree.feature == feature])
+    return [np.unique(np.concatenate(feature_values)) for feature_values in values]
+
+
+def cell_edges(thresholds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Menor e maior float32 de cada célula (-inf, t0], (t0, t1], ..., (tn, +inf)
+    lower = np.empty(len(thresholds) + 1, dtype=np.float32)
+    upper = np.empty(len(thresholds) + 1, dtype=np.float32)
+    lower[0], upper[-1] = -_F32_MAX, _F32_MAX
+    for k, value in enumerate(thresholds):
+        below = np.float32(value)
+        if below > value:
+            below = np.nextafter(below, np.float32(-np.inf))
+        upper[k] = below
+        lower[k + 1] = np.nextafter(below, np.float32(np.inf))
+    return lower, upper
+
+
+def _corners(edges: list[np.ndarray], shape: tuple[int, ...], start: int, stop: int) -> np.ndarray:
+    cells = np.unravel_index(np.arange(start, stop), shape)
+    return np.column_stack([feature_edges[index] for feature_edges, index in zip(edges, cells)])
+
+
+def build_predictor(model, max_bytes: int = LOOKUP_MAX_BYTES):
+    # Monta a tabela a partir do menor ponto de cada célula e a verifica em todas as
+    # células, no maior ponto, contra model.predict. Sem tabela possível (modelo que não
+    # é de árvores, tabela acima de max_bytes ou divergência), devolve o próprio modelo.
+    thresholds = split_thresholds(model)
+    if thresholds is None:
+        logger.warning("Lookup table needs a tree model; using %s.predict", type(model).__name__)
+        return model
+    shape = tuple(len(feature_thresholds) + 1 for feature_thresholds in thresholds)
+    dtype = np.min_scalar_type(len(model.classes_) - 1)
+    size = int(np.prod(shape, dtype=np.int64))
+    if size * dtype.itemsize > max_bytes:
+        logger.warning("Lookup table of %s cells exceeds %s bytes; using tree traversal", size, max_bytes)
+        return model
+
+    lower, upper = zip(*(cell_edges(feature_thresholds) for feature_thresholds in thresholds))
+    class_index = {label: index for index, label in enumerate(model.classes_)}
+    table = np.empty(size, dtype=dtype)
+    for start in range(0, size, _BUILD_BLOCK):
+        stop = min(start + _BUILD_BLOCK, size)
+        labels = model.predict(_corners(lower, shape, start, stop))
+        table[start:stop] = [class_index[label] for label in labels]
+    predictor = LookupTablePredictor(model, thresholds, table.reshape(shape))
+
+    for start in range(0, size, _BUILD_BLOCK):
+        stop = min(start + _BUILD_BLOCK, size)
+        for corners in (_corners(lower, shape, start, stop), _corners(upper, shape, start, stop)):
+            if not np.array_equal(predictor.predict(corners), model.predict(corners)):
+                logger.error("Lookup table disagrees with model.predict; using tree traversal")
+                return model
+    logger.info("Lookup table predictor with %s cells (%s bytes)", size, table.nbytes)
+    return predictor
@@ -1,32 +1,38 @@
 # routes/auth_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from .schemas import UserCreate, UserOut, UserLogin
+from .schemas import UserCreate, UserOut, UserLogin, TokenRevoke
 from .auth import get_password_hash, authenticate_user
 from .deps import get_db, get_current_user
 from database.models import User
-from .jwt_handler import create_jwt_token
+from .jwt_handler import create_jwt_token, decode_jwt_token
+from .revocation import denylist, token_key, token_expiry
+from .profiling import ProfiledRoute, admin_usernames
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.post("/register", response_model=UserOut)
 def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.username == user.username).first()
-    if existing_user:
+    hashed_password = get_password_hash(user.password)
+    # INSERT ... RETURNING: id e username voltam do próprio INSERT, sem um SELECT depois do commit
+    statement = insert(User).values(
+        username=user.username,
+        hashed_password=hashed_password,
+    ).returning(User.id, User.username)
+    try:
+        created = db.execute(statement).one()
+        db.commit()
+    except IntegrityError:
+        # Um único INSERT: o índice UNIQUE de username rejeita duplicatas
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists",
         )
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        hashed_password=hashed_password,
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return UserOut(id=created.id, username=created.username)
 
 @router.post("/login")
 def login(user: UserLogin, db: Session = Depends(get_db)):
@@ -43,3 +49,22 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserOut)
 def read_me(current_user=Depends(get_current_user)):
     return current_user
+
+@router.post("/logout")
+def logout(authorization: str = Header(...), current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+    # Revoga o token usado na própria requisição
+    token = authorization.split()[1]
+    payload = decode_jwt_token(token)
+    denylist.revoke(db, token_key(payload, token), token_expiry(payload))
+    return {"detail": "Token revoked"}
+
+@router.post("/revoke")
+def revoke_token(data: TokenRevoke, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+    # Admins (ADMIN_USERNAMES) revogam qualquer token ainda válido, ex.: um token vazado
+    if current_user.username not in admin_usernames:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    payload = decode_jwt_token(data.token)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token expired or invalid")
+    denylist.revoke(db, token_key(payload, data.token), token_expiry(payload))
+    return {"detail": "Token revoked"}
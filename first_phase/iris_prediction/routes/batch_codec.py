@@ -0,0 +1,43 @@
+import numpy as np
+import struct
+
+# Formato binário do scoring em lote, tudo little-endian:
+#   cabeçalho de 8 bytes: b"IRIS", versão (uint8), bytes por valor (uint8: 4 = float32,
+#   8 = float64) e número de features por linha (uint16)
+#   corpo: as linhas empacotadas, na ordem sepal_length, sepal_width, petal_length, petal_width
+# A resposta é um uint8 por linha com o índice da classe prevista (ver /iris/classes).
+HEADER = struct.Struct("<4sBBH")
+MAGIC = b"IRIS"
+VERSION = 1
+DTYPES = {4: np.dtype("<f4"), 8: np.dtype("<f8")}
+MEDIA_TYPE = "application/octet-stream"
+
+
+class BatchFormatError(ValueError):
+    pass
+
+
+def encode_batch(features, itemsize: int = 4) -> bytes:
+    features = np.ascontiguousarray(features, dtype=DTYPES[itemsize])
+    return HEADER.pack(MAGIC, VERSION, itemsize, features.shape[1]) + features.tobytes()
+
+
+def decode_batch(body: bytes, n_features: int) -> np.ndarray:
+    # Visão somente leitura sobre o próprio corpo da requisição, sem cópia
+    if len(body) < HEADER.size:
+        raise BatchFormatError("Body is shorter than the batch header")
+    magic, version, itemsize, features = HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise BatchFormatError("Unknown batch format")
+    dtype = DTYPES.get(itemsize)
+    if dtype is None:
+        raise BatchFormatError("Values must be float32 or float64")
+    if features != n_features:
+        raise BatchFormatError(f"Rows must have {n_features} features")
+    if (len(body) - HEADER.size) % (itemsize * features):
+        raise BatchFormatError("Body is not a whole number of rows")
+    return np.frombuffer(body, dtype=dtype, offset=HEADER.size).reshape(-1, features)
+
+
+def decode_classes(body: bytes) -> np.ndarray:
+    return np.frombuffer(body, dtype=np.uint8)
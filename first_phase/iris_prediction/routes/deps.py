@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from database import SessionLocal
 from database.models import User
 from .jwt_handler import decode_jwt_token
+from .revocation import denylist, token_key
 
 def get_db():
     db = SessionLocal()
@@ -24,6 +25,8 @@ def get_current_user(authorization: str = Header(...), db: Session = Depends(get
             raise HTTPException(status_code=401, detail="Invalid token payload")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid authorization header")
+    if denylist.is_revoked(token_key(payload, token)):
+        raise HTTPException(status_code=401, detail="Token revoked")
 
     user = db.query(User).filter(User.username == username).first()
     if user is None:
@@ -0,0 +1,145 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from dotenv import load_dotenv
+from sqlalchemy import text
+import numpy as np
+import asyncio
+import logging
+import time
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Aquecimento antes de o worker se declarar pronto (WARMUP_ENABLED=0 desliga)
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+# Rodadas de predições sintéticas, de uma linha e de um lote de WARMUP_BATCH_ROWS linhas
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))
+WARMUP_BATCH_ROWS = int(os.getenv("WARMUP_BATCH_ROWS", "1000"))
+# Conexões do pool abertas e testadas com SELECT 1
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+# Predições recentes (últimas 24 h) lidas para carregar as páginas da partição do dia e
+# repassadas ao modelo como entradas reais; 0 desliga
+WARMUP_RECENT_PREDICTIONS = int(os.getenv("WARMUP_RECENT_PREDICTIONS", "0"))
+# Espera entre tentativas quando uma etapa falha (ex.: banco indisponível)
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+
+
+class Readiness:
+    # Estado do worker para as sondas. O relógio começa na importação deste módulo,
+    # que app.py faz antes de carregar o modelo e as rotas.
+    def __init__(self):
+        self.started = time.monotonic()
+        self.ready = False
+        self.startup_duration: Optional[float] = None
+        self.steps: dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def mark_ready(self) -> None:
+        self.startup_duration = time.monotonic() - self.started
+        self.ready = True
+        self.error = None
+        logger.info("Worker ready in %.3f s (warm-up: %s)", self.startup_duration,
+                    ", ".join(f"{name} {seconds:.3f} s" for name, seconds in self.steps.items()) or "off")
+
+
+readiness = Readiness()
+
+
+# As etapas importam o que usam: este módulo é carregado antes do modelo e das rotas
+def warm_model() -> None:
+    from .iris_routes import predictor
+    from .schemas import IrisInput
+
+    rng = np.random.default_rng(0)
+    features = rng.uniform([4.0, 2.0, 1.0, 0.0], [8.0, 4.5, 7.0, 2.5], size=(max(WARMUP_BATCH_ROWS, 1), 4))
+    for _ in range(WARMUP_ROUNDS):
+        IrisInput(sepal_length=5.1, sepal_width=3.5, petal_length=1.4, petal_width=0.2)
+        predictor.predict(features[:1])
+        predictor.predict(features)
+
+
+def warm_database() -> None:
+    from database import engine
+    from database.partitions import ensure_partition
+
+    # Conexões abertas juntas para o pool guardar todas ao devolvê-las
+    connections = [engine.connect() for _ in range(max(WARMUP_DB_CONNECTIONS, 1))]
+    try:
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    # A primeira predição do dia não paga o CREATE TABLE da partição
+    ensure_partition(engine, datetime.now(timezone.utc).date())
+
+
+def warm_auth() -> None:
+    from .auth import pwd_context
+
+    # Carrega o backend do bcrypt, que o passlib só resolve no primeiro uso
+    pwd_context.dummy_verify()
+
+
+def warm_recent_predictions() -> None:
+    from database import engine
+    from database.partitions import query_predictions
+    from model.artifact import FEATURE_FIELDS
+    from .iris_routes import predictor
+
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)
+    with engine.connect() as connection:
+        rows = query_predictions(connection, FEATURE_FIELDS, WARMUP_RECENT_PREDICTIONS, since=since)
+    if rows:
+        predictor.predict(np.array(rows, dtype=np.float64))
+
+
+def warmup_steps() -> list[tuple[str, Callable[[], None]]]:
+    steps = [("model", warm_model), ("database", warm_database), ("auth", warm_auth)]
+    if WARMUP_RECENT_PREDICTIONS > 0:
+        steps.append(("recent_predictions", warm_recent_predictions))
+    return steps
+
+
+async def warm_up() -> None:
+    # Roda como tarefa de fundo: /health/live responde durante o aquecimento e
+    # /health/ready só passa a 200 quando todas as etapas terminam sem erro
+    if not WARMUP_ENABLED:
+        readiness.mark_ready()
+        return
+    while True:
+        name = "warmup"
+        try:
+            for name, step in warmup_steps():
+                start = time.perf_counter()
+                await run_in_threadpool(step)
+                readiness.steps[name] = time.perf_counter() - start
+            readiness.mark_ready()
+            return
+        except Exception as e:
+            readiness.error = f"{name}: {e}"
+            logger.exception("Warm-up step %s failed; retrying in %s s", name, WARMUP_RETRY_SECONDS)
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+
+@router.get("/live")
+def live():
+    return {"status": "alive"}
+
+@router.get("/ready")
+def ready():
+    body = {
+        "status": "ready" if readiness.ready else "warming_up",
+        "startup_duration_seconds": readiness.startup_duration,
+        "warmup_seconds": readiness.steps,
+    }
+    if readiness.error:
+        body["error"] = readiness.error
+    return JSONResponse(body, status_code=200 if readiness.ready else 503)
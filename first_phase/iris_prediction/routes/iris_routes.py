@@ -1,47 +1,126 @@
 from .schemas import IrisInput, IrisPredictionOut, ClassesResponse, PredictionLogOut
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from .deps import get_current_user, get_db
-from database.models import PredictionLog
+from .rate_limit import rate_limit
+from .tracing import span
+from .profiling import ProfiledRoute
+from .batch_codec import HEADER, MEDIA_TYPE, BatchFormatError, decode_batch
+from database.partitions import insert_prediction_rows, insert_predictions, query_predictions
 from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional
+from model.artifact import FEATURE_FIELDS, TARGET_NAMES, load_model, load_predictor
 import numpy as np
-import joblib
 import os
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-MODEL_PATH = os.path.join("model", "random_forest_iris.pkl")
-model = joblib.load(MODEL_PATH)
-target_names = ["setosa", "versicolor", "virginica"]
+model = load_model()
+predictor = load_predictor(model)
+target_names = TARGET_NAMES
+CLASS_NAMES = np.array(target_names, dtype=object)
 
-@router.post("/predict", response_model=IrisPredictionOut)
+# Limite por usuário: 10 predições/s com rajadas de até 20
+predict_rate_limit = rate_limit("predict", rate=10, burst=20)
+# Lotes binários: 2 requisições/s com rajadas de até 5, até PREDICT_BATCH_MAX_ROWS linhas cada
+predict_batch_rate_limit = rate_limit("predict_batch", rate=2, burst=5)
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "100000"))
+
+@router.post("/predict", response_model=IrisPredictionOut, dependencies=[Depends(predict_rate_limit)])
 def predict_iris(data: IrisInput, current_user=Depends(get_current_user), db=Depends(get_db)):
     features = np.array([[data.sepal_length, data.sepal_width, data.petal_length, data.petal_width]])
-    prediction = model.predict(features)
+    with span("model.inference", rows=len(features)):
+        prediction = predictor.predict(features)
     predicted_class = target_names[prediction[0]]
 
-    new_log = PredictionLog(
-        sepal_length=data.sepal_length,
-        sepal_width=data.sepal_width,
-        petal_length=data.petal_length,
-        petal_width=data.petal_width,
-        predicted_class=predicted_class
-    )
-    db.add(new_log)
+    insert_predictions(db, [{
+        "sepal_length": data.sepal_length,
+        "sepal_width": data.sepal_width,
+        "petal_length": data.petal_length,
+        "petal_width": data.petal_width,
+        "predicted_class": predicted_class,
+    }])
     db.commit()
-    db.refresh(new_log)
 
     return {"prediction": int(prediction[0]), "class_name": predicted_class}
 
+# Scoring em lote sem JSON: o corpo (formato em batch_codec.py) vira uma matriz numpy
+# sem cópia, a inferência é uma única chamada vetorizada e a resposta traz um uint8
+# por linha com o índice da classe.
+@router.post(
+    "/predict/batch",
+    response_class=Response,
+    dependencies=[Depends(predict_batch_rate_limit)],
+    responses={200: {"content": {MEDIA_TYPE: {}}, "description": "Um uint8 por linha com o índice da classe"}},
+)
+async def predict_iris_batch(request: Request, current_user=Depends(get_current_user), db=Depends(get_db)):
+    if request.headers.get("content-type", "").split(";")[0].strip() != MEDIA_TYPE:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Expected {MEDIA_TYPE}")
+    max_bytes = HEADER.size + PREDICT_BATCH_MAX_ROWS * len(FEATURE_FIELDS) * 8
+    body = await _read_body(request, max_bytes)
+    try:
+        features = decode_batch(body, len(FEATURE_FIELDS))
+    except BatchFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(features) > PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Batch too large")
+    if not len(features):
+        return Response(content=b"", media_type=MEDIA_TYPE)
+    return Response(content=await run_in_threadpool(_score_batch, features, db), media_type=MEDIA_TYPE)
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    # Content-Length pode faltar (chunked) ou mentir: o corpo é lido em pedaços e a
+    # leitura para com 413 assim que passa de max_bytes, sem bufferizar o resto.
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Batch too large")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Batch too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _score_batch(features: np.ndarray, db: Session) -> bytes:
+    if not np.isfinite(features).all():
+        raise HTTPException(status_code=400, detail="Features must be finite numbers")
+    with span("model.inference", rows=len(features)):
+        classes = predictor.predict(features).astype(np.uint8)
+
+    names = CLASS_NAMES[classes].tolist()
+    insert_prediction_rows(db, [(*row, name) for row, name in zip(features.tolist(), names)])
+    db.commit()
+    return classes.tobytes()
+
 @router.get("/classes", response_model=ClassesResponse)
 def get_classes():
     return {"classes": target_names}
 
 
-@router.get("/predictions", response_model=list[PredictionLogOut])
+PREDICTION_FIELDS = tuple(PredictionLogOut.model_fields)
+
+# As linhas vêm da nossa própria tabela: o response_model só documenta o schema,
+# e a resposta é serializada direto das tuplas com orjson, sem revalidar no pydantic.
+# `since`/`until` (UTC, until exclusivo) limitam as partições diárias consultadas.
+@router.get("/predictions", response_model=list[PredictionLogOut], response_class=ORJSONResponse)
 def get_predictions(
     limit: int = Query(5, ge=1),
     offset: int = Query(0, ge=0),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
 ):
-    predictions = db.query(PredictionLog).offset(offset).limit(limit).all()
-    return predictions
\ No newline at end of file
+    rows = query_predictions(db, PREDICTION_FIELDS, limit, offset, _utc_naive(since), _utc_naive(until))
+    return ORJSONResponse([dict(zip(PREDICTION_FIELDS, row)) for row in rows])
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    # created_at é gravado em UTC sem fuso
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
\ No newline at end of file
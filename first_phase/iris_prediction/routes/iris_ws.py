@@ -0,0 +1,180 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Optional
+from dotenv import load_dotenv
+from database import SessionLocal
+from database.models import User
+from database.partitions import insert_prediction_rows
+from .iris_routes import CLASS_NAMES, FEATURE_FIELDS, predictor
+from .jwt_handler import decode_jwt_token
+from .revocation import denylist, token_key
+from .tracing import span
+import numpy as np
+import asyncio
+import logging
+import orjson
+import time
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Mensagens avaliadas ao mesmo tempo por conexão e linhas por mensagem
+WS_PREDICT_MAX_IN_FLIGHT = int(os.getenv("WS_PREDICT_MAX_IN_FLIGHT", "8"))
+WS_PREDICT_MAX_ROWS = int(os.getenv("WS_PREDICT_MAX_ROWS", "1000"))
+# Intervalo da reverificação do token (revogação e expiração) em conexões abertas
+WS_AUTH_CHECK_SECONDS = float(os.getenv("WS_AUTH_CHECK_SECONDS", "5"))
+
+
+# Canal de predição contínua. O JWT (cabeçalho Authorization ou parâmetro `token`) e o
+# usuário são verificados na conexão; depois, a cada WS_AUTH_CHECK_SECONDS e no `exp`,
+# a conexão, mesmo ociosa, é fechada com 1008 se o token expirou ou foi revogado
+# (/users/logout, /users/revoke; revogações de outros workers chegam pelo sync do denylist).
+#
+# Protocolo, em mensagens de texto JSON:
+#   servidor -> {"type": "ready", "max_in_flight": N, "max_rows": M}
+#   cliente  -> {"id": 1, "rows": [[sepal_length, sepal_width, petal_length, petal_width], ...]}
+#   servidor -> {"id": 1, "predictions": [0, ...], "class_names": ["setosa", ...]}
+#            ou {"id": 1, "error": "..."}
+# Respostas podem chegar fora de ordem; o `id` do cliente é devolvido em cada uma.
+#
+# Controle de fluxo: com `max_in_flight` mensagens em avaliação, o servidor para de ler
+# o socket até uma terminar, então um cliente mais rápido que o modelo é freado pelo
+# próprio TCP em vez de acumular mensagens na memória do servidor.
+@router.websocket("/ws/predict")
+async def predict_stream(websocket: WebSocket):
+    auth = await run_in_threadpool(_authenticate, websocket)
+    if auth is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    claims, key = auth
+    expires_at = claims.get("exp")
+
+    await websocket.accept()
+    await websocket.send_json({"type": "ready", "max_in_flight": WS_PREDICT_MAX_IN_FLIGHT, "max_rows": WS_PREDICT_MAX_ROWS})
+
+    in_flight = asyncio.Semaphore(WS_PREDICT_MAX_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    closing = asyncio.Event()
+    tasks: set[asyncio.Task] = set()
+
+    async def reply(payload: bytes) -> None:
+        async with send_lock:
+            await websocket.send_text(payload.decode())
+
+    async def close(reason: str) -> None:
+        # Vigia e laço de leitura podem decidir fechar ao mesmo tempo; só um fecha
+        async with send_lock:
+            if not closing.is_set():
+                closing.set()
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
+
+    async def watch_token() -> None:
+        try:
+            while True:
+                delay = WS_AUTH_CHECK_SECONDS
+                if expires_at is not None:
+                    delay = min(delay, max(expires_at - time.time(), 0))
+                await asyncio.sleep(delay)
+                if expires_at is not None and time.time() >= expires_at:
+                    await close("Token expired")
+                    return
+                if await run_in_threadpool(denylist.is_revoked, key):
+                    await close("Token revoked")
+                    return
+        except (WebSocketDisconnect, RuntimeError):
+            # Cliente já desconectou
+            pass
+
+    async def handle(text: str) -> None:
+        try:
+            await reply(await run_in_threadpool(_score_message, text))
+        except (WebSocketDisconnect, RuntimeError):
+            # Cliente já desconectou
+            pass
+        except Exception:
+            # _score_message já responde às próprias falhas com o id; aqui só sobra o envio
+            logger.exception("Error replying to prediction message")
+        finally:
+            in_flight.release()
+
+    watcher = asyncio.create_task(watch_token())
+    try:
+        while True:
+            await in_flight.acquire()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect" or closing.is_set():
+                break
+            if expires_at is not None and time.time() >= expires_at:
+                await close("Token expired")
+                break
+            if message.get("text") is None:
+                in_flight.release()
+                await reply(orjson.dumps({"id": None, "error": "Only JSON text messages are supported"}))
+                continue
+            task = asyncio.create_task(handle(message["text"]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        for task in tasks:
+            task.cancel()
+
+
+def _authenticate(websocket: WebSocket) -> Optional[tuple[dict[str, Any], str]]:
+    # Devolve as claims e a chave do token no denylist, reverificada durante a conexão
+    scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        token = websocket.query_params.get("token", "")
+    payload = decode_jwt_token(token.strip()) if token else None
+    if not payload or payload.get("sub") is None:
+        return None
+    key = token_key(payload, token.strip())
+    if denylist.is_revoked(key):
+        return None
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.username == payload["sub"]).first() is None:
+            return None
+    finally:
+        db.close()
+    return payload, key
+
+
+def _score_message(text: str) -> bytes:
+    request_id = None
+    try:
+        message = orjson.loads(text)
+        request_id = message.get("id")
+        features = np.array(message["rows"], dtype=np.float64)
+    except (orjson.JSONDecodeError, AttributeError, KeyError, TypeError, ValueError):
+        return orjson.dumps({"id": request_id, "error": 'Expected {"id": ..., "rows": [[...], ...]}'})
+    if features.ndim != 2 or features.shape[1] != len(FEATURE_FIELDS) or not len(features):
+        return orjson.dumps({"id": request_id, "error": f"Rows must have {len(FEATURE_FIELDS)} features"})
+    if len(features) > WS_PREDICT_MAX_ROWS:
+        return orjson.dumps({"id": request_id, "error": f"At most {WS_PREDICT_MAX_ROWS} rows per message"})
+    if not np.isfinite(features).all():
+        return orjson.dumps({"id": request_id, "error": "Features must be finite numbers"})
+
+    try:
+        with span("model.inference", rows=len(features)):
+            classes = predictor.predict(features)
+        names = CLASS_NAMES[classes].tolist()
+
+        db = SessionLocal()
+        try:
+            insert_prediction_rows(db, [(*row, name) for row, name in zip(features.tolist(), names)])
+            db.commit()
+        finally:
+            db.close()
+    except Exception:
+        # Falha na inferência ou no banco (ex.: banco travado): só esta mensagem falha,
+        # a conexão segue aberta e o cliente recebe o erro com o seu id
+        logger.exception("Error scoring prediction message %s", request_id)
+        return orjson.dumps({"id": request_id, "error": "Prediction failed"})
+    return orjson.dumps({"id": request_id, "predictions": classes.tolist(), "class_names": names})
@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import datetime
+import uuid
 import jwt
 import os
 
@@ -9,6 +10,8 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 def create_jwt_token(user_id: str):
     payload = {
         "sub": user_id,
+        # Identificador único, usado para revogar o token (routes/revocation.py)
+        "jti": uuid.uuid4().hex,
         "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
     }
     return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
@@ -0,0 +1,142 @@
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Optional
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from dotenv import load_dotenv
+from .jwt_handler import decode_jwt_token
+from .revocation import denylist, token_key
+import threading
+import cProfile
+import logging
+import asyncio
+import pstats
+import random
+import time
+import uuid
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Perfis coletados na requisição atual; None quando ela não é perfilada
+_profiles: ContextVar[Optional[list[cProfile.Profile]]] = ContextVar("profiles", default=None)
+
+
+def profiled(endpoint: Callable) -> Callable:
+    # Endpoints síncronos rodam no threadpool, fora do alcance de um profiler ligado
+    # no middleware, então o perfil é tirado em volta do próprio endpoint
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profiles = _profiles.get()
+            if profiles is None:
+                return await endpoint(*args, **kwargs)
+            profile = cProfile.Profile()
+            profiles.append(profile)
+            profile.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiles = _profiles.get()
+        if profiles is None:
+            return endpoint(*args, **kwargs)
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        return profile.runcall(endpoint, *args, **kwargs)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    # Classe de rota cujos endpoints podem ser perfilados pelo ProfilingMiddleware
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+class ProfileStore:
+    # Diretório de arquivos pstats; guarda só os `max_files` mais recentes
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, profiles: list[cProfile.Profile]) -> None:
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        stats.dump_stats(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            entries = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")),
+                key=lambda entry: entry.stat().st_mtime_ns,
+            )
+            for entry in entries[:max(len(entries) - self.max_files, 0)]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    # Perfila a requisição quando um admin (ADMIN_USERNAMES) envia `X-Profile: 1` com
+    # o seu token, ou uma fração PROFILE_SAMPLE_RATE das requisições. O id do perfil
+    # volta no cabeçalho X-Profile-Id; o arquivo é `<PROFILE_DIR>/<id>.prof`,
+    # legível com pstats ou snakeviz.
+    def __init__(self, app, store: ProfileStore, sample_rate: float, admin_usernames: list[str]):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.admin_usernames = admin_usernames
+
+    def _requested_by_admin(self, scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get("x-profile") != "1" or not self.admin_usernames:
+            return False
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        payload = decode_jwt_token(token.strip()) if scheme.lower() == "bearer" else None
+        return (
+            payload is not None
+            and payload.get("sub") in self.admin_usernames
+            and not denylist.is_revoked(token_key(payload, token.strip()))
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (
+            (self.sample_rate > 0 and random.random() < self.sample_rate) or self._requested_by_admin(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        profiles: list[cProfile.Profile] = []
+        token = _profiles.set(profiles)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _profiles.reset(token)
+            if profiles:
+                try:
+                    await run_in_threadpool(self.store.save, profile_id, profiles)
+                except OSError as e:
+                    logger.error("Error saving profile %s: %s", profile_id, e)
+
+
+profile_store = ProfileStore(os.getenv("PROFILE_DIR", "profiles"), int(os.getenv("PROFILE_MAX_FILES", "100")))
+profile_sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+admin_usernames = [name for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name]
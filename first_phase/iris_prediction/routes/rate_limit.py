@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from fastapi import Header, HTTPException, status
+from typing import Optional
+from dotenv import load_dotenv
+from .jwt_handler import decode_jwt_token
+import threading
+import math
+import time
+import os
+
+load_dotenv()
+
+
+class TokenBucketLimiter:
+    # Um balde por chave: `burst` fichas no máximo, repostas a `rate` fichas/s.
+    # Baldes ficam em ordem de último uso; um balde parado por `burst / rate`
+    # segundos já está cheio, então descartá-lo não altera o limite. `max_buckets`
+    # limita a memória mesmo sob uma enxurrada de chaves novas.
+    def __init__(self, rate: float, burst: int, max_buckets: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.idle_seconds = burst / rate
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        # Retorna 0 se a requisição pode seguir; senão, os segundos até haver ficha
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = self.burst if bucket is None else min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, last_seen) = next(iter(self._buckets.items()))
+            if now - last_seen < self.idle_seconds and len(self._buckets) <= self.max_buckets:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def rate_limit(route: str, rate: float, burst: int):
+    # Dependência por rota, configurável por RATE_LIMIT_<ROTA>_RATE (fichas/s, 0 desliga)
+    # e RATE_LIMIT_<ROTA>_BURST. Usa o `sub` do JWT sem consultar o banco, para que o
+    # excesso seja rejeitado antes de qualquer trabalho de banco ou modelo; tokens
+    # inválidos seguem e são recusados por get_current_user.
+    prefix = f"RATE_LIMIT_{route.upper()}"
+    rate = float(os.getenv(f"{prefix}_RATE", rate))
+    burst = int(os.getenv(f"{prefix}_BURST", burst))
+    limiter = TokenBucketLimiter(rate, burst) if rate > 0 else None
+
+    def dependency(authorization: Optional[str] = Header(None)):
+        if limiter is None or not authorization:
+            return
+        scheme, _, token = authorization.partition(" ")
+        payload = decode_jwt_token(token.strip()) if scheme.lower() == "bearer" else None
+        subject = payload.get("sub") if payload else None
+        if subject is None:
+            return
+        retry_after = limiter.acquire(str(subject))
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    return dependency
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Any, Optional
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from database.models import RevokedToken
+import threading
+import hashlib
+import logging
+import math
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tokens revogados esperados no filtro e taxa de falsos positivos; acima da
+# capacidade o filtro é remontado com o dobro do tamanho
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+# Intervalo para trazer revogações feitas por outros workers e para remontar o filtro
+# sem as revogações já expiradas
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+REVOCATION_RELOAD_SECONDS = float(os.getenv("REVOCATION_RELOAD_SECONDS", "3600"))
+
+
+class BloomFilter:
+    # `probes` bits por chave, escolhidos por double hashing sobre hash() do Python.
+    # O filtro só existe na memória do processo e é remontado a cada subida, então a
+    # semente de hash() ser aleatória por processo não importa. O número de bits é
+    # arredondado para potência de 2, trocando o módulo por uma máscara.
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        optimal = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = 1 << max(6, (optimal - 1).bit_length())
+        self.mask = self.size - 1
+        self.probes = max(1, round(optimal / capacity * math.log(2)))
+        self.capacity = capacity
+        self.bits = bytearray(self.size >> 3)
+        self.count = 0
+
+    def add(self, key: str) -> None:
+        h = hash(key)
+        step = h >> 32 | 1
+        for i in range(self.probes):
+            position = (h + i * step) & self.mask
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        # Um token não revogado costuma parar no primeiro ou segundo bit zerado
+        h = hash(key)
+        step = h >> 32 | 1
+        bits, mask = self.bits, self.mask
+        for i in range(self.probes):
+            position = (h + i * step) & mask
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+
+class TokenDenylist:
+    # Revogações ficam na tabela revoked_tokens; o filtro em memória responde sozinho
+    # quando o token não foi revogado (o caso comum), e só um acerto do filtro, que
+    # pode ser falso positivo, consulta a tabela.
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, key: str) -> bool:
+        if key not in self._filter:
+            return False
+        db = SessionLocal()
+        try:
+            return db.query(RevokedToken.id).filter(RevokedToken.jti == key).first() is not None
+        finally:
+            db.close()
+
+    def revoke(self, db: Session, key: str, expires_at: Optional[datetime]) -> None:
+        # Grava antes de marcar o filtro: uma remontagem concorrente ou já vê a linha
+        # na tabela ou recebe a chave depois, no filtro novo
+        db.add(RevokedToken(jti=key, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Já revogado
+            db.rollback()
+        with self._lock:
+            self._filter.add(key)
+
+    def load(self, engine) -> None:
+        # Remonta o filtro a partir da tabela, descartando antes as revogações de
+        # tokens que já expiraram (esses são recusados pela própria assinatura)
+        with self._lock, engine.begin() as connection:
+            connection.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+            rows = connection.execute(select(RevokedToken.id, RevokedToken.jti)).all()
+            bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            for _, key in rows:
+                bloom.add(key)
+            self._filter = bloom
+            self._last_id = max((row_id for row_id, _ in rows), default=self._last_id)
+        logger.info("Token denylist loaded with %s revoked tokens", len(rows))
+
+    def sync(self, engine) -> None:
+        # Revogações feitas por outros workers desde a última leitura (ids só crescem)
+        with self._lock:
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self._last_id)
+                ).all()
+            for row_id, key in rows:
+                self._filter.add(key)
+                self._last_id = max(self._last_id, row_id)
+            grow = self._filter.count > self._filter.capacity
+        if grow:
+            self.load(engine)
+
+
+def token_key(payload: dict[str, Any], token: str) -> str:
+    # Tokens emitidos antes do `jti` são identificados pelo hash do próprio token
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_expiry(payload: dict[str, Any]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else None
+
+
+denylist = TokenDenylist()
@@ -17,6 +17,9 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class TokenRevoke(BaseModel):
+    token: str
+
 class IrisInput(BaseModel):
     sepal_length: float
     sepal_width: float
@@ -0,0 +1,204 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+from dotenv import load_dotenv
+from sqlalchemy import event
+import threading
+import logging
+import random
+import json
+import time
+import uuid
+import os
+import re
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Colapsa listas `IN (?, ?, ...)` de tamanhos diferentes no mesmo formato de instrução
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class Trace:
+    # Estado de uma requisição: spans concluídos (só se amostrada), contagem de
+    # instruções SQL por formato para o detector de N+1 e a pilha de spans abertos,
+    # cujo topo é o pai dos novos spans.
+    __slots__ = ("trace_id", "sampled", "spans", "statements", "stack", "start", "began")
+
+    def __init__(self, sampled: bool):
+        self.start, self.began = time.time(), time.perf_counter()
+        self.trace_id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.spans: list[dict[str, Any]] = []
+        self.statements: Counter = Counter()
+        self.stack: list[str] = []
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _record(trace: Trace, span_id: str, parent_id: Optional[str], name: str,
+            start: float, duration: float, attributes: dict[str, Any]) -> None:
+    trace.spans.append({
+        "trace_id": trace.trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "name": name,
+        "start": start,
+        "duration_ms": round(duration * 1000, 3),
+        "attributes": attributes,
+    })
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    # Span filho do span atual (inferência, hash de senha...); sem trace amostrado, não faz nada
+    trace = _current.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    span_id = _new_span_id()
+    parent_id = trace.stack[-1] if trace.stack else None
+    trace.stack.append(span_id)
+    start, began = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stack.pop()
+        _record(trace, span_id, parent_id, name, start, time.perf_counter() - began, attributes)
+
+
+class JsonLinesExporter:
+    # Um trace por escrita no arquivo JSON lines, aberto no primeiro uso
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(item, ensure_ascii=False, default=str) + "\n" for item in spans)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+            self._file.flush()
+
+
+class Tracer:
+    # Amostragem decidida na entrada da requisição (TRACE_SAMPLE_RATE, de 0 a 1).
+    # Requisições não amostradas só contam instruções SQL por formato, para o
+    # detector de N+1, que avisa quando um formato roda mais de
+    # TRACE_N_PLUS_ONE_THRESHOLD vezes na mesma requisição.
+    def __init__(self, sample_rate: float, trace_file: str, n_plus_one_threshold: int):
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.exporter = JsonLinesExporter(trace_file)
+
+    def start_trace(self):
+        trace = Trace(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+        if trace.sampled:
+            trace.stack.append(_new_span_id())
+        return _current.set(trace)
+
+    def end_trace(self, token, name: str, attributes: dict[str, Any]) -> None:
+        trace = _current.get()
+        _current.reset(token)
+        if trace is None:
+            return
+
+        repeated = [
+            {"statement": statement, "count": count}
+            for statement, count in trace.statements.items()
+            if count > self.n_plus_one_threshold
+        ]
+        if repeated:
+            attributes["n_plus_one"] = repeated
+            for item in repeated:
+                logger.warning("Possible N+1 in %s: statement ran %s times: %s", name, item["count"], item["statement"])
+
+        if trace.sampled:
+            attributes["db.statements"] = sum(1 for item in trace.spans if item["name"] == "db.query")
+            _record(trace, trace.stack[0], None, name, trace.start, time.perf_counter() - trace.began, attributes)
+            try:
+                self.exporter.export(trace.spans)
+            except OSError as e:
+                logger.error("Error exporting trace %s: %s", trace.trace_id, e)
+
+    def current_trace_id(self) -> Optional[str]:
+        trace = _current.get()
+        return trace.trace_id if trace is not None and trace.sampled else None
+
+    def instrument_engine(self, engine) -> None:
+        # Um span por instrução SQL, via eventos da engine
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if _current.get() is not None:
+                conn.info.setdefault("trace_started", []).append((time.time(), time.perf_counter()))
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            trace = _current.get()
+            if trace is None or not conn.info.get("trace_started"):
+                return
+            start, began = conn.info["trace_started"].pop()
+            statement = _SPACES.sub(" ", statement).strip()
+            if not executemany:
+                # Lotes de executemany são inserções em massa, não N+1
+                trace.statements[_IN_LIST.sub("(?)", statement)] += 1
+            if trace.sampled:
+                attributes: dict[str, Any] = {"db.statement": statement}
+                if executemany:
+                    attributes["db.rows"] = len(parameters)
+                parent_id = trace.stack[-1] if trace.stack else None
+                _record(trace, _new_span_id(), parent_id, "db.query", start, time.perf_counter() - began, attributes)
+
+
+class TracingMiddleware:
+    # Middleware ASGI: o trace termina depois do envio do corpo, incluindo respostas
+    # em streaming; respostas amostradas levam o cabeçalho X-Trace-Id.
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = self.tracer.start_trace()
+        trace_id = self.tracer.current_trace_id()
+        status_code = 500
+
+        async def send_with_trace(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trace_id is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            attributes = {
+                "http.method": scope["method"],
+                "http.path": scope["path"],
+                "http.status": status_code,
+            }
+            route = scope.get("route")
+            name = f"{scope['method']} {route.path if route is not None else scope['path']}"
+            self.tracer.end_trace(token, name, attributes)
+
+
+tracer = Tracer(
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+    trace_file=os.getenv("TRACE_FILE", "traces.jsonl"),
+    n_plus_one_threshold=int(os.getenv("TRACE_N_PLUS_ONE_THRESHOLD", "10")),
+)